@@ -1 +1,2 @@
-from .structs import BaseStructObject, BaseStructHandler
\ No newline at end of file
+from .structs import BaseStructObject, BaseStructHandler
+from .indexed import AttrIndex, IndexedIdHandler
\ No newline at end of file
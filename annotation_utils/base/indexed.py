@@ -0,0 +1,229 @@
+from __future__ import annotations
+from typing import TypeVar, List, Dict, Any
+import bisect
+from itertools import chain
+import numpy as np
+
+from logger import logger
+from common_utils.base.basic import BasicLoadableIdHandler, BasicHandler
+
+T = TypeVar('T')
+H = TypeVar('H')
+
+class AttrIndex:
+    """Maps the values of a few attributes of the objects in a handler to their positions.
+
+    For every attribute name, key2idx[attr_name] maps an attribute value to the ascending list
+    of positions in obj_list that hold an object with that value.
+    This is derived data, so it is ignored when comparing handlers.
+    """
+    def __init__(self, attr_names: List[str]):
+        self.attr_names = attr_names
+        self.obj_list = None
+        self.length = 0
+        self.built = False
+        self.key2idx = {attr_name: {} for attr_name in attr_names}
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, AttrIndex)
+
+    def is_valid_for(self, obj_list: List[T]) -> bool:
+        return self.built and self.obj_list is obj_list and self.length == len(obj_list)
+
+    def invalidate(self):
+        self.built = False
+
+    def build(self, obj_list: List[T]):
+        self.key2idx = {attr_name: {} for attr_name in self.attr_names}
+        if hasattr(obj_list, 'get_column'):
+            # Column-backed containers can be indexed without creating every object.
+            for attr_name in self.attr_names:
+                self.key2idx[attr_name] = self._group_column(obj_list.get_column(attr_name))
+        else:
+            for idx, obj in enumerate(obj_list):
+                self._add(idx, obj)
+        self.obj_list = obj_list
+        self.length = len(obj_list)
+        self.built = True
+
+    @staticmethod
+    def _group_column(values: np.ndarray) -> Dict[Any, List[int]]:
+        if values.dtype == object:
+            result = {}
+            for idx, key in enumerate(values.tolist()):
+                result.setdefault(key, []).append(idx)
+            return result
+        order = np.argsort(values, kind='stable')
+        keys, starts = np.unique(values[order], return_index=True)
+        order_list = order.tolist()
+        bounds = starts.tolist() + [len(order_list)]
+        return {key: order_list[bounds[i]:bounds[i+1]] for i, key in enumerate(keys.tolist())}
+
+    def _add(self, idx: int, obj: T):
+        for attr_name in self.attr_names:
+            index = self.key2idx[attr_name]
+            key = getattr(obj, attr_name)
+            if key in index:
+                bisect.insort(index[key], idx)
+            else:
+                index[key] = [idx]
+
+    def _remove(self, idx: int, obj: T) -> bool:
+        for attr_name in self.attr_names:
+            index = self.key2idx[attr_name]
+            key = getattr(obj, attr_name)
+            idx_list = index.get(key, [])
+            if idx not in idx_list:
+                # The object was modified in place after it was indexed.
+                return False
+            idx_list.remove(idx)
+            if len(idx_list) == 0:
+                del index[key]
+        return True
+
+    def append(self, obj: T):
+        self._add(self.length, obj)
+        self.length += 1
+
+    def replace(self, idx: int, old_obj: T, new_obj: T):
+        if self._remove(idx, old_obj):
+            self._add(idx, new_obj)
+        else:
+            self.invalidate()
+
+class IndexedIdHandler(BasicLoadableIdHandler[H, T], BasicHandler[H, T]):
+    """
+    A BasicLoadableIdHandler that keeps a lazily built index of its objects' ids
+    (and of any other attributes listed in index_attr_names) so that lookups don't
+    need to scan the whole handler.
+
+    The index is kept up to date by append, extend, __setitem__, __delitem__, remove_by_mask, sort and shuffle.
+    Lookups also notice when an indexed object no longer has the value that it was indexed under,
+    and rebuild the index in that case. However, an object whose attribute was changed in place
+    to the value being looked up can't be noticed this way, so if you change an indexed attribute
+    of an object that is already in the handler, call reindex() afterwards.
+
+    Assumptions:
+        1. Handler has only one class parameter: the object list.
+        2. All contained objects are of type obj_type.
+        3. Any to_dict or to_dict_list methods of any class object in the object list doesn't take any parameters.
+        4. All objects in handler must have an id class variable.
+    """
+    index_attr_names = ['id']
+
+    def __init__(self: H, obj_type: type, obj_list: List[T]=None):
+        super().__init__(obj_type=obj_type, obj_list=obj_list)
+        self._index = AttrIndex(self.index_attr_names)
+
+    def __setitem__(self: H, idx: int, value: T):
+        old_value = self.obj_list[idx] if type(idx) is int else None
+        in_sync = self._index.is_valid_for(self.obj_list)
+        super().__setitem__(idx, value)
+        if type(idx) is int and in_sync:
+            self._index.replace(idx % len(self.obj_list), old_value, value)
+        else:
+            self._index.invalidate()
+
+    def __delitem__(self: H, idx: int):
+        super().__delitem__(idx)
+        self._index.invalidate()
+
+    def append(self: H, item: T):
+        in_sync = self._index.is_valid_for(self.obj_list)
+        super().append(item)
+        if in_sync:
+            self._index.append(item)
+
+    def sort(self: H, attr_name: str, reverse: bool=False):
+        super().sort(attr_name=attr_name, reverse=reverse)
+        self._index.invalidate()
+
+    def shuffle(self: H):
+        super().shuffle()
+        self._index.invalidate()
+
+    def remove_by_mask(self: H, remove_mask: List[bool]) -> list:
+        """Removes every object whose entry in remove_mask is True, in a single pass over the handler.
+        This is much faster than deleting the objects one index at a time.
+        Returns the ids of the removed objects in order.
+        """
+        remove_mask = np.asarray(remove_mask, dtype=bool)
+        if len(remove_mask) != len(self.obj_list):
+            logger.error(f'len(remove_mask) == {len(remove_mask)} != {len(self.obj_list)} == len(self.obj_list)')
+            raise Exception
+        if not remove_mask.any():
+            return []
+        if hasattr(self.obj_list, 'permute'):
+            # Column-backed containers only need to drop the rows.
+            removed_ids = self.obj_list.get_column('id')[remove_mask].tolist()
+            self.obj_list.permute(np.nonzero(~remove_mask)[0])
+        else:
+            removed_ids = [obj.id for obj, is_removed in zip(self.obj_list, remove_mask.tolist()) if is_removed]
+            self.obj_list[:] = [obj for obj, is_removed in zip(self.obj_list, remove_mask.tolist()) if not is_removed]
+        self._index.invalidate()
+        return removed_ids
+
+    def remove_ids(self: H, id_list: List[int]) -> list:
+        """Removes every object whose id is in id_list, in a single pass. Returns the ids of the removed objects in order."""
+        if len(id_list) == 0:
+            return []
+        if hasattr(self.obj_list, 'get_column'):
+            remove_mask = np.isin(self.obj_list.get_column('id'), list(set(id_list)))
+        else:
+            id_set = set(id_list)
+            remove_mask = [obj.id in id_set for obj in self.obj_list]
+        return self.remove_by_mask(remove_mask)
+
+    def reindex(self: H):
+        """Marks the index as stale so that it is rebuilt on the next lookup.
+        This is only needed after changing an indexed attribute of an object
+        that is already contained in the handler.
+        """
+        self._index.invalidate()
+
+    def _get_index(self: H, attr_name: str) -> Dict[Any, List[int]]:
+        if not self._index.is_valid_for(self.obj_list):
+            self._index.build(self.obj_list)
+        return self._index.key2idx[attr_name]
+
+    def _get_objs_from_index(self: H, attr_name: str, keys: list) -> List[T]:
+        if type(keys) is int:
+            keys = [keys]
+        elif type(keys) is not list:
+            raise TypeError
+        objs = self._lookup_index(self._get_index(attr_name), attr_name, keys)
+        if objs is None:
+            # An indexed attribute was changed in place, so look again with a fresh index.
+            self._index.build(self.obj_list)
+            objs = self._lookup_index(self._index.key2idx[attr_name], attr_name, keys)
+        return objs
+
+    def _lookup_index(self: H, index: Dict[Any, List[int]], attr_name: str, keys: list) -> List[T]:
+        # Returns None if any of the indexed objects no longer has the key that it was indexed under.
+        if len(keys) == 1:
+            idx_list = index.get(keys[0], [])
+            objs = [self.obj_list[idx] for idx in idx_list]
+            if any(getattr(obj, attr_name) != keys[0] for obj in objs):
+                return None
+        else:
+            idx_list = sorted(set(chain.from_iterable(index.get(key, []) for key in keys)))
+            objs = [self.obj_list[idx] for idx in idx_list]
+            key_set = set(keys)
+            if any(getattr(obj, attr_name) not in key_set for obj in objs):
+                return None
+        return objs
+
+    def get_obj_from_id(self: H, id: int) -> T:
+        idx_list = self._get_index('id').get(id, None)
+        if idx_list is not None and self.obj_list[idx_list[0]].id == id:
+            return self.obj_list[idx_list[0]]
+        # Either the id doesn't exist or an id was reassigned in place, so check again with a fresh index.
+        self._index.build(self.obj_list)
+        idx_list = self._index.key2idx['id'].get(id, None)
+        if idx_list is not None:
+            return self.obj_list[idx_list[0]]
+        id_list = [obj.id for obj in self]
+        id_list.sort()
+        logger.error(f"Couldn't find {self.obj_type.__name__} with id={id}")
+        logger.error(f"Possible ids: {id_list}")
+        raise Exception
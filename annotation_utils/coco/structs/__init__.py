@@ -2,5 +2,7 @@ from .objects import COCO_Info, COCO_License, COCO_Image, \
     COCO_Annotation, COCO_Category
 from .handlers import COCO_License_Handler, COCO_Image_Handler, \
     COCO_Annotation_Handler, COCO_Category_Handler
+from .columnar import COCO_Annotation_Columns
+from .cache import COCO_Cache
 from .dataset import COCO_Dataset, COCO_Dataset_List, Labeled_COCO_Dataset, Labeled_COCO_Dataset_List
 from .zoom import COCO_Zoom
\ No newline at end of file
@@ -0,0 +1,189 @@
+from __future__ import annotations
+from typing import List, Dict, Any, Iterator
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+
+from logger import logger
+from common_utils.check_utils import check_file_exists
+
+from .objects import COCO_Info, COCO_Annotation
+from .handlers import COCO_License_Handler, COCO_Image_Handler, \
+    COCO_Annotation_Handler, COCO_Category_Handler
+from .columnar import COCO_Annotation_Columns, _ColumnEncoder, _AnnotationStore
+from ...util.json_stream import iter_json_object
+
+CACHE_VERSION = 2
+
+def _save_record_table(dict_list: List[dict], save_dir: str) -> dict:
+    """
+    Saves a list of flat dictionaries column by column.
+    Integer and float columns are saved as arrays, and string columns are saved as one utf-8 buffer plus offsets.
+    Anything else is kept in the returned metadata as plain json.
+    """
+    if len(dict_list) == 0:
+        return {'json': []}
+    keys = list(dict_list[0].keys())
+    for item_dict in dict_list:
+        if list(item_dict.keys()) != keys:
+            return {'json': dict_list}
+
+    columns = {}
+    for key in keys:
+        values = [item_dict[key] for item_dict in dict_list]
+        value_types = set([type(value) for value in values])
+        if value_types == {int} and min(values) >= -2**63 and max(values) < 2**63:
+            np.save(f'{save_dir}/{key}.npy', np.array(values, dtype=np.int64))
+            columns[key] = 'int'
+        elif value_types == {float}:
+            np.save(f'{save_dir}/{key}.npy', np.array(values, dtype=np.float64))
+            columns[key] = 'float'
+        elif value_types <= {str, type(None)}:
+            encoded = [value.encode('utf-8') if value is not None else b'' for value in values]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(part) for part in encoded], out=offsets[1:])
+            np.save(f'{save_dir}/{key}.str.npy', np.frombuffer(b''.join(encoded), dtype=np.uint8))
+            np.save(f'{save_dir}/{key}.offsets.npy', offsets)
+            np.save(f'{save_dir}/{key}.none.npy', np.array([value is None for value in values], dtype=bool))
+            columns[key] = 'str'
+        else:
+            columns[key] = values
+    return {'length': len(dict_list), 'columns': columns}
+
+def _load_record_table(table_meta: dict, load_dir: str) -> Iterator[dict]:
+    if 'json' in table_meta:
+        yield from table_meta['json']
+        return
+    columns = {}
+    for key, kind in table_meta['columns'].items():
+        if kind in ['int', 'float']:
+            columns[key] = np.load(f'{load_dir}/{key}.npy').tolist()
+        elif kind == 'str':
+            buffer = np.load(f'{load_dir}/{key}.str.npy').tobytes()
+            offsets = np.load(f'{load_dir}/{key}.offsets.npy').tolist()
+            is_none = np.load(f'{load_dir}/{key}.none.npy').tolist()
+            columns[key] = [
+                buffer[offsets[i]:offsets[i+1]].decode('utf-8') if not is_none[i] else None
+                for i in range(len(is_none))
+            ]
+        else:
+            columns[key] = kind
+    keys = list(columns.keys())
+    for i in range(table_meta['length']):
+        yield {key: columns[key][i] for key in keys}
+
+class COCO_Cache:
+    """
+    An opt-in binary sidecar cache for COCO json files.
+
+    The first time a json file is loaded through the cache, its contents are written to a directory of .npy files:
+    the annotations in the column layout of COCO_Annotation_Columns, and the images as integer columns plus string tables.
+    Later loads memory-map those arrays instead of parsing the json file.
+    The cache remembers the path, size and modification time of the json file, and is rebuilt whenever any of them change.
+
+    json_path: Path to the COCO json file.
+    cache_dir: Where to keep the cache. By default, the cache is kept right next to the json file, at json_path + '.cache'.
+               Use this if the directory of the json file isn't writable.
+    """
+    def __init__(self, json_path: str, cache_dir: str=None):
+        self.json_path = os.path.abspath(json_path)
+        if cache_dir is None:
+            self.cache_path = f'{self.json_path}.cache'
+        else:
+            path_hash = hashlib.sha1(self.json_path.encode('utf-8')).hexdigest()[:16]
+            self.cache_path = f'{os.path.abspath(cache_dir)}/{os.path.basename(self.json_path)}.{path_hash}.cache'
+
+    def _signature(self) -> dict:
+        stat = os.stat(self.json_path)
+        return {
+            'version': CACHE_VERSION,
+            'json_path': self.json_path,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns
+        }
+
+    def _load_meta(self) -> dict:
+        meta_path = f'{self.cache_path}/meta.json'
+        if not os.path.isfile(meta_path):
+            return None
+        try:
+            return json.load(open(meta_path, 'r'))
+        except ValueError:
+            return None
+
+    def is_valid(self, strict: bool=True) -> bool:
+        """Returns True if the cache exists and was made from the current version of the json file."""
+        check_file_exists(self.json_path)
+        meta = self._load_meta()
+        return meta is not None and meta['signature'] == self._signature() and meta['strict'] == strict
+
+    def clear(self):
+        if os.path.isdir(self.cache_path):
+            shutil.rmtree(self.cache_path)
+
+    def write(self, strict: bool=True) -> bool:
+        """
+        Parses the json file and (re)writes the cache.
+        The cache is written to a temporary directory first and then renamed, so readers never see a partial cache.
+        Returns False if the cache couldn't be written.
+        """
+        check_file_exists(self.json_path)
+        signature = self._signature()
+        tmp_path = f'{self.cache_path}.tmp{os.getpid()}'
+        try:
+            if os.path.isdir(tmp_path):
+                shutil.rmtree(tmp_path)
+            os.makedirs(f'{tmp_path}/annotations')
+            os.makedirs(f'{tmp_path}/images')
+        except OSError as e:
+            logger.warning(f"Couldn't create COCO cache at {self.cache_path}: {e}")
+            return False
+
+        meta = {'signature': signature, 'strict': strict}
+        encoder = _ColumnEncoder()
+        for key, value in iter_json_object(self.json_path, stream_keys=['images', 'annotations']):
+            if key == 'images':
+                meta['images'] = _save_record_table(list(value), f'{tmp_path}/images')
+            elif key == 'annotations':
+                for ann_dict in value:
+                    encoder.add_dict(ann_dict, strict=strict)
+                meta['annotations'] = {str(row): ann_dict for row, ann_dict in encoder.fallback_dicts.items()}
+            elif key in ['info', 'licenses', 'categories']:
+                meta[key] = value
+        missing_keys = [key for key in ['info', 'licenses', 'images', 'annotations', 'categories'] if key not in meta]
+        if len(missing_keys) > 0:
+            shutil.rmtree(tmp_path)
+            logger.error(f'Required keys {missing_keys} not found in {self.json_path}')
+            raise Exception
+        encoder.to_store().save_arrays(f'{tmp_path}/annotations')
+        with open(f'{tmp_path}/meta.json', 'w') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        self.clear()
+        os.rename(tmp_path, self.cache_path)
+        return True
+
+    def load(self, strict: bool=True, columnar: bool=False) -> Dict[str, Any]:
+        """
+        Loads the cached dataset as a dictionary of the keyword arguments of the COCO_Dataset constructor.
+        The annotation arrays are memory-mapped, so with columnar=True, loading doesn't depend on the number of annotations.
+        """
+        meta = self._load_meta()
+        if meta is None:
+            logger.error(f"Couldn't find a COCO cache at {self.cache_path}")
+            raise Exception
+        store = _AnnotationStore.load_arrays(f'{self.cache_path}/annotations', mmap_mode='r')
+        store.objs = {
+            int(row): COCO_Annotation.from_dict(ann_dict, strict=strict)
+            for row, ann_dict in meta['annotations'].items()
+        }
+        columns = COCO_Annotation_Columns(store)
+        return {
+            'info': COCO_Info.from_dict(meta['info']),
+            'licenses': COCO_License_Handler.from_dict_list(meta['licenses']),
+            'images': COCO_Image_Handler.from_dict_list(_load_record_table(meta['images'], f'{self.cache_path}/images')),
+            'annotations': COCO_Annotation_Handler(columns if columnar else list(columns)),
+            'categories': COCO_Category_Handler.from_dict_list(meta['categories'], strict=strict)
+        }
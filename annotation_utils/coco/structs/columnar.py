@@ -0,0 +1,596 @@
+from __future__ import annotations
+from typing import List, Dict, Iterator
+from collections.abc import MutableSequence
+from array import array
+import numpy as np
+
+from logger import logger
+from common_utils.check_utils import check_required_keys
+from common_utils.common_types.segmentation import Polygon, Segmentation
+from common_utils.common_types.bbox import BBox
+from common_utils.common_types.keypoint import Keypoint2D_List
+
+from .objects import COCO_Annotation
+
+# Flags that remember how the values of a row were typed in the source data,
+# so that rows are written back exactly as they were read.
+_BBOX_INT = 1
+_SEG_INT = 2
+_KPT_INT = 4
+_AREA_INT = 8
+_AREA_NONE = 16
+_ISCROWD_NONE = 32
+
+_strict_keys = [
+    'segmentation', 'num_keypoints', 'area',
+    'iscrowd', 'keypoints', 'image_id',
+    'bbox', 'category_id', 'id'
+]
+_int_columns = ['id', 'image_id', 'category_id', 'num_keypoints']
+_prefetch_size = 1024
+
+def _all_int(values: list) -> bool:
+    for value in values:
+        if type(value) is not int:
+            return False
+    return True
+
+def _mixes_int_and_float(values: list) -> bool:
+    # The int flags are per row, so rows that mix both can't be written back exactly from the arrays.
+    has_int = False
+    has_float = False
+    for value in values:
+        if type(value) is int:
+            has_int = True
+        else:
+            has_float = True
+    return has_int and has_float
+
+def _all_number(values: list) -> bool:
+    for value in values:
+        if type(value) not in [int, float]:
+            return False
+    return True
+
+class _ColumnEncoder:
+    """Accumulates annotation rows into flat buffers and packs them into an _AnnotationStore."""
+    def __init__(self):
+        self.ids, self.image_ids, self.category_ids = array('q'), array('q'), array('q')
+        self.num_keypoints, self.iscrowds, self.flags = array('q'), array('q'), array('B')
+        self.areas, self.bboxes = array('d'), array('d')
+        self.kpt_counts, self.kpt_values = array('q'), array('d')
+        self.seg_offsets, self.poly_offsets, self.coords = array('q', [0]), array('q', [0]), array('d')
+        self.objs = {}
+        self.fallback_dicts = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _add_placeholder(self, obj: COCO_Annotation):
+        # Rows that don't fit the columnar layout are kept as objects.
+        self.objs[len(self.ids)] = obj
+        for buffer in [self.ids, self.image_ids, self.category_ids, self.num_keypoints, self.iscrowds, self.flags, self.areas, self.kpt_counts]:
+            buffer.append(0)
+        self.bboxes.extend([0.0, 0.0, 0.0, 0.0])
+        self.seg_offsets.append(self.seg_offsets[-1])
+
+    def add_object(self, obj: COCO_Annotation):
+        ann_dict = obj.to_dict(strict=True)
+        if not self.add_dict(ann_dict, strict=True, allow_fallback=False):
+            self._add_placeholder(obj)
+
+    def add_dict(self, ann_dict: dict, strict: bool=True, allow_fallback: bool=True) -> bool:
+        if strict:
+            check_required_keys(ann_dict, required_keys=_strict_keys)
+        else:
+            check_required_keys(ann_dict, required_keys=['id', 'category_id', 'image_id'])
+        seg = ann_dict.get('segmentation', [])
+        kpts = ann_dict.get('keypoints', [])
+        bbox = ann_dict.get('bbox', None)
+        area = ann_dict.get('area', None)
+        iscrowd = ann_dict.get('iscrowd', None)
+        num_keypoints = ann_dict.get('num_keypoints', None)
+        id_values = [ann_dict['id'], ann_dict['image_id'], ann_dict['category_id']]
+        if (
+            'keypoints_3d' in ann_dict or 'camera_params' in ann_dict
+            or type(bbox) is not list or type(seg) is not list or type(kpts) is not list
+            or not _all_int(id_values)
+            or not (num_keypoints is None or type(num_keypoints) is int)
+            or not (iscrowd is None or type(iscrowd) is int)
+            or not (area is None or type(area) in [int, float])
+            or not _all_number(bbox) or not _all_number(kpts)
+            or not all([type(points) is list and _all_number(points) for points in seg])
+            or _mixes_int_and_float(bbox)
+            or _mixes_int_and_float([value for points in seg for value in points])
+        ):
+            if allow_fallback:
+                self.fallback_dicts[len(self.ids)] = ann_dict
+                self._add_placeholder(COCO_Annotation.from_dict(ann_dict, strict=strict))
+            return False
+        if len(bbox) != 4:
+            logger.error(f'Expected bbox to have 4 values, but got {bbox}')
+            logger.error(f"id: {ann_dict['id']}")
+            raise Exception
+        if len(kpts) % 3 != 0:
+            logger.error(f'len(keypoints) % 3 == {len(kpts)} % 3 == {len(kpts) % 3} != 0')
+            logger.error(f"id: {ann_dict['id']}")
+            raise Exception
+        for points in seg:
+            if len(points) % 2 != 0:
+                logger.error(f'len(self.points) is not divisible by self.dimensionality=2')
+                logger.error(f"id: {ann_dict['id']}")
+                raise Exception
+
+        flags = 0
+        if _all_int(bbox):
+            flags |= _BBOX_INT
+        if all([_all_int(points) for points in seg]):
+            flags |= _SEG_INT
+        if _all_int(kpts):
+            flags |= _KPT_INT
+        if area is None:
+            flags |= _AREA_NONE
+        elif type(area) is int:
+            flags |= _AREA_INT
+        if iscrowd is None:
+            flags |= _ISCROWD_NONE
+
+        self.ids.append(id_values[0])
+        self.image_ids.append(id_values[1])
+        self.category_ids.append(id_values[2])
+        self.num_keypoints.append(num_keypoints if num_keypoints is not None else len(kpts) // 3)
+        self.iscrowds.append(iscrowd if iscrowd is not None else 0)
+        self.flags.append(flags)
+        self.areas.append(area if area is not None else np.nan)
+        xmin, ymin, bbox_w, bbox_h = bbox
+        self.bboxes.extend([xmin, ymin, xmin + bbox_w, ymin + bbox_h])
+        self.kpt_counts.append(len(kpts) // 3)
+        self.kpt_values.extend(kpts)
+        for points in seg:
+            self.coords.extend(points)
+            self.poly_offsets.append(len(self.coords))
+        self.seg_offsets.append(len(self.poly_offsets) - 1)
+        return True
+
+    def to_store(self) -> _AnnotationStore:
+        kpt_counts = np.frombuffer(self.kpt_counts, dtype=np.int64).copy()
+        max_kpts = int(kpt_counts.max()) if len(kpt_counts) > 0 else 0
+        keypoints = np.zeros((len(kpt_counts), max_kpts, 3), dtype=np.float64)
+        if max_kpts > 0:
+            keypoints[np.arange(max_kpts) < kpt_counts[:, None]] = np.frombuffer(self.kpt_values, dtype=np.float64).reshape(-1, 3)
+        return _AnnotationStore(
+            ids=np.frombuffer(self.ids, dtype=np.int64).copy(),
+            image_ids=np.frombuffer(self.image_ids, dtype=np.int64).copy(),
+            category_ids=np.frombuffer(self.category_ids, dtype=np.int64).copy(),
+            num_keypoints=np.frombuffer(self.num_keypoints, dtype=np.int64).copy(),
+            iscrowds=np.frombuffer(self.iscrowds, dtype=np.int64).copy(),
+            flags=np.frombuffer(self.flags, dtype=np.uint8).copy(),
+            areas=np.frombuffer(self.areas, dtype=np.float64).copy(),
+            bboxes=np.frombuffer(self.bboxes, dtype=np.float64).reshape(-1, 4).copy(),
+            kpt_counts=kpt_counts, keypoints=keypoints,
+            seg_offsets=np.frombuffer(self.seg_offsets, dtype=np.int64).copy(),
+            poly_offsets=np.frombuffer(self.poly_offsets, dtype=np.int64).copy(),
+            coords=np.frombuffer(self.coords, dtype=np.float64).copy(),
+            objs=self.objs
+        )
+
+class _AnnotationStore:
+    """
+    The contiguous arrays behind a COCO_Annotation_Columns.
+    A store is shared by a COCO_Annotation_Columns and any slices taken from it, so that a given row
+    is only ever materialized as one COCO_Annotation object.
+
+    Rows are addressed by their physical row number.
+    Rows that have been materialized (or that were appended as objects) live in objs,
+    and once an object exists it takes precedence over the values in the arrays.
+    """
+    def __init__(
+        self, ids: np.ndarray, image_ids: np.ndarray, category_ids: np.ndarray,
+        num_keypoints: np.ndarray, iscrowds: np.ndarray, flags: np.ndarray, areas: np.ndarray,
+        bboxes: np.ndarray, kpt_counts: np.ndarray, keypoints: np.ndarray,
+        seg_offsets: np.ndarray, poly_offsets: np.ndarray, coords: np.ndarray,
+        objs: Dict[int, COCO_Annotation]=None
+    ):
+        self.ids = ids
+        self.image_ids = image_ids
+        self.category_ids = category_ids
+        self.num_keypoints = num_keypoints
+        self.iscrowds = iscrowds
+        self.flags = flags
+        self.areas = areas
+        self.bboxes = bboxes # xmin, ymin, xmax, ymax
+        self.kpt_counts = kpt_counts
+        self.keypoints = keypoints # padded to the largest number of keypoints
+        self.seg_offsets = seg_offsets # annotation -> range of polygons
+        self.poly_offsets = poly_offsets # polygon -> range of coords
+        self.coords = coords
+        self.objs = objs if objs is not None else {}
+        self.num_rows = len(ids)
+        self.next_row = self.num_rows
+
+    array_names = [
+        'ids', 'image_ids', 'category_ids', 'num_keypoints', 'iscrowds', 'flags', 'areas',
+        'bboxes', 'kpt_counts', 'keypoints', 'seg_offsets', 'poly_offsets', 'coords'
+    ]
+
+    def save_arrays(self, save_dir: str):
+        """Saves the arrays (but not objs) as .npy files so that they can be memory-mapped by load_arrays."""
+        for name in self.array_names:
+            np.save(f'{save_dir}/{name}.npy', getattr(self, name))
+
+    @classmethod
+    def load_arrays(cls, load_dir: str, mmap_mode: str='r') -> _AnnotationStore:
+        return cls(**{name: np.load(f'{load_dir}/{name}.npy', mmap_mode=mmap_mode) for name in cls.array_names})
+
+    def new_row(self, obj: COCO_Annotation) -> int:
+        row = self.next_row
+        self.next_row += 1
+        self.objs[row] = obj
+        return row
+
+    def get(self, row: int) -> COCO_Annotation:
+        obj = self.objs.get(row, None)
+        if obj is None:
+            obj = self.materialize(row)
+            self.objs[row] = obj
+        return obj
+
+    def _bbox_values(self, row: int) -> list:
+        values = self.bboxes[row].tolist()
+        if self.flags[row] & _BBOX_INT:
+            values = [int(value) for value in values]
+        return values
+
+    def _polygon_values(self, row: int) -> List[list]:
+        as_int = self.flags[row] & _SEG_INT
+        result = []
+        for poly_idx in range(self.seg_offsets[row], self.seg_offsets[row+1]):
+            points = self.coords[self.poly_offsets[poly_idx]:self.poly_offsets[poly_idx+1]]
+            result.append(points.astype(np.int64).tolist() if as_int else points.tolist())
+        return result
+
+    def _keypoint_array(self, row: int) -> np.ndarray:
+        arr = self.keypoints[row, :self.kpt_counts[row]].reshape(-1)
+        return arr.astype(np.int64) if self.flags[row] & _KPT_INT else arr
+
+    def _area_value(self, row: int):
+        flags = self.flags[row]
+        if flags & _AREA_NONE:
+            return None
+        return int(self.areas[row]) if flags & _AREA_INT else float(self.areas[row])
+
+    def _iscrowd_value(self, row: int):
+        return None if self.flags[row] & _ISCROWD_NONE else int(self.iscrowds[row])
+
+    def materialize(self, row: int) -> COCO_Annotation:
+        return self.materialize_rows([row])[0]
+
+    def materialize_rows(self, rows: List[int]) -> List[COCO_Annotation]:
+        """Creates the COCO_Annotation objects of several rows at once, converting the arrays in bulk."""
+        idx = np.asarray(rows, dtype=np.int64)
+        flags = self.flags[idx].tolist()
+        areas = self.areas[idx].tolist()
+        iscrowds = self.iscrowds[idx].tolist()
+        kpt_counts = self.kpt_counts[idx].tolist()
+        keypoints = self.keypoints[idx].reshape(len(idx), -1).tolist()
+        seg_starts = self.seg_offsets[idx].tolist()
+        seg_ends = self.seg_offsets[idx + 1].tolist()
+        result = []
+        for i, (ann_id, image_id, category_id, num_keypoints, bbox) in enumerate(zip(
+            self.ids[idx].tolist(), self.image_ids[idx].tolist(), self.category_ids[idx].tolist(),
+            self.num_keypoints[idx].tolist(), self.bboxes[idx].tolist()
+        )):
+            row_flags = flags[i]
+            if row_flags & _BBOX_INT:
+                bbox = [int(value) for value in bbox]
+            polygons = []
+            if seg_ends[i] > seg_starts[i]:
+                poly_offsets = self.poly_offsets[seg_starts[i]:seg_ends[i]+1].tolist()
+                coords = self.coords[poly_offsets[0]:poly_offsets[-1]].tolist()
+                if row_flags & _SEG_INT:
+                    coords = [int(value) for value in coords]
+                base = poly_offsets[0]
+                polygons = [coords[start-base:end-base] for start, end in zip(poly_offsets[:-1], poly_offsets[1:])]
+            kpts = keypoints[i][:3*kpt_counts[i]]
+            if row_flags & _KPT_INT:
+                kpts = [int(value) for value in kpts]
+            xmin, ymin, xmax, ymax = bbox
+            result.append(
+                COCO_Annotation(
+                    id=ann_id, category_id=category_id, image_id=image_id,
+                    segmentation=Segmentation([Polygon(points=points, dimensionality=2) for points in polygons]),
+                    bbox=BBox(xmin=xmin, ymin=ymin, xmax=xmax, ymax=ymax),
+                    area=None if row_flags & _AREA_NONE else int(areas[i]) if row_flags & _AREA_INT else areas[i],
+                    keypoints=Keypoint2D_List.from_list(kpts, demarcation=False),
+                    num_keypoints=num_keypoints,
+                    iscrowd=None if row_flags & _ISCROWD_NONE else iscrowds[i]
+                )
+            )
+        return result
+
+    def prefetch(self, rows: List[int]):
+        """Materializes any of the given rows that haven't been materialized yet, in bulk."""
+        pending = [row for row in rows if row not in self.objs]
+        if len(pending) > 0:
+            for row, obj in zip(pending, self.materialize_rows(pending)):
+                self.objs[row] = obj
+
+    def row_to_dict(self, row: int, strict: bool=True) -> dict:
+        """Equivalent to self.get(row).to_dict(strict=strict), but without materializing the row."""
+        obj = self.objs.get(row, None)
+        if obj is not None:
+            return obj.to_dict(strict=strict)
+        xmin, ymin, xmax, ymax = self._bbox_values(row)
+        bbox = [xmin, ymin, xmax - xmin, ymax - ymin]
+        kpts = self._keypoint_array(row).tolist()
+        if strict:
+            return {
+                'segmentation': self._polygon_values(row),
+                'num_keypoints': int(self.num_keypoints[row]),
+                'area': self._area_value(row),
+                'iscrowd': self._iscrowd_value(row),
+                'keypoints': kpts,
+                'image_id': int(self.image_ids[row]),
+                'bbox': bbox,
+                'category_id': int(self.category_ids[row]),
+                'id': int(self.ids[row])
+            }
+        else:
+            data_dict = {
+                'bbox': bbox,
+                'area': self._area_value(row),
+                'iscrowd': self._iscrowd_value(row),
+                'image_id': int(self.image_ids[row]),
+                'category_id': int(self.category_ids[row]),
+                'id': int(self.ids[row])
+            }
+            if self.seg_offsets[row+1] > self.seg_offsets[row]:
+                data_dict['segmentation'] = self._polygon_values(row)
+            if len(kpts) > 0:
+                data_dict['keypoints'] = kpts
+                data_dict['num_keypoints'] = int(self.num_keypoints[row])
+            return data_dict
+
+class COCO_Annotation_Columns(MutableSequence):
+    """
+    A list-like container of COCO_Annotation objects that keeps the annotation data in contiguous NumPy arrays
+    instead of one Python object per annotation:
+        id, image_id, category_id, num_keypoints, iscrowd: (N,) int64
+        area: (N,) float64 (NaN where area is None)
+        bbox: (N, 4) float64 as xmin, ymin, xmax, ymax
+        keypoints: (N, K, 3) float64 padded to the largest number of keypoints K, plus an (N,) count
+        segmentation: flat coordinate buffer indexed by per-polygon and per-annotation offsets
+
+    COCO_Annotation objects are only created when a row is accessed.
+    Once created, an object is kept and takes precedence over the arrays, so changes made to it are never lost.
+    Call flush() to pack the objects back into the arrays and release them.
+
+    This is meant to be used as the obj_list of a COCO_Annotation_Handler.
+    Refer to COCO_Annotation_Handler.from_dict_list(..., columnar=True).
+    """
+    def __init__(self, store: _AnnotationStore, rows: np.ndarray=None):
+        self._store = store
+        self._rows = rows if rows is not None else np.arange(store.num_rows, dtype=np.int64)
+        self._len = len(self._rows)
+
+    @classmethod
+    def from_dict_list(cls, dict_list: List[dict], strict: bool=True) -> COCO_Annotation_Columns:
+        encoder = _ColumnEncoder()
+        for ann_dict in dict_list:
+            encoder.add_dict(ann_dict, strict=strict)
+        return cls(encoder.to_store())
+
+    @classmethod
+    def from_annotations(cls, annotation_list: List[COCO_Annotation]) -> COCO_Annotation_Columns:
+        encoder = _ColumnEncoder()
+        for ann in annotation_list:
+            encoder.add_object(ann)
+        return cls(encoder.to_store())
+
+    @property
+    def rows(self) -> np.ndarray:
+        return self._rows[:self._len]
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return COCO_Annotation_Columns(self._store, self.rows[idx].copy())
+        if idx < -self._len or idx >= self._len:
+            raise IndexError('list index out of range')
+        return self._store.get(int(self.rows[idx]))
+
+    def __setitem__(self, idx, value):
+        if isinstance(idx, slice):
+            rows = self.rows.tolist()
+            rows[idx] = [self._store.new_row(obj) for obj in value]
+            self._set_rows(np.array(rows, dtype=np.int64))
+        else:
+            if idx < -self._len or idx >= self._len:
+                raise IndexError('list assignment index out of range')
+            self._rows[idx % self._len] = self._store.new_row(value)
+
+    def __delitem__(self, idx):
+        if isinstance(idx, slice):
+            self._set_rows(np.delete(self.rows, np.arange(self._len)[idx]))
+        else:
+            if idx < -self._len or idx >= self._len:
+                raise IndexError('list assignment index out of range')
+            self._set_rows(np.delete(self.rows, idx))
+
+    def insert(self, idx: int, value: COCO_Annotation):
+        self._set_rows(np.insert(self.rows, min(max(idx + self._len if idx < 0 else idx, 0), self._len), self._store.new_row(value)))
+
+    def append(self, value: COCO_Annotation):
+        if self._len == len(self._rows):
+            grown = np.empty(max(2 * len(self._rows), 16), dtype=np.int64)
+            grown[:self._len] = self.rows
+            self._rows = grown
+        self._rows[self._len] = self._store.new_row(value)
+        self._len += 1
+
+    def __iter__(self):
+        idx = 0
+        while idx < self._len:
+            row = int(self._rows[idx])
+            if row not in self._store.objs:
+                # Materialize ahead in blocks, which is much faster than one row at a time.
+                self._store.prefetch(self.rows[idx:idx+_prefetch_size].tolist())
+            yield self._store.get(row)
+            idx += 1
+
+    def __add__(self, other) -> List[COCO_Annotation]:
+        return list(self) + list(other)
+
+    def __radd__(self, other) -> List[COCO_Annotation]:
+        return list(other) + list(self)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (list, COCO_Annotation_Columns)):
+            return NotImplemented
+        return len(self) == len(other) and all([obj0 == obj1 for obj0, obj1 in zip(self, other)])
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}(len={self._len})'
+
+    def _set_rows(self, rows: np.ndarray):
+        self._rows = rows
+        self._len = len(rows)
+
+    def copy(self) -> COCO_Annotation_Columns:
+        """Shallow copy, like list.copy(). The contained annotations are shared."""
+        return COCO_Annotation_Columns(self._store, self.rows.copy())
+
+    def deepcopy(self) -> COCO_Annotation_Columns:
+        """
+        Copies the materialized annotations and shares the (never modified in place) arrays,
+        so this is much cheaper than copying every annotation.
+        """
+        store = self._store
+        rows = self.rows.copy()
+        objs = {row: store.objs[row].copy() for row in rows.tolist() if row in store.objs}
+        new_store = _AnnotationStore(
+            ids=store.ids, image_ids=store.image_ids, category_ids=store.category_ids,
+            num_keypoints=store.num_keypoints, iscrowds=store.iscrowds, flags=store.flags, areas=store.areas,
+            bboxes=store.bboxes, kpt_counts=store.kpt_counts, keypoints=store.keypoints,
+            seg_offsets=store.seg_offsets, poly_offsets=store.poly_offsets, coords=store.coords,
+            objs=objs
+        )
+        new_store.next_row = store.next_row
+        return COCO_Annotation_Columns(new_store, rows)
+
+    def sort(self, key=None, reverse: bool=False):
+        objs = list(self)
+        order = sorted(range(self._len), key=(lambda idx: key(objs[idx])) if key is not None else (lambda idx: objs[idx]), reverse=reverse)
+        self._set_rows(self.rows[order])
+
+    def sort_by_column(self, attr_name: str, reverse: bool=False):
+        """Stable sort on one of the integer columns without materializing any annotations."""
+        values = self.get_column(attr_name)
+        self._set_rows(self.rows[np.argsort(-values if reverse else values, kind='stable')])
+
+    def permute(self, order: List[int]):
+        """Rearranges the annotations so that the annotation at position order[i] moves to position i."""
+        self._set_rows(self.rows[np.asarray(order, dtype=np.int64)])
+
+    def _materialized_positions(self) -> np.ndarray:
+        objs = self._store.objs
+        if len(objs) == 0:
+            return np.empty(0, dtype=np.int64)
+        obj_rows = np.fromiter(objs.keys(), dtype=np.int64, count=len(objs))
+        return np.nonzero(np.isin(self.rows, obj_rows))[0]
+
+    def get_column(self, attr_name: str) -> np.ndarray:
+        """
+        Returns the values of one attribute for every annotation in order, without materializing any annotations.
+
+        attr_name: One of 'id', 'image_id', 'category_id', 'num_keypoints', 'num_visible_keypoints', 'area' or 'bbox'.
+                   'num_visible_keypoints' counts the keypoints with a visibility greater than 0.
+                   'area' is NaN where the area is None.
+                   'bbox' is an (N, 4) array of xmin, ymin, xmax, ymax.
+        """
+        store = self._store
+        rows = self.rows
+        in_store = rows < store.num_rows
+        if attr_name == 'num_visible_keypoints':
+            # The keypoint array is zero padded, so padding never counts as visible.
+            source = None
+            result = np.zeros(self._len, dtype=np.int64)
+            result[in_store] = (store.keypoints[rows[in_store], :, 2] > 0).sum(axis=1)
+        elif attr_name in _int_columns:
+            source = {'id': store.ids, 'image_id': store.image_ids, 'category_id': store.category_ids, 'num_keypoints': store.num_keypoints}[attr_name]
+            result = np.zeros(self._len, dtype=np.int64)
+        elif attr_name == 'area':
+            source = store.areas
+            result = np.full(self._len, np.nan, dtype=np.float64)
+        elif attr_name == 'bbox':
+            source = store.bboxes
+            result = np.zeros((self._len, 4), dtype=np.float64)
+        else:
+            logger.error(f'Invalid attr_name: {attr_name}')
+            logger.error(f"Valid attr_name: {_int_columns + ['num_visible_keypoints', 'area', 'bbox']}")
+            raise Exception
+        if source is not None:
+            result[in_store] = source[rows[in_store]]
+
+        positions = self._materialized_positions()
+        if len(positions) == 0:
+            return result
+        values = []
+        for row in rows[positions].tolist():
+            obj = store.objs[row]
+            if attr_name == 'bbox':
+                values.append(obj.bbox.to_list())
+            elif attr_name == 'area':
+                values.append(obj.area if obj.area is not None else np.nan)
+            elif attr_name == 'num_visible_keypoints':
+                values.append(sum([kpt.visibility > 0 for kpt in obj.keypoints]))
+            else:
+                values.append(getattr(obj, attr_name))
+        if attr_name in _int_columns and not _all_int(values):
+            result = result.astype(object)
+        result[positions] = values
+        return result
+
+    def iter_dicts(self, strict: bool=True) -> Iterator[dict]:
+        for row in self.rows.tolist():
+            yield self._store.row_to_dict(row, strict=strict)
+
+    def to_dict_list(self, strict: bool=True) -> List[dict]:
+        return list(self.iter_dicts(strict=strict))
+
+    def iter_readonly(self, positions: List[int]=None) -> Iterator[COCO_Annotation]:
+        """
+        Iterates over the annotations (or only the ones at the given positions) without keeping the objects that have to be created,
+        so that a read-only pass doesn't materialize the whole container.
+        Annotations that were already materialized are yielded as they are. Changes made to the others are lost.
+        """
+        rows = self.rows if positions is None else self.rows[np.asarray(positions, dtype=np.int64)]
+        rows = rows.tolist()
+        objs = self._store.objs
+        for start in range(0, len(rows), _prefetch_size):
+            block = rows[start:start+_prefetch_size]
+            pending = [row for row in block if row not in objs]
+            created = dict(zip(pending, self._store.materialize_rows(pending))) if len(pending) > 0 else {}
+            for row in block:
+                obj = objs.get(row, None)
+                yield obj if obj is not None else created[row]
+
+    def flush(self):
+        """
+        Packs every materialized annotation back into the arrays and releases the objects.
+        References to annotations that were obtained before calling flush are no longer linked to this container.
+        """
+        encoder = _ColumnEncoder()
+        store = self._store
+        for row in self.rows.tolist():
+            obj = store.objs.get(row, None)
+            if obj is None:
+                encoder.add_dict(store.row_to_dict(row, strict=True), strict=True)
+            else:
+                encoder.add_object(obj)
+        self._store = encoder.to_store()
+        self._set_rows(np.arange(self._store.num_rows, dtype=np.int64))
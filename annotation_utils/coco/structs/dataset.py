@@ -1,6 +1,7 @@
 from __future__ import annotations
-from typing import List, Dict
-import json
+from typing import List, Dict, Any, Iterator, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 import cv2
 import numpy as np
 from tqdm import tqdm
@@ -11,8 +12,7 @@ from common_utils.check_utils import check_required_keys, check_file_exists, \
     check_dir_exists, check_value, check_type_from_list, check_type, \
     check_value_from_list
 from common_utils.file_utils import file_exists, make_dir_if_not_exists, \
-    get_dir_contents_len, delete_all_files_in_dir, copy_file, create_softlink
-from common_utils.adv_file_utils import get_next_dump_path
+    get_dir_contents_len, delete_all_files_in_dir
 from common_utils.path_utils import get_filename, get_dirpath_from_filepath, \
     get_extension_from_path, rel_to_abs_path, find_moved_abs_path, \
     get_extension_from_filename
@@ -29,16 +29,471 @@ from common_utils.image_utils import scale_to_max, pad_to_max
 from common_utils.base.basic import BasicLoadableObject, BasicLoadableHandler, BasicHandler
 
 from .objects import COCO_Info
+from .cache import COCO_Cache
 from .handlers import COCO_License_Handler, COCO_Image_Handler, \
     COCO_Annotation_Handler, COCO_Category_Handler, \
     COCO_License, COCO_Image, COCO_Annotation, COCO_Category
 from ..camera import Camera
 
-from .misc import KeypointGroup
+from .misc import KeypointGroup, get_points_within_bounds, get_bounds_containing
 from ...labelme.structs import LabelmeAnnotationHandler, LabelmeAnnotation, LabelmeShapeHandler, LabelmeShape
-from ..util import COCO_Mapper_Handler
+from ..util import COCO_Mapper_Handler, ID_Mapper
+from ...util.json_stream import iter_json_object, JSON_StreamWriter, atomic_write, round_floats, \
+    load_json, dump_json
+from ...util.path_check import check_files_exist
+from ...util.file_transfer import transfer_files, TRANSFER_MODES
+from ...util.naming import DumpPathAllocator
+from ...util.parallel import imap_ordered, BackgroundWriter
+from ...util.image_probe import probe_image
+from ...util.image_meta_cache import ImageMetadataCache
 from ...dataset.config import DatasetConfigCollectionHandler, DatasetConfigCollection, DatasetConfig
-from ...ndds.structs import NDDS_Dataset, CameraConfig
+from ...ndds.structs import NDDS_Dataset, NDDS_Frame, CameraConfig, InstanceImageDecoder
+from ...ndds.structs.settings import CameraSettings
+
+def _load_dataset_for_combine(ann_path: str, img_dir: str, img_sort_attr_name: str=None) -> COCO_Dataset:
+    # Module level so that it can be sent to a process pool.
+    dataset = COCO_Dataset.load_from_path(json_path=ann_path, img_dir=img_dir, check_paths=True)
+    if img_sort_attr_name is not None:
+        dataset.images.sort(attr_name=img_sort_attr_name)
+    return dataset
+
+def _convert_labelme_ann(
+    labelme_ann: LabelmeAnnotation, categories: COCO_Category_Handler,
+    category_names: List[str], keypoint_names: List[str], img_dir: str=None,
+    remove_redundant: bool=True, ensure_no_unbounded_kpts: bool=True,
+    ensure_valid_shape_type: bool=True, ignore_unspecified_categories: bool=False,
+    img_meta_cache: ImageMetadataCache=None
+) -> Tuple[COCO_Image, List[COCO_Annotation]]:
+    # Converts a single labelme annotation for COCO_Dataset.from_labelme.
+    # Module level so that it can be sent to a process pool.
+    # Returns (None, []) if nothing in the image belongs to one of the categories.
+    img_filename = get_filename(labelme_ann.img_path)
+    if img_dir is not None:
+        img_path = f'{img_dir}/{img_filename}'
+    else:
+        img_path = labelme_ann.img_path
+    check_file_exists(img_path)
+
+    kpt_label2points_list = {}
+    bound_group_list = []
+    poly_list = []
+    poly_label_list = []
+    bbox_list = []
+    bbox_label_list = []
+
+    if ensure_valid_shape_type:
+        for shape in labelme_ann.shapes:
+            check_value(shape.shape_type, valid_value_list=['point', 'polygon', 'rectangle'])
+
+    # Gather all segmentations
+    for shape in labelme_ann.shapes:
+        if shape.shape_type == 'polygon':
+            if shape.label not in category_names:
+                if ignore_unspecified_categories:
+                    continue
+                else:
+                    logger.error(f'shape.label={shape.label} does not exist in provided categories.')
+                    logger.error(f'category_names: {category_names}')
+                    logger.error(f'Image directory: {img_dir}')
+                    logger.error(f'Image filename: {img_filename}')
+                    raise Exception
+            poly_list.append(
+                Polygon.from_point2d_list(shape.points)
+            )
+            poly_label_list.append(shape.label)
+    # Gather all bounding boxes
+    for shape in labelme_ann.shapes:
+        if shape.shape_type == 'rectangle':
+            if shape.label not in category_names:
+                if ignore_unspecified_categories:
+                    continue
+                else:
+                    logger.error(f'shape.label={shape.label} does not exist in provided categories.')
+                    logger.error(f'category_names: {category_names}')
+                    logger.error(f'Image directory: {img_dir}')
+                    logger.error(f'Image filename: {img_filename}')
+                    raise Exception
+            bbox_list.append(
+                BBox.from_point2d_list(shape.points)
+            )
+            bbox_label_list.append(shape.label)
+    if remove_redundant:
+        # Remove segmentation/bbox redundancies.
+        # The containment tests are done in one batch, and the removal replays the original pairwise loops,
+        # which skip the item right after each removed one.
+        poly_contains_bbox = get_bounds_containing(poly_list, bbox_list)
+        bbox_idx_list = list(range(len(bbox_list)))
+        for poly_idx in range(len(poly_list)):
+            i = 0
+            while i < len(bbox_idx_list):
+                if poly_contains_bbox[poly_idx, bbox_idx_list[i]]:
+                    del bbox_idx_list[i]
+                i += 1
+        bbox_list = [bbox_list[idx] for idx in bbox_idx_list]
+        bbox_label_list = [bbox_label_list[idx] for idx in bbox_idx_list]
+        bbox_contains_poly = get_bounds_containing(bbox_list, poly_list)
+        poly_idx_list = list(range(len(poly_list)))
+        for bbox_idx in range(len(bbox_list)):
+            i = 0
+            while i < len(poly_idx_list):
+                if bbox_contains_poly[bbox_idx, poly_idx_list[i]]:
+                    del poly_idx_list[i]
+                i += 1
+        poly_list = [poly_list[idx] for idx in poly_idx_list]
+        poly_label_list = [poly_label_list[idx] for idx in poly_idx_list]
+    # Gather all keypoints
+    for shape in labelme_ann.shapes:
+        if shape.shape_type == 'point':
+            if shape.label not in keypoint_names:
+                if ignore_unspecified_categories:
+                    continue
+                else:
+                    logger.error(f'shape.label={shape.label} does not exist in provided category keypoints.')
+                    logger.error(f'keypoint_names: {keypoint_names}')
+                    logger.error(f'Image directory: {img_dir}')
+                    logger.error(f'Image filename: {img_filename}')
+                    raise Exception
+            if shape.label not in kpt_label2points_list:
+                kpt_label2points_list[shape.label] = [shape.points[0]]
+            else:
+                kpt_label2points_list[shape.label].append(shape.points[0])
+
+    # Test all keypoints against all polygons and bounding boxes at once.
+    # The keypoints are laid out label by label, so for every label, the first unassigned keypoint inside of a bound
+    # is also the first one in kpt_label2points_list[label].
+    kpt_list = [kpt for kpt_list in kpt_label2points_list.values() for kpt in kpt_list]
+    kpt_label_list = [label for label, kpt_list in kpt_label2points_list.items() for kpt in kpt_list]
+    bound_list = poly_list + bbox_list
+    bound_label_list = poly_label_list + bbox_label_list
+    kpt_within_bound = get_points_within_bounds(kpt_list, bound_list)
+    unassigned = np.ones(len(kpt_list), dtype=bool)
+
+    # Group keypoints inside of polygon bounds, and then inside of bbox bounds
+    postponed_kpts = []
+    postponed_labels = []
+    for bound_idx, (bound_obj, bound_label) in enumerate(zip(bound_list, bound_label_list)):
+        coco_cat = categories.get_unique_category_from_name(bound_label)
+        bound_group = KeypointGroup(bound_obj=bound_obj, coco_cat=coco_cat)
+        # Register the first unassigned keypoint of each label inside of the bound
+        registered_labels = set()
+        for kpt_idx in np.flatnonzero(kpt_within_bound[bound_idx] & unassigned).tolist():
+            kpt, label = kpt_list[kpt_idx], kpt_label_list[kpt_idx]
+            if label in registered_labels or label not in coco_cat.keypoints:
+                continue
+            bound_group.register(kpt=Keypoint2D(point=kpt, visibility=2), label=label, strict=False)
+            registered_labels.add(label)
+            unassigned[kpt_idx] = False
+            if kpt in postponed_kpts:
+                postponed_idx = postponed_kpts.index(kpt)
+                del postponed_kpts[postponed_idx]
+                del postponed_labels[postponed_idx]
+        postponed_kpts.extend(bound_group.postponed_kpt_list)
+        postponed_labels.extend(bound_group.postponed_kpt_label_list)
+        bound_group_list.append(bound_group)
+    kpt_label2points_list = {}
+    for kpt_idx in np.flatnonzero(unassigned).tolist():
+        kpt_label2points_list.setdefault(kpt_label_list[kpt_idx], []).append(kpt_list[kpt_idx])
+
+    if len(postponed_kpts) > 0 and ensure_no_unbounded_kpts:
+        logger.error(f'Unresolved postponed_kpts: {postponed_kpts}')
+        logger.error(f'Unresolved postponed_labels: {postponed_labels}')
+        logger.error(f'Image directory: {img_dir}')
+        logger.error(f'Image filename: {img_filename}')
+        raise Exception
+
+    if ensure_no_unbounded_kpts:
+        # Ensure that there are no leftover keypoints that are unbounded.
+        # (This case often results from mistakes during annotation creation.)
+        if len(kpt_label2points_list) > 0:
+            logger.error(f'The following keypoints were left unbounded:\n{kpt_label2points_list}')
+            logger.error(f'Image directory: {img_dir}')
+            logger.error(f'Image filename: {img_filename}')
+            raise Exception
+
+    if len(bound_group_list) == 0:
+        return None, []
+    # The image and annotation ids are assigned when the results are merged.
+    coco_image = COCO_Image(
+        license_id=0,
+        file_name=get_filename(img_path),
+        coco_url=img_path,
+        height=labelme_ann.img_h,
+        width=labelme_ann.img_w,
+        date_captured=img_meta_cache.get_ctime(img_path) if img_meta_cache is not None else get_ctime(img_path),
+        flickr_url=None,
+        id=-1
+    )
+
+    # Make segmentation and/or bbox annotations together with bounded keypoints
+    coco_ann_list = []
+    for bound_group in bound_group_list:
+        keypoints = Keypoint2D_List()
+        for label in bound_group.coco_cat.keypoints:
+            label_found = False
+            for kpt, kpt_label in zip(bound_group.kpt_list, bound_group.kpt_label_list):
+                if kpt_label == label:
+                    label_found = True
+                    keypoints.append(kpt)
+                    break
+            if not label_found:
+                keypoints.append(Keypoint2D.from_list([0, 0, 0]))
+        if type(bound_group.bound_obj) is Polygon:
+            bbox = bound_group.bound_obj.to_bbox()
+            coco_ann_list.append(
+                COCO_Annotation(
+                    segmentation=Segmentation(polygon_list=[bound_group.bound_obj]),
+                    num_keypoints=len(bound_group.coco_cat.keypoints),
+                    area=bbox.to_float().area(),
+                    iscrowd=0,
+                    keypoints=keypoints,
+                    image_id=-1,
+                    bbox=bbox.to_float(),
+                    category_id=bound_group.coco_cat.id,
+                    id=-1
+                )
+            )
+        elif type(bound_group.bound_obj) is BBox:
+            coco_ann_list.append(
+                COCO_Annotation(
+                    segmentation=Segmentation(polygon_list=[]),
+                    num_keypoints=len(bound_group.coco_cat.keypoints),
+                    area=bound_group.bound_obj.to_float().area(),
+                    iscrowd=0,
+                    keypoints=keypoints,
+                    image_id=-1,
+                    bbox=bound_group.bound_obj.to_float(),
+                    category_id=bound_group.coco_cat.id,
+                    id=-1
+                )
+            )
+        else:
+            raise Exception
+    return coco_image, coco_ann_list
+
+def _convert_ndds_frame(
+    frame: NDDS_Frame, categories: COCO_Category_Handler, camera_settings: CameraSettings,
+    naming_rule: str='type_object_instance_contained', delimiter: str='_',
+    ignore_unspecified_categories: bool=False,
+    bbox_area_threshold: float=10,
+    default_visibility_threshold: float=0.10,
+    visibility_threshold_dict: Dict[str, float]={},
+    min_visibile_kpts: int=None,
+    color_interval: int=1,
+    exclude_invalid_polygons: bool=True,
+    allow_unfound_seg: bool=False,
+    allow_same_instance_for_contained: bool=False,
+    class_merge_map: Dict[str, str]=None,
+    show_pbar: bool=False,
+    img_meta_cache: ImageMetadataCache=None
+) -> Tuple[COCO_Image, List[COCO_Annotation]]:
+    # Converts a single NDDS frame for COCO_Dataset.from_ndds.
+    # Module level so that it can be sent to a process pool.
+    # Define Camera
+    camera = Camera(
+        f=[camera_settings.intrinsic_settings.fx, camera_settings.intrinsic_settings.fy],
+        c=[camera_settings.intrinsic_settings.cx, camera_settings.intrinsic_settings.cy],
+        T=frame.ndds_ann.camera_data.location_worldframe.to_list()
+    )
+
+    # Load Image Handler
+    check_file_exists(frame.img_path)
+    # Only the size is needed, so the image is probed instead of decoded. cv2.imread would always load 3 channels.
+    img_info = img_meta_cache.get(frame.img_path) if img_meta_cache is not None else probe_image(frame.img_path)
+    img_h, img_w = img_info.height, img_info.width
+    img_shape = (img_h, img_w, 3)
+    if img_shape != camera_settings.captured_image_size.shape():
+        logger.error(f'img.shape == {img_shape} != {camera_settings.captured_image_size.shape()} == camera_settings.captured_image_size.shape()')
+        logger.error(f'frame.img_path: {frame.img_path}')
+        raise Exception
+    # The image and annotation ids are assigned when the results are merged.
+    coco_image = COCO_Image(
+        license_id=0,
+        file_name=get_filename(frame.img_path),
+        coco_url=frame.img_path,
+        height=img_h,
+        width=img_w,
+        date_captured=img_info.ctime if img_meta_cache is not None else get_ctime(frame.img_path),
+        flickr_url=None,
+        id=-1
+    )
+    coco_ann_list = []
+
+    # Load Instance Image
+    if class_merge_map is None:
+        check_file_exists(frame.is_img_path)
+        instance_img = cv2.imread(frame.is_img_path)
+        exclude_classes = []
+    else:
+        instance_img = frame.get_merged_is_img(class_merge_map=class_merge_map)
+        exclude_classes = list(class_merge_map.keys())
+    # Decoded on the first segmentation and then shared by all of the instances in the frame.
+    decoder = None
+
+    organized_handler = frame.to_labeled_obj_handler(
+        naming_rule=naming_rule, delimiter=delimiter, exclude_classes=exclude_classes,
+        allow_same_instance_for_contained=allow_same_instance_for_contained, show_pbar=show_pbar
+    )
+    for labeled_obj in organized_handler:
+        specified_category_names = [cat.name for cat in categories]
+        if labeled_obj.obj_name not in specified_category_names:
+            if ignore_unspecified_categories:
+                continue
+            else:
+                logger.error(f'Found an NDDS Object name ({labeled_obj.obj_name}) that does not exist in the specified categories.')
+                logger.error(f'specified_category_names: {specified_category_names}')
+                logger.error(f'frame.img_path: {frame.img_path}')
+                logger.error(f'Hint: Use ignore_unspecified_categories=True to bypass this check.')
+                raise Exception
+        coco_cat = categories.get_unique_category_from_name(labeled_obj.obj_name)
+
+        partitioned_coco_instances = {}
+        for instance in labeled_obj.instances:
+            # Get Segmentation, BBox, and Keypoints
+            if labeled_obj.obj_name in visibility_threshold_dict.keys():
+                if instance.ndds_ann_obj.visibility < visibility_threshold_dict[labeled_obj.obj_name]:
+                    continue
+            else:
+                if instance.ndds_ann_obj.visibility < default_visibility_threshold:
+                    continue
+
+            if instance.instance_type == 'seg':
+                if decoder is None:
+                    decoder = InstanceImageDecoder(instance_img)
+                seg = instance.get_segmentation(
+                    instance_img=instance_img, color_interval=color_interval,
+                    is_img_path=frame.is_img_path,
+                    exclude_invalid_polygons=exclude_invalid_polygons,
+                    allow_unfound_seg=allow_unfound_seg,
+                    decoder=decoder
+                )
+                if len(seg) == 0:
+                    continue
+                bbox = seg.to_bbox()
+            elif instance.instance_type == 'bbox':
+                seg = Segmentation()
+                bbox = instance.ndds_ann_obj.bounding_box.copy()
+                bbox = bbox.clip_at_bounds(frame_shape=img_shape[:2])
+                bbox.check_bbox_in_frame(frame_shape=img_shape[:2])
+            elif instance.instance_type == 'kpt':
+                logger.error(f"'kpt' can only be used as a contained instance and not as a container instance")
+                logger.error(f'instance:\n{instance}')
+                raise Exception
+            else:
+                logger.error(f'Invalid instance.instance_type: {instance.instance_type}')
+                logger.error(f'instance:\n{instance}')
+                raise Exception
+
+            if bbox.area() < bbox_area_threshold:
+                continue
+
+            kpts_2d, kpts_3d = instance.get_keypoints(kpt_labels=coco_cat.keypoints)
+            visible_kpt_count = sum([kpt.visibility == 2 for kpt in kpts_2d])
+            if min_visibile_kpts is not None and visible_kpt_count < min_visibile_kpts:
+                continue
+
+            # Construct COCO Annotation
+            coco_ann = COCO_Annotation(
+                id=-1,
+                category_id=coco_cat.id,
+                image_id=-1,
+                segmentation=seg,
+                bbox=bbox,
+                area=bbox.area(),
+                keypoints=kpts_2d,
+                num_keypoints=len(kpts_2d),
+                iscrowd=0,
+                keypoints_3d=kpts_3d,
+                camera=camera
+            )
+            if instance.part_num is None:
+                coco_ann_list.append(coco_ann)
+            else:
+                if instance.instance_name not in partitioned_coco_instances:
+                    partitioned_coco_instances[instance.instance_name] = [{'coco_ann': coco_ann, 'part_num': instance.part_num}]
+                else:
+                    existing_part_numbers = [item['part_num'] for item in partitioned_coco_instances[instance.instance_name]]
+                    if instance.part_num not in existing_part_numbers:
+                        partitioned_coco_instances[instance.instance_name].append({'coco_ann': coco_ann, 'part_num': instance.part_num})
+                    else:
+                        logger.error(f'instance.part_num already exists in existing_part_numbers for instance.instance_name={instance.instance_name}')
+                        logger.error(f'instance.part_num: {instance.part_num}')
+                        logger.error(f'existing_part_numbers: {existing_part_numbers}')
+                        logger.error(f"Please check your NDDS annotation json to make sure that you don't have any duplicate part_num!=None instances.")
+                        raise Exception
+
+        for instance_name, partitioned_items in partitioned_coco_instances.items():
+            working_seg = Segmentation()
+            working_bbox = None
+            first_coco_ann = partitioned_items[0]['coco_ann']
+            first_coco_ann = COCO_Annotation.buffer(first_coco_ann)
+            for partitioned_item in partitioned_items:
+                coco_ann = partitioned_item['coco_ann']
+                coco_ann = COCO_Annotation.buffer(coco_ann)
+                working_seg = working_seg + coco_ann.segmentation
+                if working_bbox is None:
+                    working_bbox = coco_ann.bbox
+                else:
+                    working_bbox = working_bbox + coco_ann.bbox
+            coco_ann_list.append(
+                COCO_Annotation(
+                    id=-1,
+                    category_id=coco_cat.id,
+                    image_id=-1,
+                    segmentation=working_seg,
+                    bbox=working_bbox,
+                    area=working_bbox.area(),
+                    keypoints=first_coco_ann.keypoints,
+                    num_keypoints=first_coco_ann.num_keypoints,
+                    iscrowd=first_coco_ann.iscrowd,
+                    keypoints_3d=first_coco_ann.keypoints_3d,
+                    camera=first_coco_ann.camera
+                )
+            )
+    return coco_image, coco_ann_list
+
+# Set in every process of the COCO_Dataset.save_visualization and save_video pools by _init_vis_worker.
+_vis_dataset = None # type: COCO_Dataset
+_vis_preview_kwargs = None # type: Dict[str, Any]
+
+def _init_vis_worker(dataset: COCO_Dataset, preview_kwargs: Dict[str, Any]):
+    # The dataset is sent to each process once, instead of with every image.
+    global _vis_dataset, _vis_preview_kwargs
+    _vis_dataset = dataset
+    _vis_preview_kwargs = preview_kwargs
+
+def _save_vis_image(task: Tuple[int, str, bool]) -> np.ndarray:
+    # Renders and saves a single image for COCO_Dataset.save_visualization.
+    # preview_kwargs is None when the annotations aren't drawn.
+    image_id, save_path, return_img = task
+    if _vis_preview_kwargs is not None:
+        img = _vis_dataset.get_preview(image_id=image_id, **_vis_preview_kwargs)
+    else:
+        img = cv2.imread(_vis_dataset.images.get_obj_from_id(image_id).coco_url)
+    cv2.imwrite(save_path, img)
+    return img if return_img else None
+
+def _render_video_frame(
+    dataset: COCO_Dataset, preview_kwargs: Dict[str, Any], image_id: int, img: np.ndarray,
+    max_h: int, max_w: int, rescale_before_pad: bool
+) -> np.ndarray:
+    # Draws, rescales and pads a single frame for COCO_Dataset.save_video.
+    # img is read from coco_url if it is None.
+    if preview_kwargs is not None:
+        img = dataset.get_preview(image_id=image_id, img=img, **preview_kwargs)
+    elif img is None:
+        img = cv2.imread(dataset.images.get_obj_from_id(image_id).coco_url)
+    if rescale_before_pad:
+        img = scale_to_max(img=img, target_shape=[max_h, max_w])
+    return pad_to_max(img=img, target_shape=[max_h, max_w])
+
+def _render_video_frame_in_worker(task: Tuple[int, int, int, bool]) -> np.ndarray:
+    # Process pool version of _render_video_frame. The image is read in the worker,
+    # since sending a decoded image to a process costs more than decoding it there.
+    image_id, max_h, max_w, rescale_before_pad = task
+    return _render_video_frame(
+        _vis_dataset, _vis_preview_kwargs, image_id=image_id, img=None,
+        max_h=max_h, max_w=max_w, rescale_before_pad=rescale_before_pad
+    )
 
 class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
     """
@@ -166,9 +621,12 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
         }
 
     @classmethod
-    def from_dict(cls, dataset_dict: dict, strict: bool=True) -> COCO_Dataset:
+    def from_dict(cls, dataset_dict: dict, strict: bool=True, columnar: bool=False) -> COCO_Dataset:
         """
         Converts a coco dataset dictionary (the standard COCO format) to a COCO_Dataset class object.
+
+        columnar: If True, the annotations are stored in NumPy arrays and COCO_Annotation objects are only
+                  created when they are accessed. Refer to COCO_Annotation_Columns.
         """
         check_required_keys(
             dataset_dict,
@@ -181,7 +639,7 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
             info=COCO_Info.from_dict(dataset_dict['info']),
             licenses=COCO_License_Handler.from_dict_list(dataset_dict['licenses']),
             images=COCO_Image_Handler.from_dict_list(dataset_dict['images']),
-            annotations=COCO_Annotation_Handler.from_dict_list(dataset_dict['annotations'], strict=strict),
+            annotations=COCO_Annotation_Handler.from_dict_list(dataset_dict['annotations'], strict=strict, columnar=columnar),
             categories=COCO_Category_Handler.from_dict_list(dataset_dict['categories'], strict=strict)
         )
 
@@ -207,7 +665,8 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
         self, dst_img_dir: str,
         softlink: bool=False,
         preserve_filenames: bool=False, overwrite_duplicates: bool=False, update_img_paths: bool=True,
-        overwrite: bool=False, show_pbar: bool=True
+        overwrite: bool=False, show_pbar: bool=True, transfer_mode: str=None, workers: int=8,
+        filename_pattern: str='{:06d}'
     ):
         """
         Combines all image directories specified in the coco_url of each coco image in self.images
@@ -222,8 +681,15 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
         update_img_paths: If True, all coco_url paths specified in self.images will be updated to reflect the new
                           combined image directory.
         overwrite: If True, all files in dst_img_dir will be deleted before copying images into the folder.
+        transfer_mode: One of 'copy', 'hardlink', 'reflink' or 'symlink'. See transfer_files for details.
+                       Defaults to 'symlink' if softlink=True and 'copy' otherwise.
+        workers: The number of images that are copied/linked at the same time.
+        filename_pattern: Only applicable when preserve_filenames=False.
+                          Format string of the generated filenames (without the extension), e.g. 'frame_{:05d}'.
         """
-        mode_str = 'copy' if not softlink else 'link'
+        if transfer_mode is None:
+            transfer_mode = 'copy' if not softlink else 'symlink'
+        check_value(transfer_mode, valid_value_list=TRANSFER_MODES)
         used_img_dir_list = []
         for coco_image in self.images:
             used_img_dir = get_dirpath_from_filepath(coco_image.coco_url)
@@ -245,22 +711,19 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
                 logger.error('Please use overwrite=True if you would like to delete the contents before proceeding.')
                 raise Exception
 
-        pbar = tqdm(total=len(self.images), unit='image(s)') if show_pbar else None
-        if pbar is not None:
-            pbar.set_description(f'Moving Images...')
+        # Decide where every image goes before transferring anything.
+        dst2src = {}
+        dst_img_path_list = []
+        path_allocator = DumpPathAllocator(dump_dir=dst_img_dir, pattern=filename_pattern)
         for coco_image in self.images:
             if not preserve_filenames:
                 img_extension = get_extension_from_path(coco_image.coco_url)
-                dst_img_path = get_next_dump_path(
-                    dump_dir=dst_img_dir,
-                    file_extension=img_extension
-                )
-                dst_img_path = rel_to_abs_path(dst_img_path)
+                dst_img_path = rel_to_abs_path(path_allocator.next_path(file_extension=img_extension))
             else:
                 img_filename = get_filename(coco_image.coco_url)
                 dst_img_path = f'{dst_img_dir}/{img_filename}'
-                if file_exists(dst_img_path) and not overwrite_duplicates:
-                    logger.error(f'Failed to {mode_str} {coco_image.coco_url} to {dst_img_dir}')
+                if dst_img_path in dst2src and not overwrite_duplicates:
+                    logger.error(f'Failed to {transfer_mode} {coco_image.coco_url} to {dst_img_dir}')
                     logger.error(f'{img_filename} already exists in destination directory.')
                     logger.error(f'Hint: In order to use preserve_filenames=True, all filenames in the dataset must be unique.')
                     logger.error(
@@ -268,33 +731,119 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
                         f' in order to automatically assign the destination filename.'
                     )
                     raise Exception
-            if not softlink:
-                copy_file(src_path=coco_image.coco_url, dest_path=dst_img_path, silent=True)
-            else:
-                create_softlink(src_path=rel_to_abs_path(coco_image.coco_url), dst_path=rel_to_abs_path(dst_img_path))
-            if update_img_paths:
+            # With overwrite_duplicates=True, the last image with a given filename is the one that ends up in dst_img_dir.
+            dst2src[dst_img_path] = coco_image.coco_url
+            dst_img_path_list.append(dst_img_path)
+
+        transfer_files(
+            src_paths=list(dst2src.values()), dst_paths=list(dst2src.keys()), mode=transfer_mode,
+            workers=workers, show_pbar=show_pbar, desc='Moving Images...'
+        )
+        if update_img_paths:
+            for coco_image, dst_img_path in zip(self.images, dst_img_path_list):
                 coco_image.coco_url = dst_img_path
                 coco_image.file_name = get_filename(dst_img_path)
-            if pbar is not None:
-                pbar.update(1)
-        if pbar is not None:
-            pbar.close()
 
-    def save_to_path(self, save_path: str, overwrite: bool=False, strict: bool=True):
+    def save_to_path(self, save_path: str, overwrite: bool=False, strict: bool=True, compact: bool=False, precision: int=None):
         """
         Save this COCO_Dataset object to a json file in the standard COCO format.
+        Images and annotations are serialized one record at a time straight to the file,
+        and the file is only moved to save_path once it has been written completely.
         
         save_path: Path of where you would like to save the dataset.
         overwrite: If True, any existing file that exists at save_path will be overwritten.
+        compact: If True, the json is written without any indentation or whitespace.
+                 This makes the file much smaller and faster to write.
+        precision: If not None, the floats in every bbox, segmentation and keypoints are rounded to this many decimal places.
         """
         if file_exists(save_path) and not overwrite:
             logger.error(f'File already exists at save_path: {save_path}')
             raise Exception
-        json_dict = self.to_dict(strict=strict)
-        json.dump(json_dict, open(save_path, 'w'), indent=2, ensure_ascii=False)
+
+        def annotation_dicts():
+            for ann_dict in self.annotations.iter_dicts(strict=strict):
+                if precision is not None:
+                    for key in ['bbox', 'segmentation', 'keypoints']:
+                        if key in ann_dict:
+                            ann_dict[key] = round_floats(ann_dict[key], precision)
+                yield ann_dict
+
+        with atomic_write(save_path) as f:
+            JSON_StreamWriter(f, indent=None if compact else 2).write_object(
+                [
+                    ('info', self.info.to_dict()),
+                    ('licenses', self.licenses.to_dict_list()),
+                    ('images', (coco_image.to_dict() for coco_image in self.images)),
+                    ('annotations', annotation_dicts()),
+                    ('categories', self.categories.to_dict_list(strict=strict))
+                ],
+                stream_keys=['images', 'annotations']
+            )
 
     @classmethod
-    def load_from_path(cls, json_path: str, img_dir: str=None, check_paths: bool=True, strict: bool=True) -> COCO_Dataset:
+    def iter_from_path(cls, json_path: str, strict: bool=True) -> Iterator[Tuple[str, Any]]:
+        """
+        Streams a COCO json file, yielding every record as soon as it has been parsed.
+        Neither the whole file nor the whole dataset is ever held in memory,
+        so this can be used to process datasets that are larger than RAM.
+
+        Yields (key, obj) pairs in file order, where obj is:
+            'info': COCO_Info
+            'licenses': COCO_License
+            'images': COCO_Image
+            'annotations': COCO_Annotation
+            'categories': COCO_Category
+
+            ```python
+            for key, obj in COCO_Dataset.iter_from_path('/path/to/coco.json'):
+                if key == 'annotations':
+                    ...
+            ```
+        """
+        for key, value in iter_json_object(json_path, stream_keys=['licenses', 'images', 'annotations', 'categories']):
+            if key == 'info':
+                yield key, COCO_Info.from_dict(value)
+            elif key == 'licenses':
+                for license_dict in value:
+                    yield key, COCO_License.from_dict(license_dict)
+            elif key == 'images':
+                for image_dict in value:
+                    yield key, COCO_Image.from_dict(image_dict)
+            elif key == 'annotations':
+                for ann_dict in value:
+                    yield key, COCO_Annotation.from_dict(ann_dict, strict=strict)
+            elif key == 'categories':
+                for cat_dict in value:
+                    yield key, COCO_Category.from_dict(cat_dict, strict=strict)
+
+    @classmethod
+    def _stream_from_path(cls, json_path: str, strict: bool=True, columnar: bool=False) -> COCO_Dataset:
+        sections = {}
+        for key, value in iter_json_object(json_path, stream_keys=['licenses', 'images', 'annotations', 'categories']):
+            if key == 'info':
+                sections[key] = COCO_Info.from_dict(value)
+            elif key == 'licenses':
+                sections[key] = COCO_License_Handler.from_dict_list(value)
+            elif key == 'images':
+                sections[key] = COCO_Image_Handler.from_dict_list(value)
+            elif key == 'annotations':
+                sections[key] = COCO_Annotation_Handler.from_dict_list(value, strict=strict, columnar=columnar)
+            elif key == 'categories':
+                sections[key] = COCO_Category_Handler.from_dict_list(value, strict=strict)
+        check_required_keys(
+            sections,
+            required_keys=[
+                'info', 'licenses', 'images',
+                'annotations', 'categories'
+            ]
+        )
+        return COCO_Dataset(**sections)
+
+    @classmethod
+    def load_from_path(
+        cls, json_path: str, img_dir: str=None, check_paths: bool=True, strict: bool=True,
+        columnar: bool=False, stream: bool=False, use_cache: bool=False, cache_dir: str=None
+    ) -> COCO_Dataset:
         """
         Loads a COCO_Dataset object from a COCO json file.
 
@@ -304,17 +853,32 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
                  Note: In order to create a dataset that has a unified image directory, use self.move_images
         check_paths: If True, all image paths will be checked as the dataset is loaded.
                      An error will be thrown if the corresponding image files do not exist.
+        columnar: If True, the annotations are stored in NumPy arrays and COCO_Annotation objects are only
+                  created when they are accessed. This uses far less memory for large datasets.
+                  Refer to COCO_Annotation_Columns.
+        stream: If True, the json file is parsed incrementally and each record is converted as soon as it is read,
+                so the raw json data and the loaded dataset never need to be in memory at the same time.
+                Use this for very large annotation files. Refer to iter_from_path if you don't need the whole dataset at once.
+        use_cache: If True, a binary copy of the json file is kept in a sidecar cache and memory-mapped on later loads,
+                   which skips the json parse entirely. The cache is rebuilt whenever the json file changes.
+                   Refer to COCO_Cache.
+        cache_dir: Where to keep the cache when use_cache=True. By default it is kept next to the json file.
         """
         check_file_exists(json_path)
-        json_dict = json.load(open(json_path, 'r'))
-        dataset = COCO_Dataset.from_dict(json_dict, strict=strict)
+        cache = COCO_Cache(json_path, cache_dir=cache_dir) if use_cache else None
+        if cache is not None and (cache.is_valid(strict=strict) or cache.write(strict=strict)):
+            dataset = COCO_Dataset(**cache.load(strict=strict, columnar=columnar))
+        elif stream:
+            dataset = COCO_Dataset._stream_from_path(json_path, strict=strict, columnar=columnar)
+        else:
+            json_dict = load_json(json_path)
+            dataset = COCO_Dataset.from_dict(json_dict, strict=strict, columnar=columnar)
         if img_dir is not None:
             check_dir_exists(img_dir)
             for coco_image in dataset.images:
                 coco_image.coco_url = f'{img_dir}/{coco_image.file_name}'
         if check_paths:
-            for coco_image in dataset.images:
-                check_file_exists(coco_image.coco_url)
+            check_files_exist([coco_image.coco_url for coco_image in dataset.images])
         return dataset
 
     def to_labelme(self, priority: str='seg', show_pbar: bool=True) -> LabelmeAnnotationHandler:
@@ -331,13 +895,17 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
         pbar = tqdm(total=len(self.images), unit='image(s)') if show_pbar else None
         if pbar is not None:
             pbar.set_description('Converting COCO to Labelme')
+        # Group the annotations by image from the image_id column, so that columnar annotations are only read, not kept.
+        img_id2positions = {}
+        for position, image_id in enumerate(self.annotations.get_column('image_id').tolist()):
+            img_id2positions.setdefault(image_id, []).append(position)
         for coco_image in self.images:
             labelme_ann = LabelmeAnnotation(
                 img_path=coco_image.coco_url,
                 img_h=coco_image.height, img_w=coco_image.width,
                 shapes=LabelmeShapeHandler()
             )
-            for coco_ann in self.annotations.get_annotations_from_imgIds([coco_image.id]):
+            for coco_ann in self.annotations.iter_readonly(img_id2positions.get(coco_image.id, [])):
                 coco_cat = self.categories.get_obj_from_id(coco_ann.category_id)
                 bbox_contains_seg = coco_ann.segmentation.within(coco_ann.bbox)
                 if bbox_contains_seg and priority == 'seg':
@@ -386,7 +954,8 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
         ensure_valid_shape_type: bool=True,
         ignore_unspecified_categories: bool=False,
         license_url: str='https://github.com/cm107/annotation_utils/blob/master/LICENSE',
-        license_name: str='MIT License'
+        license_name: str='MIT License',
+        workers: int=None, img_meta_cache: ImageMetadataCache=None
     ) -> COCO_Dataset:
         """
         Used to convert a LabelmeAnnotationHandler object to a COCO_Dataset object.
@@ -401,6 +970,10 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
         ignore_unspecified_categories: If true, all labels that are not specified in categories is ignored.
         license_url: The url of the license that you would like to associate with this converted dataset.
         license_name: The name of the license that is associated with this dataset.
+        workers: If greater than 1, the images are converted in a pool of this many processes.
+                 The results are merged in the order of labelme_handler, so the image and annotation ids are the same as when workers=None.
+        img_meta_cache: If given, the ctime of every image is looked up in this ImageMetadataCache instead of being read from the file,
+                        which saves the work when the same images are converted again.
         """
         dataset = COCO_Dataset.new(description='COCO Dataset converted from Labelme using annotation_utils')
         
@@ -430,206 +1003,43 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
         # Add categories to COCO Dataset
         dataset.categories = categories
 
-        for labelme_ann in labelme_handler:
-            img_filename = get_filename(labelme_ann.img_path)
-            if img_dir is not None:
-                img_path = f'{img_dir}/{img_filename}'
-            else:
-                img_path = labelme_ann.img_path
-            check_file_exists(img_path)
-            
-            kpt_label2points_list = {}
-            bound_group_list = []
-            poly_list = []
-            poly_label_list = []
-            bbox_list = []
-            bbox_label_list = []
-
-            if ensure_valid_shape_type:
-                for shape in labelme_ann.shapes:
-                    check_value(shape.shape_type, valid_value_list=['point', 'polygon', 'rectangle'])
-            
-            # Gather all segmentations
-            for shape in labelme_ann.shapes:
-                if shape.shape_type == 'polygon':
-                    if shape.label not in category_names:
-                        if ignore_unspecified_categories:
-                            continue
-                        else:
-                            logger.error(f'shape.label={shape.label} does not exist in provided categories.')
-                            logger.error(f'category_names: {category_names}')
-                            logger.error(f'Image directory: {img_dir}')
-                            logger.error(f'Image filename: {img_filename}')
-                            raise Exception
-                    poly_list.append(
-                        Polygon.from_point2d_list(shape.points)
-                    )
-                    poly_label_list.append(shape.label)
-            # Gather all bounding boxes
-            for shape in labelme_ann.shapes:
-                if shape.shape_type == 'rectangle':
-                    if shape.label not in category_names:
-                        if ignore_unspecified_categories:
-                            continue
-                        else:
-                            logger.error(f'shape.label={shape.label} does not exist in provided categories.')
-                            logger.error(f'category_names: {category_names}')
-                            logger.error(f'Image directory: {img_dir}')
-                            logger.error(f'Image filename: {img_filename}')
-                            raise Exception
-                    bbox_list.append(
-                        BBox.from_point2d_list(shape.points)
-                    )
-                    bbox_label_list.append(shape.label)
-            if remove_redundant:
-                # Remove segmentation/bbox redundancies
-                for poly in poly_list:
-                    for i, [bbox, bbox_label] in enumerate(zip(bbox_list, bbox_label_list)):
-                        if poly.contains(bbox):
-                            del bbox_list[i]
-                            del bbox_label_list[i]
-                for bbox in bbox_list:
-                    for i, [poly, poly_label] in enumerate(zip(poly_list, poly_label_list)):
-                        if bbox.contains(poly):
-                            del poly_list[i]
-                            del poly_label_list[i]
-            # Gather all keypoints
-            for shape in labelme_ann.shapes:
-                if shape.shape_type == 'point':
-                    if shape.label not in keypoint_names:
-                        if ignore_unspecified_categories:
-                            continue
-                        else:
-                            logger.error(f'shape.label={shape.label} does not exist in provided category keypoints.')
-                            logger.error(f'keypoint_names: {keypoint_names}')
-                            logger.error(f'Image directory: {img_dir}')
-                            logger.error(f'Image filename: {img_filename}')
-                            raise Exception
-                    if shape.label not in kpt_label2points_list:
-                        kpt_label2points_list[shape.label] = [shape.points[0]]
-                    else:
-                        kpt_label2points_list[shape.label].append(shape.points[0])
-
-            # Group keypoints inside of polygon bounds
-            postponed_kpts = []
-            postponed_labels = []
-            for poly, poly_label in zip(poly_list, poly_label_list):
-                coco_cat = dataset.categories.get_unique_category_from_name(poly_label)
-                bound_group = KeypointGroup(bound_obj=poly, coco_cat=coco_cat)
-                # Register the keypoints inside of each polygon
-                temp_dict = kpt_label2points_list.copy()
-                for label, kpt_list in temp_dict.items():
-                    for i, kpt in enumerate(kpt_list):
-                        if kpt.within(poly) and label in coco_cat.keypoints:
-                            bound_group.register(kpt=Keypoint2D(point=kpt, visibility=2), label=label, strict=False)
-                            del kpt_label2points_list[label][i]
-                            if len(kpt_label2points_list[label]) == 0:
-                                del kpt_label2points_list[label]
-                            if kpt in postponed_kpts:
-                                postponed_idx = postponed_kpts.index(kpt)
-                                del postponed_kpts[postponed_idx]
-                                del postponed_labels[postponed_idx]
-                            break
-                postponed_kpts.extend(bound_group.postponed_kpt_list)
-                postponed_labels.extend(bound_group.postponed_kpt_label_list)
-                bound_group_list.append(bound_group)
-            # Group keypoints inside of bbox bounds
-            for bbox, bbox_label in zip(bbox_list, bbox_label_list):
-                coco_cat = dataset.categories.get_unique_category_from_name(bbox_label)
-                bound_group = KeypointGroup(bound_obj=bbox, coco_cat=coco_cat)
-                # Register the keypoints inside of each bounding box
-                temp_dict = kpt_label2points_list.copy()
-                for label, kpt_list in temp_dict.items():
-                    for i, kpt in enumerate(kpt_list):
-                        if kpt.within(bbox) and label in coco_cat.keypoints:
-                            bound_group.register(kpt=Keypoint2D(point=kpt, visibility=2), label=label, strict=False)
-                            del kpt_label2points_list[label][i]
-                            if len(kpt_label2points_list[label]) == 0:
-                                del kpt_label2points_list[label]
-                            if kpt in postponed_kpts:
-                                postponed_idx = postponed_kpts.index(kpt)
-                                del postponed_kpts[postponed_idx]
-                                del postponed_labels[postponed_idx]
-                            break
-                postponed_kpts.extend(bound_group.postponed_kpt_list)
-                postponed_labels.extend(bound_group.postponed_kpt_label_list)
-                bound_group_list.append(bound_group)
-
-            if len(postponed_kpts) > 0 and ensure_no_unbounded_kpts:
-                logger.error(f'Unresolved postponed_kpts: {postponed_kpts}')
-                logger.error(f'Unresolved postponed_labels: {postponed_labels}')
-                logger.error(f'Image directory: {img_dir}')
-                logger.error(f'Image filename: {img_filename}')
-                raise Exception
-
-            if ensure_no_unbounded_kpts:
-                # Ensure that there are no leftover keypoints that are unbounded.
-                # (This case often results from mistakes during annotation creation.)
-                if len(kpt_label2points_list) > 0:
-                    logger.error(f'The following keypoints were left unbounded:\n{kpt_label2points_list}')
-                    logger.error(f'Image directory: {img_dir}')
-                    logger.error(f'Image filename: {img_filename}')
-                    raise Exception
-
-            if len(bound_group_list) > 0:
-                image_id = len(dataset.images)
-                # Add image to COCO dataset images
-                dataset.images.append(
-                    COCO_Image(
-                        license_id=0,
-                        file_name=get_filename(img_path),
-                        coco_url=img_path,
-                        height=labelme_ann.img_h,
-                        width=labelme_ann.img_w,
-                        date_captured=get_ctime(img_path),
-                        flickr_url=None,
-                        id=image_id
-                    )
-                )
+        convert = partial(
+            _convert_labelme_ann,
+            categories=categories, category_names=category_names, keypoint_names=keypoint_names,
+            img_dir=img_dir, remove_redundant=remove_redundant,
+            ensure_no_unbounded_kpts=ensure_no_unbounded_kpts,
+            ensure_valid_shape_type=ensure_valid_shape_type,
+            ignore_unspecified_categories=ignore_unspecified_categories,
+            img_meta_cache=img_meta_cache
+        )
 
-                # Add segmentation and/or bbox to COCO dataset annotations together with bounded keypoints
-                for bound_group in bound_group_list:
-                    keypoints = Keypoint2D_List()
-                    for label in bound_group.coco_cat.keypoints:
-                        label_found = False
-                        for kpt, kpt_label in zip(bound_group.kpt_list, bound_group.kpt_label_list):
-                            if kpt_label == label:
-                                label_found = True
-                                keypoints.append(kpt)
-                                break
-                        if not label_found:
-                            keypoints.append(Keypoint2D.from_list([0, 0, 0]))
-                    if type(bound_group.bound_obj) is Polygon:
-                        bbox = bound_group.bound_obj.to_bbox()
-                        dataset.annotations.append(
-                            COCO_Annotation(
-                                segmentation=Segmentation(polygon_list=[bound_group.bound_obj]),
-                                num_keypoints=len(bound_group.coco_cat.keypoints),
-                                area=bbox.to_float().area(),
-                                iscrowd=0,
-                                keypoints=keypoints,
-                                image_id=image_id,
-                                bbox=bbox.to_float(),
-                                category_id=bound_group.coco_cat.id,
-                                id=len(dataset.annotations)
-                            )
-                        )
-                    elif type(bound_group.bound_obj) is BBox:
-                        dataset.annotations.append(
-                            COCO_Annotation(
-                                segmentation=Segmentation(polygon_list=[]),
-                                num_keypoints=len(bound_group.coco_cat.keypoints),
-                                area=bound_group.bound_obj.to_float().area(),
-                                iscrowd=0,
-                                keypoints=keypoints,
-                                image_id=image_id,
-                                bbox=bound_group.bound_obj.to_float(),
-                                category_id=bound_group.coco_cat.id,
-                                id=len(dataset.annotations)
-                            )
-                        )
-                    else:
-                        raise Exception
+        def add_result(coco_image: COCO_Image, coco_ann_list: List[COCO_Annotation]):
+            if coco_image is None:
+                return
+            coco_image.id = len(dataset.images)
+            dataset.images.append(coco_image)
+            for coco_ann in coco_ann_list:
+                coco_ann.image_id = coco_image.id
+                coco_ann.id = len(dataset.annotations)
+                dataset.annotations.append(coco_ann)
+
+        labelme_ann_list = list(labelme_handler)
+        if workers is not None and workers > 1 and len(labelme_ann_list) > 1:
+            workers = min(workers, len(labelme_ann_list))
+            # Results come back in the order of labelme_handler, so the ids are the same as in a serial conversion.
+            results = imap_ordered(
+                convert, labelme_ann_list, workers=workers,
+                chunksize=max(1, len(labelme_ann_list) // (workers * 4))
+            )
+            for labelme_ann, (result, error) in zip(labelme_ann_list, results):
+                if error is not None:
+                    # The error messages of the worker process may not have reached this process's log.
+                    logger.error(f'Failed to convert the labelme annotation of image: {get_filename(labelme_ann.img_path)}')
+                    raise error
+                add_result(*result)
+        else:
+            for labelme_ann in labelme_ann_list:
+                add_result(*convert(labelme_ann))
 
         return dataset
 
@@ -653,7 +1063,9 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
         allow_unfound_seg: bool=False,
         allow_same_instance_for_contained: bool=False,
         class_merge_map: Dict[str, str]=None,
-        show_pbar: bool=False
+        show_pbar: bool=False,
+        workers: int=None,
+        img_meta_cache: ImageMetadataCache=None
     ) -> COCO_Dataset:
         """Creates a COCO_Dataset object from an NDDS_Dataset object.
         The conversion is based on the naming convention of the labels in the NDDS Dataset, so it is important
@@ -730,6 +1142,14 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
             ] (default: {False})
             class_merge_map {Dict[str, str]} -- [TODO] (default: None)
             show_pbar {bool} -- [Whether or not you would like to display a progress bar in your terminal during conversion.] (default: {False})
+            workers {int} -- [
+                If greater than 1, the frames are converted in a pool of this many processes.
+                The results are merged in frame order, so the image and annotation ids are the same as when workers=None.
+            ] (default: {None})
+            img_meta_cache {ImageMetadataCache} -- [
+                If given, the size and ctime of every frame image are looked up in this cache instead of being read from the file,
+                which saves the work when the same frames are converted again.
+            ] (default: {None})
 
         Returns:
             COCO_Dataset -- [The converted COCO Dataset object.]
@@ -802,164 +1222,50 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
         if show_pbar:
             frame_pbar = tqdm(total=len(ndds_dataset.frames), unit='frame(s)', leave=True)
             frame_pbar.set_description('Converting Frames')
-        for frame in ndds_dataset.frames:
-            # Define Camera
-            camera = Camera(
-                f=[camera_settings.intrinsic_settings.fx, camera_settings.intrinsic_settings.fy],
-                c=[camera_settings.intrinsic_settings.cx, camera_settings.intrinsic_settings.cy],
-                T=frame.ndds_ann.camera_data.location_worldframe.to_list()
-            )
-            
-            # Load Image Handler
-            check_file_exists(frame.img_path)
-            img = cv2.imread(frame.img_path)
-            img_h, img_w = img.shape[:2]
-            if img.shape != camera_settings.captured_image_size.shape():
-                logger.error(f'img.shape == {img.shape} != {camera_settings.captured_image_size.shape()} == camera_settings.captured_image_size.shape()')
-                logger.error(f'frame.img_path: {frame.img_path}')
-                raise Exception
-            image_id = len(dataset.images)
-            dataset.images.append(
-                COCO_Image(
-                    license_id=0,
-                    file_name=get_filename(frame.img_path),
-                    coco_url=frame.img_path,
-                    height=img_h,
-                    width=img_w,
-                    date_captured=get_ctime(frame.img_path),
-                    flickr_url=None,
-                    id=image_id
-                )
-            )
-
-            # Load Instance Image
-            if class_merge_map is None:
-                check_file_exists(frame.is_img_path)
-                instance_img = cv2.imread(frame.is_img_path)
-                exclude_classes = []
-            else:
-                instance_img = frame.get_merged_is_img(class_merge_map=class_merge_map)
-                exclude_classes = list(class_merge_map.keys())
-
-            organized_handler = frame.to_labeled_obj_handler(
-                naming_rule=naming_rule, delimiter=delimiter, exclude_classes=exclude_classes,
-                allow_same_instance_for_contained=allow_same_instance_for_contained, show_pbar=show_pbar
-            )
-            for labeled_obj in organized_handler:
-                specified_category_names = [cat.name for cat in categories]
-                if labeled_obj.obj_name not in specified_category_names:
-                    if ignore_unspecified_categories:
-                        continue
-                    else:
-                        logger.error(f'Found an NDDS Object name ({labeled_obj.obj_name}) that does not exist in the specified categories.')
-                        logger.error(f'specified_category_names: {specified_category_names}')
-                        logger.error(f'frame.img_path: {frame.img_path}')
-                        logger.error(f'Hint: Use ignore_unspecified_categories=True to bypass this check.')
-                        raise Exception
-                coco_cat = categories.get_unique_category_from_name(labeled_obj.obj_name)
-
-                partitioned_coco_instances = {}
-                for instance in labeled_obj.instances:
-                    # Get Segmentation, BBox, and Keypoints
-                    if labeled_obj.obj_name in visibility_threshold_dict.keys():
-                        if instance.ndds_ann_obj.visibility < visibility_threshold_dict[labeled_obj.obj_name]:
-                            continue
-                    else:
-                        if instance.ndds_ann_obj.visibility < default_visibility_threshold:
-                            continue
-                    
-                    if instance.instance_type == 'seg':
-                        seg = instance.get_segmentation(
-                            instance_img=instance_img, color_interval=color_interval,
-                            is_img_path=frame.is_img_path,
-                            exclude_invalid_polygons=exclude_invalid_polygons,
-                            allow_unfound_seg=allow_unfound_seg
-                        )
-                        if len(seg) == 0:
-                            continue
-                        bbox = seg.to_bbox()
-                    elif instance.instance_type == 'bbox':
-                        seg = Segmentation()
-                        bbox = instance.ndds_ann_obj.bounding_box.copy()
-                        bbox = bbox.clip_at_bounds(frame_shape=img.shape[:2])
-                        bbox.check_bbox_in_frame(frame_shape=img.shape[:2])
-                    elif instance.instance_type == 'kpt':
-                        logger.error(f"'kpt' can only be used as a contained instance and not as a container instance")
-                        logger.error(f'instance:\n{instance}')
-                        raise Exception
-                    else:
-                        logger.error(f'Invalid instance.instance_type: {instance.instance_type}')
-                        logger.error(f'instance:\n{instance}')
-                        raise Exception
+        convert = partial(
+            _convert_ndds_frame,
+            categories=categories, camera_settings=camera_settings,
+            naming_rule=naming_rule, delimiter=delimiter,
+            ignore_unspecified_categories=ignore_unspecified_categories,
+            bbox_area_threshold=bbox_area_threshold,
+            default_visibility_threshold=default_visibility_threshold,
+            visibility_threshold_dict=visibility_threshold_dict,
+            min_visibile_kpts=min_visibile_kpts,
+            color_interval=color_interval,
+            exclude_invalid_polygons=exclude_invalid_polygons,
+            allow_unfound_seg=allow_unfound_seg,
+            allow_same_instance_for_contained=allow_same_instance_for_contained,
+            class_merge_map=class_merge_map,
+            # Progress bars of the worker processes would garble the frame progress bar.
+            show_pbar=show_pbar and (workers is None or workers < 2),
+            img_meta_cache=img_meta_cache
+        )
 
-                    if bbox.area() < bbox_area_threshold:
-                        continue
-
-                    kpts_2d, kpts_3d = instance.get_keypoints(kpt_labels=coco_cat.keypoints)
-                    visible_kpt_count = sum([kpt.visibility == 2 for kpt in kpts_2d])
-                    if min_visibile_kpts is not None and visible_kpt_count < min_visibile_kpts:
-                        continue
-
-                    # Construct COCO Annotation
-                    coco_ann = COCO_Annotation(
-                        id=len(dataset.annotations),
-                        category_id=coco_cat.id,
-                        image_id=image_id,
-                        segmentation=seg,
-                        bbox=bbox,
-                        area=bbox.area(),
-                        keypoints=kpts_2d,
-                        num_keypoints=len(kpts_2d),
-                        iscrowd=0,
-                        keypoints_3d=kpts_3d,
-                        camera=camera
-                    )
-                    if instance.part_num is None:
-                        dataset.annotations.append(coco_ann)
-                    else:
-                        if instance.instance_name not in partitioned_coco_instances:
-                            partitioned_coco_instances[instance.instance_name] = [{'coco_ann': coco_ann, 'part_num': instance.part_num}]
-                        else:
-                            existing_part_numbers = [item['part_num'] for item in partitioned_coco_instances[instance.instance_name]]
-                            if instance.part_num not in existing_part_numbers:
-                                partitioned_coco_instances[instance.instance_name].append({'coco_ann': coco_ann, 'part_num': instance.part_num})
-                            else:
-                                logger.error(f'instance.part_num already exists in existing_part_numbers for instance.instance_name={instance.instance_name}')
-                                logger.error(f'instance.part_num: {instance.part_num}')
-                                logger.error(f'existing_part_numbers: {existing_part_numbers}')
-                                logger.error(f"Please check your NDDS annotation json to make sure that you don't have any duplicate part_num!=None instances.")
-                                raise Exception
-
-                for instance_name, partitioned_items in partitioned_coco_instances.items():
-                    working_seg = Segmentation()
-                    working_bbox = None
-                    first_coco_ann = partitioned_items[0]['coco_ann']
-                    first_coco_ann = COCO_Annotation.buffer(first_coco_ann)
-                    for partitioned_item in partitioned_items:
-                        coco_ann = partitioned_item['coco_ann']
-                        coco_ann = COCO_Annotation.buffer(coco_ann)
-                        working_seg = working_seg + coco_ann.segmentation
-                        if working_bbox is None:
-                            working_bbox = coco_ann.bbox
-                        else:
-                            working_bbox = working_bbox + coco_ann.bbox
-                    dataset.annotations.append(
-                        COCO_Annotation(
-                            id=len(dataset.annotations),
-                            category_id=coco_cat.id,
-                            image_id=image_id,
-                            segmentation=working_seg,
-                            bbox=working_bbox,
-                            area=working_bbox.area(),
-                            keypoints=first_coco_ann.keypoints,
-                            num_keypoints=first_coco_ann.num_keypoints,
-                            iscrowd=first_coco_ann.iscrowd,
-                            keypoints_3d=first_coco_ann.keypoints_3d,
-                            camera=first_coco_ann.camera
-                        )
-                    )
+        def add_result(coco_image: COCO_Image, coco_ann_list: List[COCO_Annotation]):
+            coco_image.id = len(dataset.images)
+            dataset.images.append(coco_image)
+            for coco_ann in coco_ann_list:
+                coco_ann.image_id = coco_image.id
+                coco_ann.id = len(dataset.annotations)
+                dataset.annotations.append(coco_ann)
             if show_pbar:
                 frame_pbar.update()
+
+        if workers is not None and workers > 1:
+            # Frames are converted in the order of ndds_dataset.frames, so the ids are the same as in a serial conversion.
+            # Only a few frames per worker are in flight at any time, so memory doesn't depend on the number of frames.
+            # The handler is its own iterator, so it can't be iterated twice at the same time.
+            frame_list = list(ndds_dataset.frames)
+            results = imap_ordered(convert, frame_list, workers=workers)
+            for frame, (result, error) in zip(frame_list, results):
+                if error is not None:
+                    # The error messages of the worker process may not have reached this process's log.
+                    logger.error(f'Failed to convert NDDS frame: {frame.img_path}')
+                    raise error
+                add_result(*result)
+        else:
+            for frame in ndds_dataset.frames:
+                add_result(*convert(frame))
         return dataset
 
     def update_img_dir(self, new_img_dir: str, check_paths: bool=True):
@@ -976,8 +1282,8 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
 
         for coco_image in self.images:
             coco_image.coco_url = f'{new_img_dir}/{coco_image.file_name}'
-            if check_paths:
-                check_file_exists(coco_image.coco_url)
+        if check_paths:
+            check_files_exist([coco_image.coco_url for coco_image in self.images])
 
     @classmethod
     def combine(cls, dataset_list: List[COCO_Dataset], img_dir_list: List[str]=None, show_pbar: bool=False) -> COCO_Dataset:
@@ -1007,40 +1313,38 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
             description='A combination of many COCO datasets using annotation_utils'
         )
         map_handler = COCO_Mapper_Handler()
+        # Map the equality_key of everything that has been added so far to its new id,
+        # so that duplicates are found with a lookup instead of being compared against everything.
+        license_key2id, image_key2id, category_key2id = {}, {}, {}
         merge_pbar = tqdm(total=len(dataset_list), unit='dataset(s)') if show_pbar else None
         if merge_pbar is not None:
             merge_pbar.set_description(f'Merging Datasets...')
         for i, dataset in enumerate(dataset_list):
             # Process Licenses
             for coco_license in dataset.licenses:
-                already_exists = False
-                for existing_license in result_dataset.licenses:
-                    if coco_license.is_equal_to(existing_license, exclude_id=True):
-                        already_exists = True
-                        map_handler.license_mapper.add(
-                            unique_key=i, old_id=coco_license.id, new_id=existing_license.id
-                        )
-                        break
-                if not already_exists:
+                key = coco_license.equality_key(exclude_id=True)
+                if key in license_key2id:
+                    map_handler.license_mapper.add(
+                        unique_key=i, old_id=coco_license.id, new_id=license_key2id[key]
+                    )
+                else:
                     new_license = coco_license.copy()
                     new_license.id = len(result_dataset.licenses)
                     map_handler.license_mapper.add(
                         unique_key=i, old_id=coco_license.id, new_id=new_license.id
                     )
                     result_dataset.licenses.append(new_license)
+                    license_key2id[key] = new_license.id
 
             # Process Images
+            check_files_exist([coco_image.coco_url for coco_image in dataset.images])
             for coco_image in dataset.images:
-                check_file_exists(coco_image.coco_url)
-                already_exists = False
-                for existing_image in result_dataset.images:
-                    if coco_image.is_equal_to(existing_image, exclude_id=True):
-                        already_exists = True
-                        map_handler.image_mapper.add(
-                            unique_key=i, old_id=coco_image.id, new_id=existing_image.id
-                        )
-                        break
-                if not already_exists:
+                key = coco_image.equality_key(exclude_id=True)
+                if key in image_key2id:
+                    map_handler.image_mapper.add(
+                        unique_key=i, old_id=coco_image.id, new_id=image_key2id[key]
+                    )
+                else:
                     new_image = coco_image.copy()
                     new_image.id = len(result_dataset.images)
                     map_handler.image_mapper.add(
@@ -1053,41 +1357,44 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
                         logger.error(f"Couldn't find license map using unique_key={i}, old_id={coco_image.license_id}")
                         raise Exception
                     result_dataset.images.append(new_image)
+                    image_key2id[key] = new_image.id
 
             # Process Categories
             for coco_category in dataset.categories:
-                already_exists = False
-                for existing_category in result_dataset.categories:
-                    if coco_category.is_equal_to(existing_category, exclude_id=True):
-                        already_exists = True
-                        map_handler.category_mapper.add(
-                            unique_key=i, old_id=coco_category.id, new_id=existing_category.id
-                        )
-                        break
-                if not already_exists:
+                key = coco_category.equality_key(exclude_id=True)
+                if key in category_key2id:
+                    map_handler.category_mapper.add(
+                        unique_key=i, old_id=coco_category.id, new_id=category_key2id[key]
+                    )
+                else:
                     new_category = coco_category.copy()
                     new_category.id = len(result_dataset.categories)
                     map_handler.category_mapper.add(
                         unique_key=i, old_id=coco_category.id, new_id=new_category.id
                     )
                     result_dataset.categories.append(new_category)
+                    category_key2id[key] = new_category.id
 
             # Process Annotations
-            for coco_ann in dataset.annotations:
+            # The ids are read from the columns and the annotations are only read,
+            # so that combining columnar datasets doesn't materialize all of their annotations.
+            old_image_ids = dataset.annotations.get_column('image_id').tolist()
+            found, new_image_ids = map_handler.image_mapper.get_new_ids(unique_key=i, old_ids=old_image_ids)
+            if not found.all():
+                old_id = old_image_ids[int(np.argmin(found))]
+                logger.error(f"Couldn't find image map using unique_key={i}, old_id={old_id}")
+                raise Exception
+            old_category_ids = dataset.annotations.get_column('category_id').tolist()
+            found, new_category_ids = map_handler.category_mapper.get_new_ids(unique_key=i, old_ids=old_category_ids)
+            if not found.all():
+                old_id = old_category_ids[int(np.argmin(found))]
+                logger.error(f"Couldn't find category map using unique_key={i}, old_id={old_id}")
+                raise Exception
+            for coco_ann, new_image_id, new_category_id in zip(dataset.annotations.iter_readonly(), new_image_ids.tolist(), new_category_ids.tolist()):
                 new_ann = coco_ann.copy()
                 new_ann.id = len(result_dataset.annotations)
-                found, new_ann.image_id = map_handler.image_mapper.get_new_id(
-                    unique_key=i, old_id=coco_ann.image_id
-                )
-                if not found:
-                    logger.error(f"Couldn't find image map using unique_key={i}, old_id={coco_ann.image_id}")
-                    raise Exception
-                found, new_ann.category_id = map_handler.category_mapper.get_new_id(
-                    unique_key=i, old_id=coco_ann.category_id
-                )
-                if not found:
-                    logger.error(f"Couldn't find category map using unique_key={i}, old_id={coco_ann.category_id}")
-                    raise Exception
+                new_ann.image_id = new_image_id
+                new_ann.category_id = new_category_id
                 result_dataset.annotations.append(new_ann)
             if merge_pbar is not None:
                 merge_pbar.update(1)
@@ -1097,7 +1404,7 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
         return result_dataset
 
     @classmethod
-    def combine_from_config(cls, config: DatasetConfigCollectionHandler, img_sort_attr_name: str=None, show_pbar: bool=False) -> COCO_Dataset:
+    def combine_from_config(cls, config: DatasetConfigCollectionHandler, img_sort_attr_name: str=None, show_pbar: bool=False, workers: int=None) -> COCO_Dataset:
         """
         This is the same as COCO_Dataset.combine, but with this method you don't have to construct each dataset manually.
         Instead, you can just provide a dataset configuration file that specifies the location of all of your coco json files
@@ -1108,6 +1415,8 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
         img_sort_attr_name: The attribute name that you would like to sort the dataset images by before the datasets are combined.
                             (Example: img_sort_attr_name='file_name')
         show_pbar: If True, a progress bar will be shown while the images and annotations are loaded into the dataset.
+        workers: If greater than 1, the datasets are loaded in a pool of this many processes.
+                 The datasets are still combined in the order of the configuration, so the result is the same as when workers=None.
         """
 
         # dataset_path_config = DatasetConfigCollectionHandler.load_from_path(config_path)
@@ -1134,20 +1443,33 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
         if pbar is not None:
             pbar.set_description(f'Loading Dataset List...')
         # for img_dir, ann_path in zip(img_dir_list, ann_path_list):
-        for config in config_list:
-            # dataset = COCO_Dataset.load_from_path(json_path=ann_path, img_dir=img_dir, check_paths=True)
-            dataset = COCO_Dataset.load_from_path(json_path=config.ann_path, img_dir=config.img_dir, check_paths=True)
-            if img_sort_attr_name is not None:
-                dataset.images.sort(attr_name=img_sort_attr_name)
-            dataset_list.append(dataset)
-            if pbar is not None:
-                pbar.update(1)
+        if workers is not None and workers > 1 and len(config_list) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(config_list))) as executor:
+                # executor.map yields the results in the order of config_list, regardless of which load finishes first.
+                for dataset in executor.map(
+                    _load_dataset_for_combine,
+                    [config.ann_path for config in config_list],
+                    [config.img_dir for config in config_list],
+                    [img_sort_attr_name] * len(config_list)
+                ):
+                    dataset_list.append(dataset)
+                    if pbar is not None:
+                        pbar.update(1)
+        else:
+            for config in config_list:
+                # dataset = COCO_Dataset.load_from_path(json_path=ann_path, img_dir=img_dir, check_paths=True)
+                dataset = _load_dataset_for_combine(
+                    ann_path=config.ann_path, img_dir=config.img_dir, img_sort_attr_name=img_sort_attr_name
+                )
+                dataset_list.append(dataset)
+                if pbar is not None:
+                    pbar.update(1)
         if pbar is not None:
             pbar.close()
         return COCO_Dataset.combine(dataset_list, show_pbar=show_pbar)
 
     @classmethod
-    def combine_from_config_path(cls, config_path: str, img_sort_attr_name: str=None, show_pbar: bool=False) -> COCO_Dataset:
+    def combine_from_config_path(cls, config_path: str, img_sort_attr_name: str=None, show_pbar: bool=False, workers: int=None) -> COCO_Dataset:
         """
         This is the same as COCO_Dataset.combine, but with this method you don't have to construct each dataset manually.
         Instead, you can just provide a dataset configuration file that specifies the location of all of your coco json files
@@ -1158,24 +1480,103 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
         img_sort_attr_name: The attribute name that you would like to sort the dataset images by before the datasets are combined.
                             (Example: img_sort_attr_name='file_name')
         show_pbar: If True, a progress bar will be shown while the images and annotations are loaded into the dataset.
+        workers: If greater than 1, the datasets are loaded in a pool of this many processes.
+                 The datasets are still combined in the order of the configuration, so the result is the same as when workers=None.
         """
         dataset_path_config = DatasetConfigCollectionHandler.load_from_path(config_path)
-        return COCO_Dataset.combine_from_config(config=dataset_path_config, img_sort_attr_name=img_sort_attr_name, show_pbar=show_pbar)
+        return COCO_Dataset.combine_from_config(config=dataset_path_config, img_sort_attr_name=img_sort_attr_name, show_pbar=show_pbar, workers=workers)
+
+    def subset(
+        self, image_ids: List[int]=None, category_ids: List[int]=None,
+        drop_unused: bool=False, compact_ids: bool=False
+    ) -> COCO_Dataset:
+        """
+        Returns a new dataset that only contains the given images and categories.
+        The objects in the new dataset are copies, so this dataset isn't affected by changes made to it.
+        Images and annotations keep the order that they have in this dataset.
+
+        image_ids: The ids of the images to keep. All images are kept if None.
+        category_ids: The ids of the categories to keep. All categories are kept if None.
+        drop_unused: If True, licenses that aren't used by any of the kept images and
+                     categories that aren't used by any of the kept annotations are removed as well.
+        compact_ids: If True, the ids of the licenses, images, annotations and categories are
+                     renumbered from 0 in order, and all references to them are updated.
+        """
+        image_id_set = set(image_ids) if image_ids is not None else None
+        category_id_set = set(category_ids) if category_ids is not None else None
+
+        # Images
+        images = COCO_Image_Handler([
+            coco_image.copy() for coco_image in self.images
+            if image_id_set is None or coco_image.id in image_id_set
+        ])
+
+        # Annotations
+        ann_obj_list = self.annotations.obj_list
+        if self.annotations.is_columnar:
+            # Filter on the id columns without creating any annotation objects.
+            keep = np.ones(len(ann_obj_list), dtype=bool)
+            if image_id_set is not None:
+                keep &= np.isin(ann_obj_list.get_column('image_id'), list(image_id_set))
+            if category_id_set is not None:
+                keep &= np.isin(ann_obj_list.get_column('category_id'), list(category_id_set))
+            columns = ann_obj_list.copy()
+            columns.permute(np.nonzero(keep)[0])
+            annotations = COCO_Annotation_Handler(columns.deepcopy())
+            kept_category_ids = columns.get_column('category_id').tolist()
+        else:
+            annotations = COCO_Annotation_Handler([
+                coco_ann.copy() for coco_ann in ann_obj_list
+                if (image_id_set is None or coco_ann.image_id in image_id_set) \
+                    and (category_id_set is None or coco_ann.category_id in category_id_set)
+            ])
+            kept_category_ids = [coco_ann.category_id for coco_ann in annotations]
+
+        # Licenses and Categories
+        used_license_ids = set([coco_image.license_id for coco_image in images]) if drop_unused else None
+        licenses = COCO_License_Handler([
+            coco_license.copy() for coco_license in self.licenses
+            if used_license_ids is None or coco_license.id in used_license_ids
+        ])
+        used_category_ids = set(kept_category_ids) if drop_unused else None
+        categories = COCO_Category_Handler([
+            coco_category.copy() for coco_category in self.categories
+            if (category_id_set is None or coco_category.id in category_id_set) \
+                and (used_category_ids is None or coco_category.id in used_category_ids)
+        ])
+
+        if compact_ids:
+            license_id_map = {coco_license.id: new_id for new_id, coco_license in enumerate(licenses)}
+            image_id_map = {coco_image.id: new_id for new_id, coco_image in enumerate(images)}
+            category_id_map = {coco_category.id: new_id for new_id, coco_category in enumerate(categories)}
+            for new_id, coco_license in enumerate(licenses):
+                coco_license.id = new_id
+            for new_id, coco_image in enumerate(images):
+                coco_image.id = new_id
+                coco_image.license_id = license_id_map.get(coco_image.license_id, coco_image.license_id)
+            for new_id, coco_category in enumerate(categories):
+                coco_category.id = new_id
+            for new_id, coco_ann in enumerate(annotations):
+                coco_ann.id = new_id
+                coco_ann.image_id = image_id_map.get(coco_ann.image_id, coco_ann.image_id)
+                coco_ann.category_id = category_id_map.get(coco_ann.category_id, coco_ann.category_id)
+            for handler in [licenses, images, annotations, categories]:
+                handler.reindex()
+
+        return COCO_Dataset(
+            info=self.info.copy(), licenses=licenses, images=images,
+            annotations=annotations, categories=categories
+        )
 
     def split_into_parts(self, ratio: List[int], shuffle: bool=True) -> List[COCO_Dataset]:
+        """
+        Splits the images of this dataset into parts with the given ratio and returns a dataset for each part.
+        Each part only contains the licenses and categories that its images and annotations use.
+        """
         dataset_parts = []
-
         image_handlers = self.images.split(ratio=ratio, shuffle=shuffle)
         for image_handler in image_handlers:
-            image_handler = COCO_Image_Handler.buffer(image_handler)
-            relevant_img_ids = image_handler.ids
-            relevant_license_ids = [coco_image.license_id for coco_image in image_handler]
-            ann_handler = COCO_Annotation_Handler([coco_ann for coco_ann in self.annotations if coco_ann.image_id in relevant_img_ids])
-            license_handler = COCO_License_Handler([coco_license for coco_license in self.licenses if coco_license.id in relevant_license_ids])
-            relevant_category_ids = [coco_ann.category_id for coco_ann in ann_handler]
-            category_handler = COCO_Category_Handler([coco_category for coco_category in self.categories if coco_category.id in relevant_category_ids])
-            info = self.info.copy()
-            dataset_part = COCO_Dataset(info=info, licenses=license_handler, images=image_handler, annotations=ann_handler, categories=category_handler)
+            dataset_part = self.subset(image_ids=[coco_image.id for coco_image in image_handler], drop_unused=True)
             dataset_parts.append(dataset_part)
         
         assert sum([len(part.images) for part in dataset_parts]) == len(self.images), 'Failed to split images correctly.'
@@ -1185,7 +1586,8 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
     def split(
         self, dest_dir: str,
         split_dirname_list: List[str]=['train', 'test', 'val'], ratio: list=[2, 1, 0], coco_filename_list: List[str]=None,
-        shuffle: bool=True, preserve_filenames: bool=False, overwrite: bool=False
+        shuffle: bool=True, preserve_filenames: bool=False, overwrite: bool=False,
+        transfer_mode: str='copy', workers: int=8, filename_pattern: str='{:06d}'
     ) -> List[COCO_Dataset]:
         """
         Use this method to split a single coco dataset into multiple datasets.
@@ -1207,7 +1609,13 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
                             so as to avoid filename conflicts.
         overwrite: If True, the contents of dest_dir will be deleted before creating a new split dataset folder.
                    If False, an error will be thrown if dest_dir contains any files or directories.
+        transfer_mode: How the images are put into each split dataset folder.
+                       One of 'copy', 'hardlink', 'reflink' or 'symlink'. See transfer_files for details.
+        workers: The number of images that are copied/linked at the same time.
+        filename_pattern: Only applicable when preserve_filenames=False.
+                          Format string of the generated filenames (without the extension), e.g. 'frame_{:05d}'.
         """
+        check_value(transfer_mode, valid_value_list=TRANSFER_MODES)
 
         # Checks
         check_type_from_list([split_dirname_list, ratio, coco_filename_list], valid_type_list=[list, type(None)])
@@ -1259,78 +1667,104 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
         coco_image_samples = self.images.split(ratio=ratio, shuffle=shuffle)
 
         # Construct New Datasets
+        # The images of each part are copied in the background while the following parts are being built and saved.
+        # Group the annotations by image from the image_id column, so that columnar annotations are only read, not kept.
+        img_id2positions = {}
+        for position, image_id in enumerate(self.annotations.get_column('image_id').tolist()):
+            img_id2positions.setdefault(image_id, []).append(position)
         dataset_list = []
-        for coco_image_list, split_dirname, split_imgdir, split_cocopath in \
-            tqdm(zip(coco_image_samples, split_dirname_list, split_imgdir_list, split_cocopath_list), total=len(split_dirname_list), unit='part(s)', leave=True):
-            dataset = COCO_Dataset.new(description=f'Split {split_dirname} Dataset')
-            used_license_id_list = []
-            used_category_id_list = []
-            for coco_image0 in tqdm(coco_image_list, total=len(coco_image_list), unit='image(s)', leave=False):
-                coco_image = coco_image0.copy()
-                # Map Image Index
-                coco_image = COCO_Image.buffer(coco_image)
-                anns = self.annotations.get_annotations_from_imgIds([coco_image.id]).copy()
-                new_image_id = len(dataset.images)
+        transfer_futures = []
+        with ThreadPoolExecutor(max_workers=1) as transfer_executor:
+            for coco_image_list, split_dirname, split_imgdir, split_cocopath in \
+                tqdm(zip(coco_image_samples, split_dirname_list, split_imgdir_list, split_cocopath_list), total=len(split_dirname_list), unit='part(s)', leave=True):
+                dataset = COCO_Dataset.new(description=f'Split {split_dirname} Dataset')
+                src_img_path_list, dst_img_path_list = [], []
+                dst_img_path_set = set()
+                path_allocator = DumpPathAllocator(dump_dir=split_imgdir, pattern=filename_pattern)
+                for coco_image0 in tqdm(coco_image_list, total=len(coco_image_list), unit='image(s)', leave=False):
+                    coco_image = COCO_Image.buffer(coco_image0.copy())
+                    anns = self.annotations.iter_readonly(img_id2positions.get(coco_image.id, []))
+                    new_image_id = len(dataset.images)
                 
-                # Copy Image
-                old_img_path = coco_image.coco_url
-                if not preserve_filenames:
-                    img_extension = get_extension_from_filename(coco_image.file_name)
-                    new_img_path = get_next_dump_path(dump_dir=split_imgdir, file_extension=img_extension)
-                else:
-                    new_img_path = f'{split_imgdir}/{coco_image.file_name}'
-                if file_exists(new_img_path):
-                    logger.error(f'Copy failed. Image already exists in destination directory: {new_img_path}')
-                    logger.error(f'This is likely because the filenames in your dataset are not unique.')
-                    logger.error(f'Use preserve_filenames=False to use automatically generated filenames.')
-                    raise Exception
-                copy_file(src_path=old_img_path, dest_path=new_img_path, silent=True)
-
-                # Update COCO Image
-                coco_image.id = new_image_id
-                coco_image.coco_url = new_img_path
-                coco_image.file_name = get_filename(new_img_path)
-                dataset.images.append(coco_image)
-                if coco_image.license_id not in used_license_id_list:
-                    used_license_id_list.append(coco_image.license_id)
-
-                for coco_ann0 in anns:
-                    coco_ann = coco_ann0.copy()
-                    # Map Annotation Index
-                    new_ann_id = len(dataset.annotations)
-
-                    # Update COCO Annotation
-                    coco_ann.id = new_ann_id
-                    coco_ann.image_id = new_image_id
-                    dataset.annotations.append(coco_ann)
-                    if coco_ann.category_id not in used_category_id_list:
-                        used_category_id_list.append(coco_ann.category_id)
-
-            # Add Used Licenses To Dataset and Update Ids
-            for coco_license0 in self.licenses:
-                coco_license = coco_license0.copy()
-                if coco_license.id in used_license_id_list:
-                    new_license_id = len(dataset.licenses)
-                    for coco_image in dataset.images:
-                        if coco_image.license_id == coco_license.id:
-                            coco_image.license_id = new_license_id
-                    coco_license.id = new_license_id
-                    dataset.licenses.append(coco_license)
-            
-            # Add Used Categories To Dataset and Update Ids
-            for coco_cat0 in self.categories:
-                coco_cat = coco_cat0.copy()
-                if coco_cat.id in used_category_id_list:
-                    new_cat_id = len(dataset.categories)
-                    for coco_ann in dataset.annotations:
-                        if coco_ann.category_id == coco_cat.id:
-                            coco_ann.category_id = new_cat_id
-                    coco_cat.id = new_cat_id
-                    dataset.categories.append(coco_cat)
+                    # Copy Image
+                    old_img_path = coco_image.coco_url
+                    if not preserve_filenames:
+                        img_extension = get_extension_from_filename(coco_image.file_name)
+                        new_img_path = path_allocator.next_path(file_extension=img_extension)
+                    else:
+                        new_img_path = f'{split_imgdir}/{coco_image.file_name}'
+                    if new_img_path in dst_img_path_set or file_exists(new_img_path):
+                        logger.error(f'Copy failed. Image already exists in destination directory: {new_img_path}')
+                        logger.error(f'This is likely because the filenames in your dataset are not unique.')
+                        logger.error(f'Use preserve_filenames=False to use automatically generated filenames.')
+                        raise Exception
+                    src_img_path_list.append(old_img_path)
+                    dst_img_path_list.append(new_img_path)
+                    dst_img_path_set.add(new_img_path)
+
+                    # Update COCO Image
+                    coco_image.id = new_image_id
+                    coco_image.coco_url = new_img_path
+                    coco_image.file_name = get_filename(new_img_path)
+                    dataset.images.append(coco_image)
+
+                    for coco_ann0 in anns:
+                        coco_ann = coco_ann0.copy()
+                        # Update COCO Annotation
+                        coco_ann.id = len(dataset.annotations)
+                        coco_ann.image_id = new_image_id
+                        dataset.annotations.append(coco_ann)
+
+                # Start copying the images of this part
+                # The copy doesn't show its own progress bar, since it would garble the progress bars of this loop.
+                transfer_futures.append(
+                    transfer_executor.submit(
+                        transfer_files,
+                        src_paths=src_img_path_list, dst_paths=dst_img_path_list, mode=transfer_mode,
+                        workers=workers, show_pbar=False
+                    )
+                )
+
+                # Add Used Licenses and Categories To Dataset and Update Ids
+                # Licenses and categories keep their original order and are numbered from 0.
+                license_mapper, category_mapper = ID_Mapper(), ID_Mapper()
+                used_license_ids = set([coco_image.license_id for coco_image in dataset.images])
+                for coco_license0 in self.licenses:
+                    if coco_license0.id in used_license_ids:
+                        coco_license = coco_license0.copy()
+                        coco_license.id = len(dataset.licenses)
+                        license_mapper.add(unique_key=0, old_id=coco_license0.id, new_id=coco_license.id)
+                        dataset.licenses.append(coco_license)
+                used_category_ids = set([coco_ann.category_id for coco_ann in dataset.annotations])
+                for coco_cat0 in self.categories:
+                    if coco_cat0.id in used_category_ids:
+                        coco_cat = coco_cat0.copy()
+                        coco_cat.id = len(dataset.categories)
+                        category_mapper.add(unique_key=0, old_id=coco_cat0.id, new_id=coco_cat.id)
+                        dataset.categories.append(coco_cat)
+                found, new_license_ids = license_mapper.get_new_ids(
+                    unique_key=0, old_ids=[coco_image.license_id for coco_image in dataset.images]
+                )
+                for coco_image, is_found, new_license_id in zip(dataset.images, found.tolist(), new_license_ids.tolist()):
+                    if is_found:
+                        coco_image.license_id = new_license_id
+                found, new_category_ids = category_mapper.get_new_ids(
+                    unique_key=0, old_ids=[coco_ann.category_id for coco_ann in dataset.annotations]
+                )
+                for coco_ann, is_found, new_category_id in zip(dataset.annotations, found.tolist(), new_category_ids.tolist()):
+                    if is_found:
+                        coco_ann.category_id = new_category_id
+                dataset.images.reindex()
+                dataset.annotations.reindex()
             
-            # Append Dataset To Split Dataset List
-            dataset.save_to_path(save_path=split_cocopath, overwrite=False)
-            dataset_list.append(dataset)
+                # Append Dataset To Split Dataset List
+                dataset.save_to_path(save_path=split_cocopath, overwrite=False)
+                dataset_list.append(dataset)
+
+            # Wait for the remaining copies, now that the other progress bars are done.
+            # Any errors from copying the images are raised here.
+            for future in tqdm(transfer_futures, total=len(transfer_futures), unit='part(s)', leave=True, desc='Copying Images...'):
+                future.result()
         return dataset_list
 
     def prune_keypoints(self, min_num_kpts: int, verbose: bool=False):
@@ -1352,29 +1786,16 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
             With this the new dataset is saved to a different location.
             In order to avoid accidently deleting files from the python script, please delete the old dataset files manually.
         """
-        ann_idx_list = list(range(len(self.annotations)))
-        ann_idx_list.reverse()
-        for i in ann_idx_list:
-            coco_ann = self.annotations[i]
-            visibility_list = [kpt.visibility for kpt in coco_ann.keypoints]
-            num_visible = 0
-            for v in visibility_list:
-                if v > 0.0:
-                    num_visible += 1
-            if num_visible < min_num_kpts:
-                del self.annotations[i]
-                if verbose:
-                    logger.info(f'Deleted ann id: {coco_ann.id}')
-        img_idx_list = list(range(len(self.images)))
-        img_idx_list.reverse()
-        for i in img_idx_list:
-            coco_image = self.images[i]
-            coco_anns = self.annotations.get_annotations_from_imgIds([coco_image.id])
-            if len(coco_anns) == 0:
-                coco_image = self.images[i]
-                del self.images[i]
-                if verbose:
-                    logger.info(f'Deleted image id: {coco_image.id}')
+        num_visible = self.annotations.get_column('num_visible_keypoints')
+        removed_ann_ids = self.annotations.remove_by_mask(num_visible < min_num_kpts)
+        if verbose:
+            for ann_id in removed_ann_ids:
+                logger.info(f'Deleted ann id: {ann_id}')
+        remaining_image_ids = set(self.annotations.get_column('image_id').tolist())
+        removed_image_ids = self.images.remove_by_mask([coco_image.id not in remaining_image_ids for coco_image in self.images])
+        if verbose:
+            for image_id in removed_image_ids:
+                logger.info(f'Deleted image id: {image_id}')
 
     def remove_categories_by_name(self, category_names: List[str], verbose: bool=False):
         self.categories.remove_by_name(
@@ -1388,8 +1809,9 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
     def remove_all_categories_except(self, target_category_names: List[str], verbose: bool=False):
         category_names = [category.name for category in self.categories]
         check_value_from_list(target_category_names, valid_value_list=category_names)
+        target_category_name_set = set(target_category_names)
         self.remove_categories_by_name(
-            category_names=[name for name in category_names if name not in target_category_names],
+            category_names=[name for name in category_names if name not in target_category_name_set],
             verbose=verbose
         )
 
@@ -1665,7 +2087,7 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
         details_thickness: int=2,
         show_bbox: bool=True, show_kpt: bool=True, # Show Flags
         show_skeleton: bool=True, show_seg: bool=True,
-        show_details: bool=False
+        show_details: bool=False, img: np.ndarray=None
     ) -> np.ndarray:
         """
         Returns a preview of the image in the dataset that corresponds to image_id.
@@ -1714,9 +2136,11 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
         show_skeleton: If False, the keypoint skeleton will not be drawn at all.
         show_seg: If False, the segmentation will not be drawn at all.
         show_details: If True, the filename of the current frame and other information will be written to the screen.
+        img: The image that corresponds to image_id, if it has already been loaded. Otherwise, it is read from coco_url.
+             The annotations are drawn on a copy of img.
         """
         coco_image = self.images.get_obj_from_id(image_id)
-        img = cv2.imread(coco_image.coco_url)
+        img = cv2.imread(coco_image.coco_url) if img is None else img.copy()
         for coco_ann in self.annotations.get_annotations_from_imgIds([coco_image.id]):
             img = self.draw_annotation(
                 img=img, ann_id=coco_ann.id,
@@ -1885,7 +2309,8 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
         details_thickness: int=2,
         show_bbox: bool=True, show_kpt: bool=True, # Show Flags
         show_skeleton: bool=True, show_seg: bool=True,
-        show_details: bool=False
+        show_details: bool=False,
+        filename_pattern: str='{:06d}', workers: int=None
     ):
         """
         Generates and saves visualizations of the annotations of this dataset to a dump folder.
@@ -1948,6 +2373,12 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
         show_skeleton: If False, the keypoint skeleton will not be drawn at all.
         show_seg: If False, the segmentation will not be drawn at all.
         show_details: If True, the filename of the current frame and other information will be written to the screen.
+        filename_pattern: Only applicable when preserve_filenames=False.
+                          Format string of the generated filenames (without the extension), e.g. 'frame_{:05d}'.
+        workers: If greater than 1, the images are rendered and saved in a pool of this many processes.
+                 The dataset is sent to each process once, and the filenames are assigned in order before rendering,
+                 so the saved files are the same as when workers=None.
+                 Duplicate filenames (with preserve_filenames=True) are reported before anything is saved.
         """
 
         # Prepare save directory
@@ -1963,32 +2394,41 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
             # Prepare Viewer
             viewer = SimpleVideoViewer(preview_width=1000, window_name='Annotation Visualization')
 
+        preview_kwargs = dict(
+            draw_order=draw_order,
+            bbox_color=bbox_color, bbox_thickness=bbox_thickness, # BBox
+            show_bbox_label=show_bbox_label, bbox_label_thickness=bbox_label_thickness,
+            bbox_label_color=bbox_label_color, bbox_label_orientation=bbox_label_orientation,
+            bbox_label_only=bbox_label_only,
+            seg_color=seg_color, seg_transparent=seg_transparent, # Segmentation
+            kpt_radius=kpt_radius, kpt_color=kpt_color, # Keypoints
+            show_kpt_labels=show_kpt_labels, kpt_label_thickness=kpt_label_thickness,
+            kpt_label_color=kpt_label_color,
+            kpt_label_only=kpt_label_only, ignore_kpt_idx=ignore_kpt_idx,
+            kpt_idx_offset=kpt_idx_offset,
+            skeleton_thickness=skeleton_thickness, skeleton_color=skeleton_color, # Skeleton
+            details_corner_pos_ratio=details_corner_pos_ratio,
+            details_height_ratio=details_height_ratio,
+            details_leeway=details_leeway, details_color=details_color,
+            details_thickness=details_thickness,
+            show_bbox=show_bbox, show_kpt=show_kpt,
+            show_skeleton=show_skeleton, show_seg=show_seg,
+            show_details=show_details
+        ) if show_annotations else None
+
+        path_allocator = DumpPathAllocator(dump_dir=save_dir, pattern=filename_pattern) if not preserve_filenames else None
         last_idx = len(self.images) if end_idx is None else end_idx
         total_iter = len(self.images[start_idx:last_idx])
+        if workers is not None and workers >= 2:
+            self._save_visualization_parallel(
+                image_list=list(self.images[start_idx:last_idx]), save_dir=save_dir,
+                path_allocator=path_allocator, preview_kwargs=preview_kwargs,
+                viewer=viewer if show_preview else None, workers=workers
+            )
+            return
         for coco_image in tqdm(self.images[start_idx:last_idx], total=total_iter, leave=False):
             if show_annotations:
-                img = self.get_preview(
-                    image_id=coco_image.id,
-                    draw_order=draw_order,
-                    bbox_color=bbox_color, bbox_thickness=bbox_thickness, # BBox
-                    show_bbox_label=show_bbox_label, bbox_label_thickness=bbox_label_thickness,
-                    bbox_label_color=bbox_label_color, bbox_label_orientation=bbox_label_orientation,
-                    bbox_label_only=bbox_label_only,
-                    seg_color=seg_color, seg_transparent=seg_transparent, # Segmentation
-                    kpt_radius=kpt_radius, kpt_color=kpt_color, # Keypoints
-                    show_kpt_labels=show_kpt_labels, kpt_label_thickness=kpt_label_thickness,
-                    kpt_label_color=kpt_label_color,
-                    kpt_label_only=kpt_label_only, ignore_kpt_idx=ignore_kpt_idx,
-                    kpt_idx_offset=kpt_idx_offset,
-                    skeleton_thickness=skeleton_thickness, skeleton_color=skeleton_color, # Skeleton
-                    details_corner_pos_ratio=details_corner_pos_ratio,
-                    details_height_ratio=details_height_ratio,
-                    details_leeway=details_leeway, details_color=details_color,
-                    details_thickness=details_thickness,
-                    show_bbox=show_bbox, show_kpt=show_kpt,
-                    show_skeleton=show_skeleton, show_seg=show_seg,
-                    show_details=show_details
-                )
+                img = self.get_preview(image_id=coco_image.id, **preview_kwargs)
             else:
                 img = cv2.imread(coco_image.coco_url)
 
@@ -2001,7 +2441,7 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
                 cv2.imwrite(save_path, img)
             else:
                 file_extension = get_extension_from_filename(coco_image.file_name)
-                save_path = get_next_dump_path(dump_dir=save_dir, file_extension=file_extension)
+                save_path = path_allocator.next_path(file_extension=file_extension)
                 cv2.imwrite(save_path, img)
 
             if show_preview:
@@ -2009,6 +2449,42 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
                 if quit_flag:
                     break
 
+    def _save_visualization_parallel(
+        self, image_list: List[COCO_Image], save_dir: str, path_allocator: DumpPathAllocator,
+        preview_kwargs: Dict[str, Any], viewer: SimpleVideoViewer, workers: int
+    ):
+        # Process pool mode of save_visualization. The save paths are assigned here, in order,
+        # so that the filenames don't depend on the order in which the workers finish.
+        tasks = []
+        save_path_set = set()
+        for coco_image in image_list:
+            if path_allocator is None:
+                save_path = f'{save_dir}/{coco_image.file_name}'
+                if save_path in save_path_set or file_exists(save_path):
+                    logger.error(f"Your dataset contains multiple instances of the same filename.")
+                    logger.error(f"Either make all filenames unique or use preserve_filenames=False")
+                    raise Exception
+                save_path_set.add(save_path)
+            else:
+                save_path = path_allocator.next_path(file_extension=get_extension_from_filename(coco_image.file_name))
+            tasks.append((coco_image.id, save_path, viewer is not None))
+
+        results = imap_ordered(
+            _save_vis_image, tasks, workers=workers,
+            initializer=_init_vis_worker, initargs=(self, preview_kwargs)
+        )
+        try:
+            for coco_image, (img, error) in tqdm(zip(image_list, results), total=len(tasks), leave=False):
+                if error is not None:
+                    logger.error(f'Failed to save visualization of {coco_image.coco_url}')
+                    raise error
+                if viewer is not None:
+                    quit_flag = viewer.show(img)
+                    if quit_flag:
+                        break
+        finally:
+            results.close()
+
     def save_video(
         self, save_path: str='viz.mp4', show_preview: bool=False,
         fps: int=20, rescale_before_pad: bool=True,
@@ -2031,7 +2507,8 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
         details_thickness: int=2,
         show_bbox: bool=True, show_kpt: bool=True, # Show Flags
         show_skeleton: bool=True, show_seg: bool=True,
-        show_details: bool=False
+        show_details: bool=False,
+        workers: int=None, prefetch_workers: int=4, max_pending_frames: int=16
     ):
         """
         save_path: Path to where you would like to save the visualization video of this dataset.
@@ -2096,6 +2573,12 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
         show_skeleton: If False, the keypoint skeleton will not be drawn at all.
         show_seg: If False, the segmentation will not be drawn at all.
         show_details: If True, the filename of the current frame and other information will be written to the screen.
+        workers: If greater than 1, the frames are read, drawn, rescaled and padded in a pool of this many processes.
+                 Otherwise, the frames are drawn in this process while a pool of threads reads the next images.
+                 Either way, the frames are encoded in a separate thread in the original order.
+        prefetch_workers: The number of threads that read images ahead of time when workers is less than 2.
+        max_pending_frames: The maximum number of frames that are read or drawn ahead of the frame being encoded,
+                            which bounds the memory used by the pipeline.
         """
         # Check Output Path
         if file_exists(save_path) and not overwrite:
@@ -2103,6 +2586,7 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
             raise Exception
 
         # Prepare Video Writer
+        # The frame size is taken from the image records, so no images need to be read for it.
         dim_list = np.array([[coco_image.height, coco_image.width] for coco_image in self.images])
         max_h, max_w = dim_list.max(axis=0).tolist()
         recorder = Recorder(output_path=save_path, output_dims=(max_w, max_h), fps=fps)
@@ -2111,49 +2595,78 @@ class COCO_Dataset(BasicLoadableObject['COCO_Dataset']):
             # Prepare Viewer
             viewer = SimpleVideoViewer(preview_width=1000, window_name='Annotation Visualization')
 
+        preview_kwargs = dict(
+            draw_order=draw_order,
+            bbox_color=bbox_color, bbox_thickness=bbox_thickness, # BBox
+            show_bbox_label=show_bbox_label, bbox_label_thickness=bbox_label_thickness,
+            bbox_label_color=bbox_label_color, bbox_label_orientation=bbox_label_orientation,
+            bbox_label_only=bbox_label_only,
+            seg_color=seg_color, seg_transparent=seg_transparent, # Segmentation
+            kpt_radius=kpt_radius, kpt_color=kpt_color, # Keypoints
+            show_kpt_labels=show_kpt_labels, kpt_label_thickness=kpt_label_thickness,
+            kpt_label_color=kpt_label_color,
+            kpt_label_only=kpt_label_only, ignore_kpt_idx=ignore_kpt_idx,
+            kpt_idx_offset=kpt_idx_offset,
+            skeleton_thickness=skeleton_thickness, skeleton_color=skeleton_color, # Skeleton
+            details_corner_pos_ratio=details_corner_pos_ratio,
+            details_height_ratio=details_height_ratio,
+            details_leeway=details_leeway, details_color=details_color,
+            details_thickness=details_thickness,
+            show_bbox=show_bbox, show_kpt=show_kpt,
+            show_skeleton=show_skeleton, show_seg=show_seg,
+            show_details=show_details
+        ) if show_annotations else None
+
         last_idx = len(self.images) if end_idx is None else end_idx
-        relevant_images = self.images[start_idx:last_idx]
-        pbar = tqdm(total=len(relevant_images), unit='frame(s)')
-        pbar.set_description('Writing Video...')
-        for coco_image in relevant_images:
-            if show_annotations:
-                img = self.get_preview(
-                    image_id=coco_image.id,
-                    draw_order=draw_order,
-                    bbox_color=bbox_color, bbox_thickness=bbox_thickness, # BBox
-                    show_bbox_label=show_bbox_label, bbox_label_thickness=bbox_label_thickness,
-                    bbox_label_color=bbox_label_color, bbox_label_orientation=bbox_label_orientation,
-                    bbox_label_only=bbox_label_only,
-                    seg_color=seg_color, seg_transparent=seg_transparent, # Segmentation
-                    kpt_radius=kpt_radius, kpt_color=kpt_color, # Keypoints
-                    show_kpt_labels=show_kpt_labels, kpt_label_thickness=kpt_label_thickness,
-                    kpt_label_color=kpt_label_color,
-                    kpt_label_only=kpt_label_only, ignore_kpt_idx=ignore_kpt_idx,
-                    kpt_idx_offset=kpt_idx_offset,
-                    skeleton_thickness=skeleton_thickness, skeleton_color=skeleton_color, # Skeleton
-                    details_corner_pos_ratio=details_corner_pos_ratio,
-                    details_height_ratio=details_height_ratio,
-                    details_leeway=details_leeway, details_color=details_color,
-                    details_thickness=details_thickness,
-                    show_bbox=show_bbox, show_kpt=show_kpt,
-                    show_skeleton=show_skeleton, show_seg=show_seg,
-                    show_details=show_details
+        relevant_images = list(self.images[start_idx:last_idx])
+        decoded_imgs = None
+        if workers is not None and workers >= 2:
+            # Every process reads and draws whole frames. imap_ordered only keeps a limited number of frames in flight.
+            frames = imap_ordered(
+                _render_video_frame_in_worker,
+                [(coco_image.id, max_h, max_w, rescale_before_pad) for coco_image in relevant_images],
+                workers=workers, max_pending_chunks=max(max_pending_frames, workers),
+                initializer=_init_vis_worker, initargs=(self, preview_kwargs)
+            )
+        else:
+            # Read the next images in threads while the current one is drawn here.
+            decoded_imgs = imap_ordered(
+                cv2.imread, [coco_image.coco_url for coco_image in relevant_images],
+                workers=prefetch_workers, max_pending_chunks=max_pending_frames, use_threads=True
+            )
+            frames = (
+                (
+                    _render_video_frame(
+                        self, preview_kwargs, image_id=coco_image.id, img=img,
+                        max_h=max_h, max_w=max_w, rescale_before_pad=rescale_before_pad
+                    ) if error is None else None,
+                    error
                 )
-            else:
-                img = cv2.imread(coco_image.coco_url)
+                for coco_image, (img, error) in zip(relevant_images, decoded_imgs)
+            )
+        writer = BackgroundWriter(recorder.write, max_pending=max_pending_frames)
 
-            if rescale_before_pad:
-                img = scale_to_max(img=img, target_shape=[max_h, max_w])
-            img = pad_to_max(img=img, target_shape=[max_h, max_w])
-            recorder.write(img)
-            pbar.update()
+        pbar = tqdm(total=len(relevant_images), unit='frame(s)')
+        pbar.set_description('Writing Video...')
+        try:
+            for coco_image, (img, error) in zip(relevant_images, frames):
+                if error is not None:
+                    logger.error(f'Failed to render video frame: {coco_image.coco_url}')
+                    raise error
+                writer.put(img)
+                pbar.update()
 
-            if show_preview:
-                quit_flag = viewer.show(img)
-                if quit_flag:
-                    break
-        pbar.close()
-        recorder.close()
+                if show_preview:
+                    quit_flag = viewer.show(img)
+                    if quit_flag:
+                        break
+        finally:
+            frames.close()
+            if decoded_imgs is not None:
+                decoded_imgs.close()
+            pbar.close()
+            writer.close()
+            recorder.close()
 
 class COCO_Dataset_List(
     BasicLoadableHandler['COCO_Dataset_List', 'COCO_Dataset'],
@@ -2174,13 +2687,13 @@ class COCO_Dataset_List(
         if file_exists(save_path) and not overwrite:
             logger.error(f'File already exists at save_path: {save_path}')
             raise Exception
-        json.dump(self.to_dict_list(strict=strict), open(save_path, 'w'), indent=2, ensure_ascii=False)
+        dump_json(self.to_dict_list(strict=strict), save_path)
     
     @classmethod
     def load_from_path(cls, json_path: str, strict: bool=True) -> COCO_Dataset_List:
         if not file_exists(json_path):
             raise FileNotFoundError(f"Couldn't find {self.__class__.__name__} dump json at {json_path}.")
-        item_dict_list = json.load(open(json_path, 'r'))
+        item_dict_list = load_json(json_path)
         return COCO_Dataset_List.from_dict_list(item_dict_list, strict=strict)
 
 class Labeled_COCO_Dataset(BasicLoadableObject['Labeled_COCO_Dataset']):
@@ -2206,13 +2719,13 @@ class Labeled_COCO_Dataset(BasicLoadableObject['Labeled_COCO_Dataset']):
         if file_exists(save_path) and not overwrite:
             logger.error(f'File already exists at save_path: {save_path}')
             raise Exception
-        json.dump(self.to_dict(strict=strict), open(save_path, 'w'), indent=2, ensure_ascii=False)
+        dump_json(self.to_dict(strict=strict), save_path)
     
     @classmethod
     def load_from_path(cls, json_path: str, strict: bool=True) -> Labeled_COCO_Dataset:
         if not file_exists(json_path):
             raise FileNotFoundError(f"Couldn't find {self.__class__.__name__} dump json at {json_path}.")
-        item_dict = json.load(open(json_path, 'r'))
+        item_dict = load_json(json_path)
         return Labeled_COCO_Dataset.from_dict(item_dict, strict=strict)
 
 class Labeled_COCO_Dataset_List(
@@ -2242,11 +2755,11 @@ class Labeled_COCO_Dataset_List(
         if file_exists(save_path) and not overwrite:
             logger.error(f'File already exists at save_path: {save_path}')
             raise Exception
-        json.dump(self.to_dict_list(strict=strict), open(save_path, 'w'), indent=2, ensure_ascii=False)
+        dump_json(self.to_dict_list(strict=strict), save_path)
     
     @classmethod
     def load_from_path(cls, json_path: str, strict: bool=True) -> Labeled_COCO_Dataset_List:
         if not file_exists(json_path):
             raise FileNotFoundError(f"Couldn't find {self.__class__.__name__} dump json at {json_path}.")
-        item_dict_list = json.load(open(json_path, 'r'))
+        item_dict_list = load_json(json_path)
         return Labeled_COCO_Dataset_List.from_dict_list(item_dict_list, strict=strict)
\ No newline at end of file
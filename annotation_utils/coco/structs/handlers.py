@@ -1,22 +1,30 @@
 from __future__ import annotations
 
-from typing import List
-import json
+from typing import List, Iterator
 import operator
+from collections import Counter
 import random
+import numpy as np
 
 from logger import logger
 from common_utils.check_utils import check_type, check_type_from_list, \
     check_file_exists, check_value_from_list
-from common_utils.path_utils import get_extension_from_filename
+from common_utils.path_utils import get_extension_from_filename, get_extension_from_path
 from common_utils.file_utils import file_exists
+from common_utils.path_utils import get_all_files_in_extension_list
+from common_utils.constants import opencv_compatible_img_extensions
 
 from .objects import COCO_License, COCO_Image, COCO_Annotation, COCO_Category
+from .columnar import COCO_Annotation_Columns
 # from ...base import BaseStructHandler
-from common_utils.base.basic import BasicLoadableIdHandler, BasicHandler
+from common_utils.base.basic import BasicHandler
+from ...base.indexed import IndexedIdHandler
+from ...util.json_stream import load_json, dump_json
+from ...util.image_probe import probe_images
+from ...util.image_meta_cache import ImageMetadataCache
 
 class COCO_License_Handler(
-    BasicLoadableIdHandler['COCO_License_Handler', 'COCO_License'],
+    IndexedIdHandler['COCO_License_Handler', 'COCO_License'],
     BasicHandler['COCO_License_Handler', 'COCO_License']
 ):
     """A handler class that is used to manage/manipulate COCO_License objects.
@@ -31,40 +39,37 @@ class COCO_License_Handler(
             license_list=[COCO_License.from_dict(license_dict) for license_dict in dict_list]
         )
 
+    def save_to_path(self, save_path: str, overwrite: bool=False):
+        if get_extension_from_path(save_path) == 'yaml':
+            super().save_to_path(save_path, overwrite=overwrite)
+            return
+        if file_exists(save_path) and not overwrite:
+            logger.error(f'File already exists at save_path: {save_path}')
+            raise Exception
+        dump_json(self.to_dict_list(), save_path)
+
     @classmethod
     def load_from_path(cls, json_path: str) -> COCO_License_Handler:
         check_file_exists(json_path)
-        json_data = json.load(open(json_path, 'r'))
+        json_data = load_json(json_path)
         return COCO_License_Handler.from_dict_list(json_data)
 
     def remove(self, id_list: List[int], verbose: bool=False):
-        # TODO: Create a base class that inherits from BaseStruct that requires an id class parameter
-        # This method could be added to the base handler of the resulting object class.
-        if len(id_list) > 0:
-            idx_list = list(range(len(self)))
-            idx_list.reverse()
-            for idx in idx_list:
-                if self[idx].id in id_list:
-                    del self[idx]
-                    if verbose:
-                        logger.info(f'Deleted License Id: {idx}')
+        removed_ids = self.remove_ids(id_list)
+        if verbose:
+            for removed_id in removed_ids:
+                logger.info(f'Deleted License Id: {removed_id}')
 
     def remove_if_no_imgs(self, img_handler: COCO_Image_Handler, id_list: List[int]=None, verbose: bool=False):
-        rm_license_id_list = []
-        if id_list is not None:
-            for license_id in id_list:
-                imgs = img_handler.get_images_from_licenseIds([license_id])
-                if len(imgs) == 0:
-                    rm_license_id_list.append(license_id)
-        else:
-            for coco_license in self:
-                imgs = img_handler.get_images_from_licenseIds([coco_license.id])
-                if len(imgs) == 0:
-                    rm_license_id_list.append(license_id)
+        # The license_id index of the image handler holds the images of every license, so no images need to be scanned.
+        license_index = img_handler._get_index('license_id')
+        if id_list is None:
+            id_list = [coco_license.id for coco_license in self]
+        rm_license_id_list = [license_id for license_id in id_list if len(license_index.get(license_id, [])) == 0]
         self.remove(rm_license_id_list, verbose=verbose)
 
 class COCO_Image_Handler(
-    BasicLoadableIdHandler['COCO_Image_Handler', 'COCO_Image'],
+    IndexedIdHandler['COCO_Image_Handler', 'COCO_Image'],
     BasicHandler['COCO_Image_Handler', 'COCO_Image']
 ):
     """A handler class that is used to manage/manipulate COCO_Image objects.
@@ -127,7 +132,14 @@ class COCO_Image_Handler(
                 )
             )
         ```
+
+    The same thing can be done with from_img_dir, which reads the image sizes in parallel:
+        ```python
+        images = COCO_Image_Handler.from_img_dir('/path/to/image/directory', license_id=0)
+        ```
     """
+    index_attr_names = ['id', 'license_id']
+
     def __init__(self, image_list: List[COCO_Image]=None):
         super().__init__(obj_type=COCO_Image, obj_list=image_list)
         self.image_list = self.obj_list
@@ -150,20 +162,15 @@ class COCO_Image_Handler(
         return extension_list
 
     def get_images_from_imgIds(self, imgIds: list) -> List[COCO_Image]:	
-        if type(imgIds) is list:
-            return [x for x in self if x.id in imgIds]
-        elif type(imgIds) is int:
-            return [x for x in self if x.id in [imgIds]]
-        else:
-            raise TypeError
+        return self._get_objs_from_index('id', imgIds)
 
     def get_images_from_licenseIds(self, licenseIds: List[int]) -> List[COCO_Image]:
-        if type(licenseIds) is list:
-            return [x for x in self if x.license_id in licenseIds]
-        elif type(licenseIds) is int:
-            return [x for x in self if x.license_id in [licenseIds]]
-        else:
-            raise TypeError
+        """
+        Returns the images whose license_id is in licenseIds, in handler order.
+        If you change the license_id of an image that is already in the handler, call reindex() afterwards.
+        Otherwise, the image may not be found under its new license_id.
+        """
+        return self._get_objs_from_index('license_id', licenseIds)
 
     @classmethod
     def from_dict_list(cls, dict_list: List[dict]) -> COCO_Image_Handler:
@@ -171,23 +178,54 @@ class COCO_Image_Handler(
             image_list=[COCO_Image.from_dict(image_dict) for image_dict in dict_list]
         )
 
+    def save_to_path(self, save_path: str, overwrite: bool=False):
+        if get_extension_from_path(save_path) == 'yaml':
+            super().save_to_path(save_path, overwrite=overwrite)
+            return
+        if file_exists(save_path) and not overwrite:
+            logger.error(f'File already exists at save_path: {save_path}')
+            raise Exception
+        dump_json(self.to_dict_list(), save_path)
+
     @classmethod
     def load_from_path(cls, json_path: str) -> COCO_Image_Handler:
         check_file_exists(json_path)
-        json_data = json.load(open(json_path, 'r'))
+        json_data = load_json(json_path)
         return COCO_Image_Handler.from_dict_list(json_data)
 
+    @classmethod
+    def from_img_dir(
+        cls, img_dir: str, license_id: int=0, extension_list: List[str]=None,
+        workers: int=8, show_pbar: bool=False, img_meta_cache: ImageMetadataCache=None
+    ) -> COCO_Image_Handler:
+        """
+        Creates a COCO_Image for every image in img_dir, with ids in the order that the images are found.
+        The sizes of the images are read from the file headers with a pool of threads, so the images aren't decoded.
+
+        license_id: The license id of every image.
+        extension_list: The file extensions that are regarded as images. Defaults to every extension that opencv can read.
+        workers: The number of images that are probed at the same time.
+        show_pbar: If True, a progress bar shows the number of images probed so far.
+        img_meta_cache: If given, only the images that aren't in this ImageMetadataCache yet are probed.
+        """
+        img_paths = get_all_files_in_extension_list(
+            dir_path=img_dir,
+            extension_list=extension_list if extension_list is not None else opencv_compatible_img_extensions
+        )
+        if img_meta_cache is not None:
+            img_info_list = img_meta_cache.get_many(img_paths, workers=workers, show_pbar=show_pbar)
+        else:
+            img_info_list = probe_images(img_paths, workers=workers, show_pbar=show_pbar)
+        return cls([
+            COCO_Image.from_img_path(img_path=img_path, license_id=license_id, image_id=i, img_info=img_info)
+            for i, (img_path, img_info) in enumerate(zip(img_paths, img_info_list))
+        ])
+
     def remove(self, id_list: List[int], verbose: bool=False):
-        # TODO: Create a base class that inherits from BaseStruct that requires an id class parameter
-        # This method could be added to the base handler of the resulting object class.
-        if len(id_list) > 0:
-            idx_list = list(range(len(self)))
-            idx_list.reverse()
-            for idx in idx_list:
-                if self[idx].id in id_list:
-                    del self[idx]
-                    if verbose:
-                        logger.info(f'Deleted Image Id: {idx}')
+        removed_ids = self.remove_ids(id_list)
+        if verbose:
+            for removed_id in removed_ids:
+                logger.info(f'Deleted Image Id: {removed_id}')
     
     def remove_if_no_anns(self, ann_handler: COCO_Annotation_Handler, license_handler: COCO_License_Handler=None, id_list: List[int]=None, verbose: bool=False):
         """Removes all of the COCO_Image objects in the handler that do not have any corresponding annotations.
@@ -205,116 +243,254 @@ class COCO_Image_Handler(
                 If None, all images are checked.
             ] (default: {None})
         """
-        rm_image_id_list = []
-        if id_list is not None:
-            for image_id in id_list:
-                anns = ann_handler.get_annotations_from_imgIds([image_id])
-                if len(anns) == 0:
-                    rm_image_id_list.append(image_id)
-        else:
-            for coco_image in self:
-                anns = ann_handler.get_annotations_from_imgIds([coco_image.id])
-                if len(anns) == 0:
-                    rm_image_id_list.append(coco_image.id)
-        self.remove(rm_image_id_list, verbose=verbose)
+        image_index = ann_handler._get_index('image_id')
+        if id_list is None:
+            id_list = [coco_image.id for coco_image in self]
+        rm_image_id_list = [image_id for image_id in id_list if len(image_index.get(image_id, [])) == 0]
+        self.remove_and_cascade(rm_image_id_list, license_handler=license_handler, verbose=verbose)
+
+    def remove_and_cascade(self, id_list: List[int], license_handler: COCO_License_Handler=None, verbose: bool=False):
+        """Removes the images in id_list, and then every license in license_handler that no longer has any images.
+
+        The number of images that each license has is read from the license_id index before anything is removed,
+        so finding the licenses that are left without images only depends on the number of removed images
+        and the number of licenses, not on the number of images in the handler.
+        """
+        id_index = self._get_index('id')
+        rm_positions = sorted(set([idx for image_id in set(id_list) for idx in id_index.get(image_id, [])]))
+        rm_license_id_list = []
+        if license_handler is not None:
+            license_index = self._get_index('license_id')
+            removed_counts = Counter([self.obj_list[idx].license_id for idx in rm_positions])
+            rm_license_id_list = [
+                coco_license.id for coco_license in license_handler
+                if len(license_index.get(coco_license.id, [])) == removed_counts.get(coco_license.id, 0)
+            ]
+        remove_mask = np.zeros(len(self.obj_list), dtype=bool)
+        remove_mask[rm_positions] = True
+        removed_ids = self.remove_by_mask(remove_mask)
+        if verbose:
+            for removed_id in removed_ids:
+                logger.info(f'Deleted Image Id: {removed_id}')
         if license_handler is not None:
-            pending_license_id_list = [license.id for license in license_handler]
-            license_handler.remove_if_no_imgs(img_handler=self, id_list=pending_license_id_list, verbose=verbose)
+            license_handler.remove(rm_license_id_list, verbose=verbose)
 
 class COCO_Annotation_Handler(
-    BasicLoadableIdHandler['COCO_Annotation_Handler', 'COCO_Annotation'],
+    IndexedIdHandler['COCO_Annotation_Handler', 'COCO_Annotation'],
     BasicHandler['COCO_Annotation_Handler', 'COCO_Annotation']
 ):
     """A handler class that is used to manage/manipulate COCO_Annotation objects.
+
+    The handler maintains image_id, category_id and id indexes so that lookups such as
+    get_annotations_from_imgIds don't need to scan every annotation.
+    If you change the image_id or category_id of an annotation that is already in the handler,
+    call reindex() afterwards.
+
+    annotation_list can also be a COCO_Annotation_Columns, in which case the annotation data is kept
+    in NumPy arrays and COCO_Annotation objects are only created when they are accessed.
+    This is much lighter on memory for large datasets. Refer to from_dict_list(..., columnar=True).
     """
+    index_attr_names = ['id', 'image_id', 'category_id']
+
     def __init__(self, annotation_list: List[COCO_Annotation]=None):
-        super().__init__(obj_type=COCO_Annotation, obj_list=annotation_list)
+        if isinstance(annotation_list, COCO_Annotation_Columns):
+            # Type checking every item would materialize the whole column store.
+            super().__init__(obj_type=COCO_Annotation)
+            self.obj_list = annotation_list
+        else:
+            super().__init__(obj_type=COCO_Annotation, obj_list=annotation_list)
         self.annotation_list = self.obj_list
 
-    def get_annotations_from_annIds(self, annIds: list) -> List[COCO_Annotation]:		
-        if type(annIds) is list:
-            return [ann for ann in self if ann.id in annIds]
-        elif type(annIds) is int:
-            return [ann for ann in self if ann.id in [annIds]]
-        else:
-            raise TypeError
-        
-    def get_annotations_from_imgIds(self, imgIds: list) -> List[COCO_Annotation]:		
-        if type(imgIds) is list:
-            return [ann for ann in self if ann.image_id in imgIds]
-        elif type(imgIds) is int:
-            return [ann for ann in self if ann.image_id in [imgIds]]
+    @property
+    def is_columnar(self) -> bool:
+        return isinstance(self.obj_list, COCO_Annotation_Columns)
+
+    def to_columnar(self) -> COCO_Annotation_Handler:
+        """Returns a columnar copy of this handler. Refer to COCO_Annotation_Columns."""
+        if self.is_columnar:
+            return COCO_Annotation_Handler(self.obj_list.deepcopy())
+        return COCO_Annotation_Handler(COCO_Annotation_Columns.from_annotations(self.obj_list))
+
+    def flush(self):
+        """
+        For columnar handlers, packs the annotations that have been accessed back into the NumPy arrays
+        so that their COCO_Annotation objects can be freed. Does nothing otherwise.
+        """
+        if self.is_columnar:
+            self.obj_list.flush()
+            self.reindex()
+
+    def copy(self) -> COCO_Annotation_Handler:
+        if self.is_columnar:
+            return COCO_Annotation_Handler(self.obj_list.deepcopy())
+        return super().copy()
+
+    def sort(self, attr_name: str, reverse: bool=False):
+        if self.is_columnar and attr_name in ['id', 'image_id', 'category_id'] and len(self) > 0:
+            values = self.obj_list.get_column(attr_name)
+            if values.dtype != object:
+                self.obj_list.sort_by_column(attr_name, reverse=reverse)
+                self.reindex()
+                return
+        super().sort(attr_name=attr_name, reverse=reverse)
+
+    def shuffle(self):
+        if self.is_columnar:
+            order = list(range(len(self)))
+            random.shuffle(order)
+            self.obj_list.permute(order)
+            self.reindex()
         else:
-            raise TypeError
-    
+            super().shuffle()
+
+    def get_annotations_from_annIds(self, annIds: list) -> List[COCO_Annotation]:
+        return self._get_objs_from_index('id', annIds)
+
+    def get_annotations_from_imgIds(self, imgIds: list) -> List[COCO_Annotation]:
+        """
+        Returns the annotations whose image_id is in imgIds, in handler order.
+        If you change the image_id of an annotation that is already in the handler, call reindex() afterwards.
+        Otherwise, the annotation may not be found under its new image_id.
+        """
+        return self._get_objs_from_index('image_id', imgIds)
+
     def get_annotations_from_catIds(self, catIds: list) -> List[COCO_Annotation]:
-        if type(catIds) is list:
-            return [ann for ann in self if ann.category_id in catIds]
-        elif type(catIds) is int:
-            return [ann for ann in self if ann.category_id in [catIds]]
+        """
+        Returns the annotations whose category_id is in catIds, in handler order.
+        If you change the category_id of an annotation that is already in the handler, call reindex() afterwards.
+        Otherwise, the annotation may not be found under its new category_id.
+        """
+        return self._get_objs_from_index('category_id', catIds)
+
+    def get_column(self, attr_name: str) -> np.ndarray:
+        """
+        Returns the values of one attribute of every annotation as an array, in order.
+        Columnar handlers read the arrays directly. Otherwise the values are collected from the annotation objects.
+
+        attr_name: One of 'id', 'image_id', 'category_id', 'num_keypoints', 'num_visible_keypoints', 'area' or 'bbox'.
+                   See COCO_Annotation_Columns.get_column.
+        """
+        if self.is_columnar:
+            return self.obj_list.get_column(attr_name)
+        if attr_name == 'num_visible_keypoints':
+            return np.array([sum([kpt.visibility > 0 for kpt in coco_ann.keypoints]) for coco_ann in self], dtype=np.int64)
+        elif attr_name == 'bbox':
+            return np.array([coco_ann.bbox.to_list() for coco_ann in self], dtype=np.float64).reshape(-1, 4)
+        elif attr_name == 'area':
+            return np.array([coco_ann.area if coco_ann.area is not None else np.nan for coco_ann in self], dtype=np.float64)
+        elif attr_name in ['id', 'image_id', 'category_id', 'num_keypoints']:
+            values = [getattr(coco_ann, attr_name) for coco_ann in self]
+            return np.array(values, dtype=np.int64 if all([type(value) is int for value in values]) else object)
         else:
-            raise TypeError
+            logger.error(f'Invalid attr_name: {attr_name}')
+            raise Exception
+
+    def iter_dicts(self, strict: bool=True) -> Iterator[dict]:
+        """Same as to_dict_list, but converts one annotation at a time."""
+        if self.is_columnar:
+            yield from self.obj_list.iter_dicts(strict=strict)
+        else:
+            for item in self:
+                yield item.to_dict(strict=strict)
 
     def to_dict_list(self, strict: bool=True) -> List[dict]:
-        return [item.to_dict(strict=strict) for item in self]
+        return list(self.iter_dicts(strict=strict))
+
+    def iter_readonly(self, positions: List[int]=None) -> Iterator[COCO_Annotation]:
+        """
+        Iterates over the annotations, or only the ones at the given positions, for reading.
+        Columnar handlers don't keep the annotation objects that are created for this, so changes made to them may be lost.
+        Refer to COCO_Annotation_Columns.iter_readonly. Otherwise, the annotations themselves are yielded.
+        """
+        if self.is_columnar:
+            yield from self.obj_list.iter_readonly(positions)
+        elif positions is None:
+            yield from self.obj_list
+        else:
+            for idx in positions:
+                yield self.obj_list[idx]
 
     def save_to_path(self, save_path: str, overwrite: bool=False, strict: bool=True):
         if file_exists(save_path) and not overwrite:
             logger.error(f'File already exists at save_path: {save_path}')
             raise Exception
         json_data = self.to_dict_list(strict=strict)
-        json.dump(json_data, open(save_path, 'w'), indent=2, ensure_ascii=False)
+        dump_json(json_data, save_path)
 
     @classmethod
-    def from_dict_list(cls, dict_list: List[dict], strict: bool=True) -> COCO_Annotation_Handler:
+    def from_dict_list(cls, dict_list: List[dict], strict: bool=True, columnar: bool=False) -> COCO_Annotation_Handler:
+        if columnar:
+            return COCO_Annotation_Handler(
+                annotation_list=COCO_Annotation_Columns.from_dict_list(dict_list, strict=strict)
+            )
         return COCO_Annotation_Handler(
             annotation_list=[COCO_Annotation.from_dict(ann_dict, strict=strict) for ann_dict in dict_list]
         )
 
     @classmethod
-    def load_from_path(cls, json_path: str, strict: bool=True) -> COCO_Annotation_Handler:
+    def load_from_path(cls, json_path: str, strict: bool=True, columnar: bool=False) -> COCO_Annotation_Handler:
         check_file_exists(json_path)
-        json_data = json.load(open(json_path, 'r'))
-        return COCO_Annotation_Handler.from_dict_list(json_data, strict=strict)
+        json_data = load_json(json_path)
+        return COCO_Annotation_Handler.from_dict_list(json_data, strict=strict, columnar=columnar)
 
     def remove(self, id_list: List[int], verbose: bool=False):
-        # TODO: Create a base class that inherits from BaseStruct that requires an id class parameter
-        # This method could be added to the base handler of the resulting object class.
-        if len(id_list) > 0:
-            idx_list = list(range(len(self)))
-            idx_list.reverse()
-            for idx in idx_list:
-                if self[idx].id in id_list:
-                    del self[idx]
-                    if verbose:
-                        logger.info(f'Deleted Annotation Id: {idx}')
+        removed_ids = self.remove_ids(id_list)
+        if verbose:
+            for removed_id in removed_ids:
+                logger.info(f'Deleted Annotation Id: {removed_id}')
     
     def remove_if_no_categories(
         self, cat_handler: COCO_Category_Handler,
         img_handler: COCO_Image_Handler=None, license_handler: COCO_License_Handler=None, id_list: List[int]=None, verbose: bool=False
     ):
-        rm_ann_id_list = []
-        pending_img_id_list = []
-        existing_cat_id_list = [cat.id for cat in cat_handler]
-
+        existing_cat_ids = set([cat.id for cat in cat_handler])
         if id_list is not None:
-            anns = self.get_annotations_from_annIds(id_list)
-            for ann in anns:
-                if ann.category_id not in existing_cat_id_list:
-                    rm_ann_id_list.append(ann.id)
-                    pending_img_id_list.append(ann.image_id)
+            id_index = self._get_index('id')
+            rm_positions = [
+                idx for ann_id in set(id_list) for idx in id_index.get(ann_id, [])
+                if self.obj_list[idx].category_id not in existing_cat_ids
+            ]
         else:
-            for ann in self:
-                if ann.category_id not in existing_cat_id_list:
-                    rm_ann_id_list.append(ann.id)
-                    pending_img_id_list.append(ann.image_id)
-        
-        self.remove(rm_ann_id_list, verbose=verbose)
+            # Only the annotations of the missing categories are visited.
+            category_index = self._get_index('category_id')
+            rm_positions = [
+                idx for category_id, idx_list in category_index.items() if category_id not in existing_cat_ids
+                for idx in idx_list
+            ]
+        self.remove_and_cascade(rm_positions, img_handler=img_handler, license_handler=license_handler, verbose=verbose)
+
+    def remove_and_cascade(
+        self, positions: List[int],
+        img_handler: COCO_Image_Handler=None, license_handler: COCO_License_Handler=None, verbose: bool=False
+    ):
+        """Removes the annotations at the given positions, then every image in img_handler that no longer has any annotations,
+        and then every license in license_handler that no longer has any images.
+
+        The number of annotations of each image is read from the image_id index before anything is removed,
+        so the images that are left without annotations are found by only looking at the removed annotations.
+        """
+        rm_positions = sorted(set(positions))
+        image_index = self._get_index('image_id')
+        if hasattr(self.obj_list, 'get_column'):
+            rm_image_ids = self.obj_list.get_column('image_id')[rm_positions].tolist()
+        else:
+            rm_image_ids = [self.obj_list[idx].image_id for idx in rm_positions]
+        removed_counts = Counter(rm_image_ids)
+        rm_image_id_list = [
+            image_id for image_id, count in removed_counts.items()
+            if len(image_index.get(image_id, [])) == count
+        ]
+        remove_mask = np.zeros(len(self.obj_list), dtype=bool)
+        remove_mask[rm_positions] = True
+        removed_ids = self.remove_by_mask(remove_mask)
+        if verbose:
+            for removed_id in removed_ids:
+                logger.info(f'Deleted Annotation Id: {removed_id}')
         if img_handler is not None:
-            img_handler.remove_if_no_anns(ann_handler=self, license_handler=license_handler, id_list=pending_img_id_list, verbose=verbose)
+            img_handler.remove_and_cascade(rm_image_id_list, license_handler=license_handler, verbose=verbose)
 
 class COCO_Category_Handler(
-    BasicLoadableIdHandler['COCO_Category_Handler', 'COCO_Category'],
+    IndexedIdHandler['COCO_Category_Handler', 'COCO_Category'],
     BasicHandler['COCO_Category_Handler', 'COCO_Category']
 ):
     """A handler class that is used to manage/manipulate COCO_Category objects.
@@ -453,7 +629,7 @@ class COCO_Category_Handler(
             logger.error(f'File already exists at save_path: {save_path}')
             raise Exception
         json_data = self.to_dict_list(strict=strict)
-        json.dump(json_data, open(save_path, 'w'), indent=2, ensure_ascii=False)
+        dump_json(json_data, save_path)
 
     @classmethod
     def from_dict_list(cls, dict_list: List[dict], strict: bool=True) -> COCO_Category_Handler:
@@ -464,20 +640,14 @@ class COCO_Category_Handler(
     @classmethod
     def load_from_path(cls, json_path: str, strict: bool=True) -> COCO_Category_Handler:
         check_file_exists(json_path)
-        json_data = json.load(open(json_path, 'r'))
+        json_data = load_json(json_path)
         return COCO_Category_Handler.from_dict_list(json_data, strict=strict)
     
     def remove(self, id_list: List[int], verbose: bool=False):
-        # TODO: Create a base class that inherits from BaseStruct that requires an id class parameter
-        # This method could be added to the base handler of the resulting object class.
-        if len(id_list) > 0:
-            idx_list = list(range(len(self)))
-            idx_list.reverse()
-            for idx in idx_list:
-                if self[idx].id in id_list:
-                    del self[idx]
-                    if verbose:
-                        logger.info(f'Deleted Category Id: {idx}')
+        removed_ids = self.remove_ids(id_list)
+        if verbose:
+            for removed_id in removed_ids:
+                logger.info(f'Deleted Category Id: {removed_id}')
     
     def remove_by_name(
         self, names: List[str],
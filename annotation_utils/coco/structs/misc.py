@@ -1,9 +1,15 @@
 from __future__ import annotations
 from typing import List
+import numpy as np
 from logger import logger
+try:
+    from shapely import contains_xy
+except ImportError: # shapely < 2.0
+    from shapely.vectorized import contains as contains_xy
 from common_utils.check_utils import check_type_from_list, check_type
 from common_utils.common_types.bbox import BBox
 from common_utils.common_types.segmentation import Polygon
+from common_utils.common_types.point import Point2D
 from common_utils.common_types.keypoint import Keypoint2D
 from .objects import COCO_Category
 
@@ -59,4 +65,71 @@ class KeypointGroup:
                 raise Exception
         else:
             self.kpt_list.append(kpt)
-            self.kpt_label_list.append(label)
\ No newline at end of file
+            self.kpt_label_list.append(label)
+
+
+def get_bound_extents(bound_list: list) -> np.ndarray:
+    """Returns the xmin, ymin, xmax, ymax of every BBox/Polygon in bound_list as an array of shape (len(bound_list), 4)."""
+    extents = np.zeros((len(bound_list), 4), dtype=np.float64)
+    for i, bound_obj in enumerate(bound_list):
+        if type(bound_obj) is BBox:
+            coords = np.array([[bound_obj.xmin, bound_obj.ymin], [bound_obj.xmax, bound_obj.ymax]], dtype=np.float64)
+        elif type(bound_obj) is Polygon:
+            coords = np.array(bound_obj.to_list(demarcation=True), dtype=np.float64).reshape(-1, 2)
+        else:
+            raise TypeError
+        extents[i, :2] = coords.min(axis=0)
+        extents[i, 2:] = coords.max(axis=0)
+    return extents
+
+def get_points_within_bounds(point_list: List[Point2D], bound_list: list) -> np.ndarray:
+    """
+    Tests every point in point_list against every BBox/Polygon in bound_list at once.
+    Returns a boolean array of shape (len(bound_list), len(point_list)),
+    where result[i, j] is the same as point_list[j].within(bound_list[i]).
+
+    A point can only be within a bound if it is strictly inside the bound's extent, which is checked for all pairs with NumPy.
+    That check is already exact for bounding boxes, so shapely is only used for the points that pass it for a polygon,
+    with one vectorized call per polygon.
+    """
+    result = np.zeros((len(bound_list), len(point_list)), dtype=bool)
+    if len(bound_list) == 0 or len(point_list) == 0:
+        return result
+    points = np.array([[point.x, point.y] for point in point_list], dtype=np.float64)
+    extents = get_bound_extents(bound_list)
+    result[:] = \
+        (points[None, :, 0] > extents[:, None, 0]) & (points[None, :, 0] < extents[:, None, 2]) & \
+        (points[None, :, 1] > extents[:, None, 1]) & (points[None, :, 1] < extents[:, None, 3])
+    for i, bound_obj in enumerate(bound_list):
+        if type(bound_obj) is not Polygon:
+            continue
+        candidates = np.flatnonzero(result[i])
+        if len(candidates) == 0:
+            continue
+        result[i, candidates] = contains_xy(bound_obj.to_shapely(), points[candidates, 0], points[candidates, 1])
+    return result
+
+def get_bounds_containing(container_list: list, contained_list: list) -> np.ndarray:
+    """
+    Tests every BBox/Polygon in container_list against every BBox/Polygon in contained_list at once.
+    Returns a boolean array of shape (len(container_list), len(contained_list)),
+    where result[i, j] is the same as container_list[i].contains(contained_list[j]).
+
+    Only the pairs where the extent of contained_list[j] lies inside the extent of container_list[i] are passed on to shapely.
+    """
+    result = np.zeros((len(container_list), len(contained_list)), dtype=bool)
+    if len(container_list) == 0 or len(contained_list) == 0:
+        return result
+    outer, inner = get_bound_extents(container_list), get_bound_extents(contained_list)
+    candidates = \
+        (inner[None, :, 0] >= outer[:, None, 0]) & (inner[None, :, 2] <= outer[:, None, 2]) & \
+        (inner[None, :, 1] >= outer[:, None, 1]) & (inner[None, :, 3] <= outer[:, None, 3])
+    shapely_cache = {}
+    def to_shapely(bound_list: list, idx: int):
+        key = (id(bound_list), idx)
+        if key not in shapely_cache:
+            shapely_cache[key] = bound_list[idx].to_shapely()
+        return shapely_cache[key]
+    for i, j in zip(*np.nonzero(candidates)):
+        result[i, j] = to_shapely(container_list, int(i)).contains(to_shapely(contained_list, int(j)))
+    return result
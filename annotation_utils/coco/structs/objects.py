@@ -17,9 +17,16 @@ from common_utils.common_types.bbox import BBox
 from common_utils.common_types.segmentation import Segmentation
 
 from ..camera import Camera
+from ...util.image_probe import ImageInfo, probe_image
+from ...util.image_meta_cache import ImageMetadata, ImageMetadataCache
 # from ...base import BaseStructObject
 from common_utils.base.basic import BasicLoadableIdObject, BasicLoadableObject
 
+def _to_hashable(value):
+    if isinstance(value, (list, tuple)):
+        return tuple([_to_hashable(part) for part in value])
+    return value
+
 class COCO_Info(BasicLoadableObject['COCO_Info']):
     def __init__(
         self,
@@ -86,6 +93,14 @@ class COCO_License(BasicLoadableIdObject['COCO_License']):
             result = result and self.id == other.id
         return result
 
+    def equality_key(self, exclude_id: bool=True) -> tuple:
+        """
+        A hashable key such that a.equality_key() == b.equality_key() exactly when a.is_equal_to(b).
+        This makes it possible to find duplicates with a dictionary instead of comparing every pair.
+        """
+        key = (self.url, self.name)
+        return key if exclude_id else key + (self.id,)
+
     @classmethod
     def from_dict(cls, license_dict: dict) -> COCO_License:
         check_required_keys(
@@ -147,6 +162,18 @@ class COCO_Image(BasicLoadableIdObject['COCO_Image']):
             result = result and self.license_id == other.license_id
         return result
 
+    def equality_key(self, exclude_id: bool=True, exclude_date_captured: bool=False) -> tuple:
+        """
+        A hashable key such that a.equality_key() == b.equality_key() exactly when a.is_equal_to(b).
+        This makes it possible to find duplicates with a dictionary instead of comparing every pair.
+        """
+        key = (self.file_name, self.coco_url, self.height, self.width, self.flickr_url)
+        if not exclude_date_captured:
+            key += (self.date_captured,)
+        if not exclude_id:
+            key += (self.id, self.license_id)
+        return key
+
     def to_dict(self) -> dict:
         return {
             'license': self.license_id,
@@ -181,17 +208,27 @@ class COCO_Image(BasicLoadableIdObject['COCO_Image']):
         )
 
     @classmethod
-    def from_img_path(self, img_path: str, license_id: int, image_id: int) -> COCO_Image:
+    def from_img_path(
+        self, img_path: str, license_id: int, image_id: int,
+        img_info: ImageInfo=None, img_meta_cache: ImageMetadataCache=None
+    ) -> COCO_Image:
+        """
+        The width and height are read from the header of the image file, so the image isn't decoded.
+        img_info: The result of probe_image(img_path), if it is already known.
+        img_meta_cache: If given, the size and ctime are looked up in this cache instead of being read from the file.
+        """
         check_file_exists(img_path)
-        img = cv2.imread(img_path)
-        img_h, img_w = img.shape[:2]
+        if img_info is None and img_meta_cache is not None:
+            img_info = img_meta_cache.get(img_path)
+        elif img_info is None:
+            img_info = probe_image(img_path)
         return COCO_Image(
             license_id=license_id,
             file_name=get_filename(img_path),
             coco_url=img_path,
-            height=img_h,
-            width=img_w,
-            date_captured=get_ctime(img_path),
+            height=img_info.height,
+            width=img_info.width,
+            date_captured=img_info.ctime if isinstance(img_info, ImageMetadata) else get_ctime(img_path),
             flickr_url=None,
             id=image_id
         )
@@ -411,6 +448,17 @@ class COCO_Category(BasicLoadableIdObject['COCO_Category']):
             result = result and self.id == other.id
         return result
 
+    def equality_key(self, exclude_id: bool=True) -> tuple:
+        """
+        A hashable key such that a.equality_key() == b.equality_key() exactly when a.is_equal_to(b).
+        This makes it possible to find duplicates with a dictionary instead of comparing every pair.
+        """
+        key = (
+            self.supercategory, self.name,
+            _to_hashable(self.keypoints), _to_hashable(self.skeleton)
+        )
+        return key if exclude_id else key + (self.id,)
+
     def to_dict(self, strict: bool=True) -> dict:
         if strict:
             return self.__dict__
@@ -1,2 +1,2 @@
 from .id_map import ID_Map, ID_Mapper, COCO_Mapper_Handler
-from .image_iter import CocoImageIterator
\ No newline at end of file
+from .image_iter import CocoImageIterator
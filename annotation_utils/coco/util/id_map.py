@@ -1,5 +1,7 @@
 from __future__ import annotations
+from typing import List, Union
 import operator
+import numpy as np
 from logger import logger
 from common_utils.check_utils import check_type
 
@@ -10,8 +12,17 @@ class ID_Map:
         self.new_id = new_id
 
 class ID_Mapper:
+    """
+    Keeps track of how ids were reassigned, e.g. when several datasets are combined into one.
+    Each ID_Map says that old_id under unique_key (e.g. the index of the source dataset) became new_id.
+
+    Lookups go through a dictionary keyed on (unique_key, old_id), and get_new_ids maps whole arrays of ids at once.
+    If the same (unique_key, old_id) is added more than once, the last ID_Map in the list wins.
+    """
     def __init__(self):
         self.id_maps = []
+        self._lookup = None # (unique_key, old_id) -> index in id_maps
+        self._arrays = {} # unique_key -> (sorted old ids, corresponding new ids)
 
     def __len__(self) -> int:
         return len(self.id_maps)
@@ -26,9 +37,10 @@ class ID_Mapper:
         else:
             return self.id_maps[idx]
 
-    def __setitem__(self, idx: int, value: ID_Mapper):
-        check_type(value, valid_type_list=[ID_Mapper])
+    def __setitem__(self, idx: int, value: ID_Map):
+        check_type(value, valid_type_list=[ID_Map])
         self.id_maps[idx] = value
+        self._invalidate()
 
     def __iter__(self):
         self.n = 0
@@ -42,11 +54,24 @@ class ID_Mapper:
         else:
             raise StopIteration
 
+    def _invalidate(self):
+        self._lookup = None
+        self._arrays = {}
+
+    def _get_lookup(self) -> dict:
+        if self._lookup is None:
+            self._lookup = {(id_map.unique_key, id_map.old_id): idx for idx, id_map in enumerate(self.id_maps)}
+        return self._lookup
+
     def sort(self):
         self.id_maps.sort(key=operator.attrgetter('old_id'), reverse=False)
+        self._invalidate()
 
     def add_id_map(self, id_map: ID_Map):
         self.id_maps.append(id_map)
+        if self._lookup is not None:
+            self._lookup[(id_map.unique_key, id_map.old_id)] = len(self.id_maps) - 1
+        self._arrays.pop(id_map.unique_key, None)
 
     def add(self, unique_key: str, old_id: int, new_id: int):
         new_id_map = ID_Map(
@@ -55,15 +80,61 @@ class ID_Mapper:
             new_id=new_id
         )
         self.add_id_map(new_id_map)
-    
+
+    def add_many(self, unique_key: str, old_ids: Union[List[int], np.ndarray], new_ids: Union[List[int], np.ndarray]):
+        """Adds an ID_Map for every pair of old_ids and new_ids."""
+        old_ids = old_ids.tolist() if isinstance(old_ids, np.ndarray) else old_ids
+        new_ids = new_ids.tolist() if isinstance(new_ids, np.ndarray) else new_ids
+        if len(old_ids) != len(new_ids):
+            logger.error(f'len(old_ids) == {len(old_ids)} != {len(new_ids)} == len(new_ids)')
+            raise Exception
+        for old_id, new_id in zip(old_ids, new_ids):
+            self.add(unique_key=unique_key, old_id=old_id, new_id=new_id)
+
     def get_new_id(self, unique_key: str, old_id: int) -> (bool, int):
-        found = False
-        new_id = None
-        for id_map in self.id_maps:
+        lookup = self._get_lookup()
+        idx = lookup.get((unique_key, old_id), None)
+        if idx is not None:
+            id_map = self.id_maps[idx]
             if id_map.unique_key == unique_key and id_map.old_id == old_id:
-                found = True
-                new_id = id_map.new_id
-        return found, new_id
+                return True, id_map.new_id
+        # Either there is no such map, or an ID_Map was modified in place. Check again with a fresh lookup.
+        self._invalidate()
+        idx = self._get_lookup().get((unique_key, old_id), None)
+        if idx is None:
+            return False, None
+        return True, self.id_maps[idx].new_id
+
+    def _get_arrays(self, unique_key: str) -> (np.ndarray, np.ndarray):
+        if unique_key not in self._arrays:
+            pairs = [
+                (old_id, self.id_maps[idx].new_id)
+                for (key, old_id), idx in self._get_lookup().items() if key == unique_key
+            ]
+            old_ids = np.array([old_id for old_id, _ in pairs])
+            new_ids = np.array([new_id for _, new_id in pairs])
+            order = np.argsort(old_ids, kind='stable')
+            self._arrays[unique_key] = (old_ids[order], new_ids[order])
+        return self._arrays[unique_key]
+
+    def get_new_ids(self, unique_key: str, old_ids: Union[List[int], np.ndarray]) -> (np.ndarray, np.ndarray):
+        """
+        Vectorized version of get_new_id.
+        Returns a boolean array that says which of old_ids were found, and the array of their new ids.
+        The new ids of the ids that weren't found are -1.
+        This takes a snapshot of the maps under unique_key, so ID_Maps that are modified in place afterwards aren't seen.
+        """
+        old_ids = np.asarray(old_ids)
+        sorted_old_ids, sorted_new_ids = self._get_arrays(unique_key)
+        if len(old_ids) == 0 or len(sorted_old_ids) == 0 or old_ids.dtype == object or sorted_old_ids.dtype == object or sorted_new_ids.dtype == object:
+            results = [self.get_new_id(unique_key=unique_key, old_id=old_id) for old_id in old_ids.tolist()]
+            found = np.array([found for found, _ in results], dtype=bool)
+            new_ids = np.array([new_id if found else -1 for found, new_id in results])
+            return found, new_ids
+        positions = np.clip(np.searchsorted(sorted_old_ids, old_ids), 0, len(sorted_old_ids) - 1)
+        found = sorted_old_ids[positions] == old_ids
+        new_ids = np.where(found, sorted_new_ids[positions], -1)
+        return found, new_ids
 
 class COCO_Mapper_Handler:
     def __init__(self):
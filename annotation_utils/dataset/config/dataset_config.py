@@ -11,6 +11,7 @@ from common_utils.check_utils import check_required_keys, check_type, \
     check_dir_exists
 
 from common_utils.base.basic import BasicLoadableObject, BasicLoadableHandler, BasicHandler
+from ...util.path_check import check_files_exist
 from .path import Path
 
 class DatasetConfig(BasicLoadableObject['DatasetConfig']):
@@ -286,9 +287,6 @@ class DatasetConfigCollection(
 
             img_dir1 = rel_to_abs_path(f'{collection_dir}/{dataset_names[i]}/{img_dir0}')
             ann_path1 = rel_to_abs_path(f'{collection_dir}/{dataset_names[i]}/{ann_path0}')
-            if check_paths:
-                check_dir_exists(img_dir1)
-                check_file_exists(ann_path1)
             config = DatasetConfig(
                 img_dir=img_dir1,
                 ann_path=ann_path1,
@@ -296,6 +294,10 @@ class DatasetConfigCollection(
                 tag=dataset_tag0
             )
             dataset_config_list.append(config)
+        if check_paths:
+            for config in dataset_config_list:
+                check_dir_exists(config.img_dir)
+            check_files_exist([config.ann_path for config in dataset_config_list])
         return DatasetConfigCollection(dataset_config_list=dataset_config_list, tag=collection_tag)
 
     def save_to_path(self, save_path: str, overwrite: bool=False):
@@ -3,11 +3,10 @@ from typing import List, Tuple
 import numpy as np
 from tqdm import tqdm
 from common_utils.file_utils import file_exists, dir_exists, \
-    copy_file, create_softlink, make_dir_if_not_exists, \
-    delete_all_files_in_dir
+    make_dir_if_not_exists, delete_all_files_in_dir
 from common_utils.path_utils import get_filename, get_extension_from_filename, \
-    rel_to_abs_path, get_rootname_from_path, get_dirpath_from_filepath
-from common_utils.base.basic import BasicLoadableIdObject, BasicLoadableObject, BasicLoadableIdHandler, BasicHandler
+    get_rootname_from_path, get_dirpath_from_filepath
+from common_utils.base.basic import BasicLoadableIdObject, BasicLoadableObject, BasicHandler
 from common_utils.common_types.point import Point2D, Point3D, Point2D_List, Point3D_List
 from common_utils.common_types.angle import QuaternionList
 from common_utils.common_types.segmentation import Segmentation
@@ -17,6 +16,9 @@ from common_utils.time_utils import get_ctime
 from ..coco.structs.dataset import COCO_Dataset
 from ..coco.structs.objects import COCO_Image, COCO_Annotation, COCO_Category, COCO_License
 from ..coco.camera import Camera as COCO_Camera
+from ..base.indexed import IndexedIdHandler
+from ..util.file_transfer import transfer_files
+from ..util.image_meta_cache import ImageMetadataCache
 
 class LinemodCamera(BasicLoadableObject['LinemodCamera']):
     def __init__(self, fx: float, fy: float, cx: float, cy: float):
@@ -87,7 +89,7 @@ class Linemod_Image(
         self.height = height
 
 class Linemod_Image_Handler(
-    BasicLoadableIdHandler['Linemod_Image_Handler', 'Linemod_Image'],
+    IndexedIdHandler['Linemod_Image_Handler', 'Linemod_Image'],
     BasicHandler['Linemod_Image_Handler', 'Linemod_Image']
 ):
     def __init__(self, images: List[Linemod_Image]=None):
@@ -176,7 +178,7 @@ class Linemod_Annotation(
         )
 
 class Linemod_Annotation_Handler(
-    BasicLoadableIdHandler['Linemod_Annotation_Handler', 'Linemod_Annotation'],
+    IndexedIdHandler['Linemod_Annotation_Handler', 'Linemod_Annotation'],
     BasicHandler['Linemod_Annotation_Handler', 'Linemod_Annotation']
 ):
     def __init__(self, images: List[Linemod_Annotation]=None):
@@ -212,7 +214,7 @@ class Linemod_Category(
         self.name = name
 
 class Linemod_Category_Handler(
-    BasicLoadableIdHandler['Linemod_Category_Handler', 'Linemod_Category'],
+    IndexedIdHandler['Linemod_Category_Handler', 'Linemod_Category'],
     BasicHandler['Linemod_Category_Handler', 'Linemod_Category']
 ):
     def __init__(self, images: List[Linemod_Category]=None):
@@ -253,7 +255,7 @@ class Linemod_Dataset(BasicLoadableObject['Linemod_Dataset']):
     def to_coco(
         self, img_dir: str=None, mask_dir: str=None, coco_license: COCO_License=None, check_paths: bool=True,
         mask_lower_bgr: Tuple[int]=None, mask_upper_bgr: Tuple[int]=(255,255,255),
-        show_pbar: bool=True
+        show_pbar: bool=True, img_meta_cache: ImageMetadataCache=None
     ) -> COCO_Dataset:
         dataset = COCO_Dataset.new(description='Dataset converted from Linemod to COCO format.')
         dataset.licenses.append(
@@ -268,7 +270,7 @@ class Linemod_Dataset(BasicLoadableObject['Linemod_Dataset']):
             file_name = get_filename(linemod_image.file_name)
             img_path = linemod_image.file_name if img_dir is None else f'{img_dir}/{file_name}'
             if file_exists(img_path):
-                date_captured = get_ctime(img_path)
+                date_captured = img_meta_cache.get_ctime(img_path) if img_meta_cache is not None else get_ctime(img_path)
             else:
                 if check_paths:
                     raise FileNotFoundError(f"Couldn't find image at {img_path}")
@@ -442,7 +444,7 @@ class Linemod_Dataset(BasicLoadableObject['Linemod_Dataset']):
         camera_path: str=None, fps_path: str=None,
         preserve_filename: bool=False, use_softlink: bool=False,
         ask_permission_on_delete: bool=True,
-        show_pbar: bool=True
+        show_pbar: bool=True, workers: int=8
     ):
         make_dir_if_not_exists(dst_dataroot)
         delete_all_files_in_dir(
@@ -450,6 +452,9 @@ class Linemod_Dataset(BasicLoadableObject['Linemod_Dataset']):
             ask_permission=ask_permission_on_delete, verbose=False
         )
         processed_image_id_list = []
+        # The files are transferred together once all of the destination paths are known.
+        src_path_list, dst_path_list = [], []
+        dst_path_set = set()
         pbar = tqdm(total=len(self.annotations), unit='annotation(s)', leave=True) if show_pbar else None
         if pbar is not None:
             pbar.set_description('Moving Linemod Dataset Data')
@@ -458,14 +463,14 @@ class Linemod_Dataset(BasicLoadableObject['Linemod_Dataset']):
                 raise FileNotFoundError(f"Couldn't find data_root at {linemod_ann.data_root}")
             
             # Images
-            linemod_image = self.images.get(id=linemod_ann.image_id)[0]
+            linemod_image = self.images.get_obj_from_id(linemod_ann.image_id)
             if linemod_image.id not in processed_image_id_list:
                 img_path = f'{linemod_ann.data_root}/{get_filename(linemod_image.file_name)}'
                 if not file_exists(img_path):
                     raise FileNotFoundError(f"Couldn't find image at {img_path}")
                 if preserve_filename:
                     dst_img_path = f'{dst_dataroot}/{get_filename(linemod_image.file_name)}'
-                    if file_exists(dst_img_path):
+                    if dst_img_path in dst_path_set or file_exists(dst_img_path):
                         raise FileExistsError(
                             f"""
                             Image already exists at {dst_img_path}
@@ -476,10 +481,9 @@ class Linemod_Dataset(BasicLoadableObject['Linemod_Dataset']):
                     dst_filename = f'{linemod_image.id}.{get_extension_from_filename(linemod_image.file_name)}'
                     linemod_image.file_name = dst_filename
                     dst_img_path = f'{dst_dataroot}/{dst_filename}'
-                if not use_softlink:
-                    copy_file(src_path=img_path, dest_path=dst_img_path, silent=True)
-                else:
-                    create_softlink(src_path=rel_to_abs_path(img_path), dst_path=rel_to_abs_path(dst_img_path))
+                src_path_list.append(img_path)
+                dst_path_list.append(dst_img_path)
+                dst_path_set.add(dst_img_path)
                 processed_image_id_list.append(linemod_image.id)
             
             # Masks
@@ -488,7 +492,7 @@ class Linemod_Dataset(BasicLoadableObject['Linemod_Dataset']):
             mask_path = linemod_ann.mask_path
             if preserve_filename:
                 dst_mask_path = f'{dst_dataroot}/{get_filename(linemod_ann.mask_path)}'
-                if file_exists(dst_mask_path):
+                if dst_mask_path in dst_path_set or file_exists(dst_mask_path):
                     raise FileExistsError(
                         f"""
                         Mask already exists at {dst_mask_path}
@@ -500,10 +504,9 @@ class Linemod_Dataset(BasicLoadableObject['Linemod_Dataset']):
                 dst_filename = f'{linemod_ann.id}_mask.{get_extension_from_filename(mask_filename)}'
                 dst_mask_path = f'{dst_dataroot}/{dst_filename}'
                 linemod_ann.mask_path = dst_mask_path
-            if not use_softlink:
-                copy_file(src_path=mask_path, dest_path=dst_mask_path, silent=True)
-            else:
-                create_softlink(src_path=rel_to_abs_path(mask_path), dst_path=rel_to_abs_path(dst_mask_path))
+            src_path_list.append(mask_path)
+            dst_path_list.append(dst_mask_path)
+            dst_path_set.add(dst_mask_path)
             
             # Depth
             if include_depth and linemod_ann.depth_path is not None:
@@ -512,7 +515,7 @@ class Linemod_Dataset(BasicLoadableObject['Linemod_Dataset']):
                 depth_path = linemod_ann.depth_path
                 if preserve_filename:
                     dst_depth_path = f'{dst_dataroot}/{get_filename(linemod_ann.depth_path)}'
-                    if file_exists(dst_depth_path):
+                    if dst_depth_path in dst_path_set or file_exists(dst_depth_path):
                         raise FileExistsError(
                             f"""
                             Depth already exists at {dst_depth_path}
@@ -524,10 +527,9 @@ class Linemod_Dataset(BasicLoadableObject['Linemod_Dataset']):
                     dst_filename = f'{linemod_ann.id}_depth.{get_extension_from_filename(depth_filename)}'
                     dst_depth_path = f'{dst_dataroot}/{dst_filename}'
                     linemod_ann.depth_path = dst_depth_path
-                if not use_softlink:
-                    copy_file(src_path=depth_path, dest_path=dst_depth_path, silent=True)
-                else:
-                    create_softlink(src_path=rel_to_abs_path(depth_path), dst_path=rel_to_abs_path(dst_depth_path))
+                src_path_list.append(depth_path)
+                dst_path_list.append(dst_depth_path)
+                dst_path_set.add(dst_depth_path)
             
             # RT pickle files
             if include_RT:
@@ -540,7 +542,7 @@ class Linemod_Dataset(BasicLoadableObject['Linemod_Dataset']):
                     raise FileNotFoundError(f"Couldn't find RT pickle file at {rt_path}")
                 if preserve_filename:
                     dst_rt_path = f'{dst_dataroot}/{rt_filename}'
-                    if file_exists(dst_depth_path):
+                    if dst_rt_path in dst_path_set or file_exists(dst_rt_path):
                         raise FileExistsError(
                             f"""
                             RT pickle file already exists at {dst_rt_path}
@@ -550,10 +552,9 @@ class Linemod_Dataset(BasicLoadableObject['Linemod_Dataset']):
                 else:
                     dst_rt_filename = f'{linemod_ann.id}_RT.pkl'
                     dst_rt_path = f'{dst_dataroot}/{dst_rt_filename}'
-                if not use_softlink:
-                    copy_file(src_path=rt_path, dest_path=dst_rt_path, silent=True)
-                else:
-                    create_softlink(src_path=rel_to_abs_path(rt_path), dst_path=rel_to_abs_path(dst_rt_path))
+                src_path_list.append(rt_path)
+                dst_path_list.append(dst_rt_path)
+                dst_path_set.add(dst_rt_path)
             if pbar is not None:
                 pbar.update()
         # Camera setting
@@ -561,26 +562,29 @@ class Linemod_Dataset(BasicLoadableObject['Linemod_Dataset']):
             if not file_exists(camera_path):
                 raise FileNotFoundError(f"Couldn't find camera settings at {camera_path}")
             dst_camera_path = f'{dst_dataroot}/{get_filename(camera_path)}'
-            if file_exists(dst_camera_path):
+            if dst_camera_path in dst_path_set or file_exists(dst_camera_path):
                 raise FileExistsError(f'Camera settings already saved at {dst_camera_path}')
-            if not use_softlink:
-                copy_file(src_path=camera_path, dest_path=dst_camera_path, silent=True)
-            else:
-                create_softlink(src_path=rel_to_abs_path(camera_path), dst_path=rel_to_abs_path(dst_camera_path))
+            src_path_list.append(camera_path)
+            dst_path_list.append(dst_camera_path)
+            dst_path_set.add(dst_camera_path)
         
         # FPS setting
         if fps_path is not None:
             if not file_exists(fps_path):
                 raise FileNotFoundError(f"Couldn't find FPS settings at {fps_path}")
             dst_fps_path = f'{dst_dataroot}/{get_filename(fps_path)}'
-            if file_exists(dst_fps_path):
+            if dst_fps_path in dst_path_set or file_exists(dst_fps_path):
                 raise FileExistsError(f'FPS settings already saved at {dst_fps_path}')
-            if not use_softlink:
-                copy_file(src_path=fps_path, dest_path=dst_fps_path, silent=True)
-            else:
-                create_softlink(src_path=rel_to_abs_path(fps_path), dst_path=rel_to_abs_path(dst_fps_path))
+            src_path_list.append(fps_path)
+            dst_path_list.append(dst_fps_path)
+            dst_path_set.add(dst_fps_path)
         if pbar is not None:
             pbar.close()
+        transfer_files(
+            src_paths=src_path_list, dst_paths=dst_path_list,
+            mode='copy' if not use_softlink else 'symlink',
+            workers=workers, show_pbar=show_pbar, desc='Transferring Linemod Dataset Files'
+        )
     
     def sample_3d_hyperparams(self, idx: int=0, include_center: bool=True) -> (Point3D_List, Point3D_List, LinemodCamera):
         linemod_ann_sample = self.annotations[idx]
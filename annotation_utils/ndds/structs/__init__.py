@@ -3,4 +3,5 @@ from .handlers import NDDS_Annotation_Object_Handler
 from .annotation import NDDS_Annotation
 from .frame import NDDS_Frame, NDDS_Frame_Handler
 from .settings import CameraConfig, ObjectSettings
+from .instance_image import InstanceImageDecoder
 from .dataset import NDDS_Dataset
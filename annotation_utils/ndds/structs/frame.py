@@ -10,9 +10,9 @@ from common_utils.check_utils import check_file_exists, check_required_keys, \
     check_dir_exists
 from common_utils.path_utils import get_filename, get_rootname_from_path, \
     get_all_files_of_extension, get_valid_image_paths
-from common_utils.file_utils import make_dir_if_not_exists, delete_all_files_in_dir, \
-    copy_file
+from common_utils.file_utils import make_dir_if_not_exists, delete_all_files_in_dir
 from common_utils.base.basic import BasicLoadableObject, BasicLoadableHandler, BasicHandler
+from ...util.file_transfer import transfer_files
 from .annotation import NDDS_Annotation
 from .objects import NDDS_Annotation_Object
 from .instance import LabeledObjectHandler, LabeledObject, ObjectInstance
@@ -239,7 +239,10 @@ class NDDS_Frame_Handler(
             logger.error(f'Found the following duplicate image filenames in {self.__class__.__name__}:\n{duplicate_img_filename_list}')
             raise Exception
 
-    def save_to_dir(self, json_save_dir: str, src_img_dir: str, dst_img_dir: str=None, overwrite: bool=False, show_pbar: bool=False):
+    def save_to_dir(
+        self, json_save_dir: str, src_img_dir: str, dst_img_dir: str=None, overwrite: bool=False, show_pbar: bool=False,
+        workers: int=8
+    ):
         """Saves NDDS_Frame_Handler object to a directory path.
 
         Arguments:
@@ -250,6 +253,7 @@ class NDDS_Frame_Handler(
             dst_img_dir {str} -- [Path to directory where you want to copy the original NDDS images.] (default: {None})
             overwrite {bool} -- [Whether or not you would like to overwrite existing files/directories.] (default: {False})
             show_pbar {bool} -- [Whether or not you would like to show the progress bar.] (default: {False})
+            workers {int} -- [The number of images that are copied at the same time.] (default: {8})
         """
         self._check_paths_valid(src_img_dir=src_img_dir)
         make_dir_if_not_exists(json_save_dir)
@@ -261,37 +265,25 @@ class NDDS_Frame_Handler(
         if show_pbar:
             pbar = tqdm(total=len(self), unit='ann(s)', leave=True)
             pbar.set_description(f'Saving {self.__class__.__name__}')
+        img_filename_list = []
         for frame in self:
             save_path = f'{json_save_dir}/{get_rootname_from_path(frame.img_path)}.json'
             if dst_img_dir is not None:
-                copy_file(
-                    src_path=f'{src_img_dir}/{get_filename(frame.img_path)}',
-                    dest_path=f'{dst_img_dir}/{get_filename(frame.img_path)}',
-                    silent=True
-                )
-                if frame.cs_img_path:
-                    copy_file(
-                        src_path=f'{src_img_dir}/{get_filename(frame.cs_img_path)}',
-                        dest_path=f'{dst_img_dir}/{get_filename(frame.cs_img_path)}',
-                        silent=True
-                    )
-                if frame.depth_img_path:
-                    copy_file(
-                        src_path=f'{src_img_dir}/{get_filename(frame.depth_img_path)}',
-                        dest_path=f'{dst_img_dir}/{get_filename(frame.depth_img_path)}',
-                        silent=True
-                    )
-                if frame.is_img_path:
-                    copy_file(
-                        src_path=f'{src_img_dir}/{get_filename(frame.is_img_path)}',
-                        dest_path=f'{dst_img_dir}/{get_filename(frame.is_img_path)}',
-                        silent=True
-                    )
-                frame.ndds_ann.save_to_path(save_path=save_path)
-            else:
-                frame.ndds_ann.save_to_path(save_path=save_path)
+                img_filename_list.append(get_filename(frame.img_path))
+                for img_path in [frame.cs_img_path, frame.depth_img_path, frame.is_img_path]:
+                    if img_path:
+                        img_filename_list.append(get_filename(img_path))
+            frame.ndds_ann.save_to_path(save_path=save_path)
             if show_pbar:
                 pbar.update()
+        if show_pbar:
+            pbar.close()
+        if dst_img_dir is not None:
+            transfer_files(
+                src_paths=[f'{src_img_dir}/{img_filename}' for img_filename in img_filename_list],
+                dst_paths=[f'{dst_img_dir}/{img_filename}' for img_filename in img_filename_list],
+                workers=workers, show_pbar=show_pbar, desc='Copying NDDS Images'
+            )
 
     @classmethod
     def load_from_dir(cls, img_dir: str, json_dir: str, show_pbar: bool=True) -> NDDS_Frame_Handler:
@@ -11,6 +11,7 @@ from common_utils.common_types.point import Point2D, Point3D
 
 from common_utils.base.basic import BasicObject, BasicHandler, BasicLoadableObject, BasicLoadableHandler
 from .objects import NDDS_Annotation_Object
+from .instance_image import InstanceImageDecoder
 
 class ObjectInstance(BasicLoadableObject['ObjectInstance'], BasicObject['ObjectInstance']):
     def __init__(
@@ -128,12 +129,12 @@ class ObjectInstance(BasicLoadableObject['ObjectInstance'], BasicObject['ObjectI
     
     def get_segmentation(
         self, instance_img: np.ndarray, color_interval: int=1, is_img_path: str=None, exclude_invalid_polygons: bool=True,
-        allow_unfound_seg: bool=False
+        allow_unfound_seg: bool=False, decoder: InstanceImageDecoder=None
     ) -> Segmentation:
         instance_color = self.ndds_ann_obj.get_color_from_id()
         seg = self.ndds_ann_obj.get_instance_segmentation(
             img=instance_img, target_bgr=instance_color, interval=color_interval,
-            exclude_invalid_polygons=exclude_invalid_polygons
+            exclude_invalid_polygons=exclude_invalid_polygons, decoder=decoder
         )
         if len(seg) == 0 and self.ndds_ann_obj.visibility > 0.0 and self.ndds_ann_obj.is_in_frame(instance_img.shape):
             logger.error(f'=================================================================')
@@ -0,0 +1,64 @@
+from __future__ import annotations
+from typing import List
+import numpy as np
+import cv2
+from common_utils.check_utils import check_list_length
+
+class InstanceImageDecoder:
+    """
+    Decodes an NDDS instance segmentation image once, so that the contours of every instance in the frame
+    can be extracted without scanning the whole image again for each instance.
+
+    Every pixel's bgr color is packed into the 24-bit instance id that it represents (see NDDS_Annotation_Object.get_color_from_id),
+    and a single sort of the packed image groups the pixels of every id that is present and gives each id's bounding region.
+    get_contours gives the same result as running cv2.inRange and cv2.findContours on the full image,
+    but it only looks at the pixels inside the bounding region of the matching ids.
+
+    img: The instance segmentation image, as loaded by cv2.imread.
+    """
+    def __init__(self, img: np.ndarray):
+        self.shape = img.shape
+        h, w = img.shape[:2]
+        bgr = img[:, :, :3].astype(np.int32)
+        packed = (bgr[:, :, 0] | (bgr[:, :, 1] << 8) | (bgr[:, :, 2] << 16)).ravel()
+        self._order = np.argsort(packed, kind='stable')
+        sorted_ids = packed[self._order]
+        starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]]) if len(sorted_ids) > 0 else np.zeros(0, dtype=np.int64)
+        self.ids = sorted_ids[starts]
+        self._starts = starts
+        self._ends = np.r_[starts[1:], len(sorted_ids)]
+        # The pixels of each id are in raster order, so the first and last pixels give the vertical bounds.
+        self._ymin = self._order[self._starts] // w
+        self._ymax = self._order[self._ends - 1] // w
+        if len(starts) > 0:
+            cols = self._order % w
+            self._xmin = np.minimum.reduceat(cols, starts)
+            self._xmax = np.maximum.reduceat(cols, starts)
+        else:
+            self._xmin = self._xmax = np.zeros(0, dtype=np.int64)
+        self._bgr_ids = np.stack([self.ids & 255, (self.ids >> 8) & 255, (self.ids >> 16) & 255], axis=1)
+
+    def _get_matching_idx(self, target_bgr: List[int], interval: int=1) -> np.ndarray:
+        # Same bounds as get_instance_segmentation passes to cv2.inRange.
+        lower_bgr = np.array([max(val - interval, 0) for val in target_bgr])
+        upper_bgr = np.array([min(val + interval, 255) for val in target_bgr])
+        return np.flatnonzero(np.all((self._bgr_ids >= lower_bgr) & (self._bgr_ids <= upper_bgr), axis=1))
+
+    def get_contours(self, target_bgr: List[int], interval: int=1) -> list:
+        """Returns the external contours of the pixels whose color is within interval of target_bgr in every channel."""
+        check_list_length(target_bgr, correct_length=3)
+        matching_idx = self._get_matching_idx(target_bgr, interval=interval)
+        if len(matching_idx) == 0:
+            return []
+        h, w = self.shape[:2]
+        # Leave a 1 pixel margin so that the contours don't touch the edge of the region unless they touch the edge of the image.
+        x0 = max(int(self._xmin[matching_idx].min()) - 1, 0)
+        y0 = max(int(self._ymin[matching_idx].min()) - 1, 0)
+        x1 = min(int(self._xmax[matching_idx].max()) + 2, w)
+        y1 = min(int(self._ymax[matching_idx].max()) + 2, h)
+        mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+        for idx in matching_idx.tolist():
+            pixels = self._order[self._starts[idx]:self._ends[idx]]
+            mask[pixels // w - y0, pixels % w - x0] = 255
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=(x0, y0))
+        return list(contours)
@@ -11,6 +11,7 @@ from common_utils.common_types.point import Point2D, Point3D
 from ..common.cuboid import Cuboid2D, Cuboid3D
 from ..common.angle import Quaternion
 from common_utils.base.basic import BasicLoadableObject
+from .instance_image import InstanceImageDecoder
 
 class NDDS_Annotation_Object(BasicLoadableObject['NDDS_Annotation_Object']):
     def __init__(
@@ -116,13 +117,23 @@ class NDDS_Annotation_Object(BasicLoadableObject['NDDS_Annotation_Object']):
         color_instance_bgr = [pixel_b,pixel_g,pixel_r]
         return color_instance_bgr
 
-    def get_instance_segmentation(self, img: np.ndarray, target_bgr: List[int]=None, interval: int=1, exclude_invalid_polygons: bool=True):
+    def get_instance_segmentation(
+        self, img: np.ndarray, target_bgr: List[int]=None, interval: int=1, exclude_invalid_polygons: bool=True,
+        decoder: InstanceImageDecoder=None
+    ):
+        """
+        decoder: An InstanceImageDecoder of img. When segmentations of several objects are taken from the same image,
+                 pass the same decoder every time so that the image only needs to be decoded once.
+        """
         target_bgr = target_bgr if target_bgr is not None else self.get_color_from_id()
         check_list_length(target_bgr, correct_length=3)
-        lower_bgr = [val - interval if val - interval >= 0 else 0 for val in target_bgr]
-        upper_bgr = [val + interval if val + interval <= 255 else 255 for val in target_bgr]
-        color_mask = cv2.inRange(src=img, lowerb=tuple(lower_bgr), upperb=tuple(upper_bgr))
-        color_contours, _ = cv2.findContours(color_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if decoder is not None:
+            color_contours = decoder.get_contours(target_bgr=target_bgr, interval=interval)
+        else:
+            lower_bgr = [val - interval if val - interval >= 0 else 0 for val in target_bgr]
+            upper_bgr = [val + interval if val + interval <= 255 else 255 for val in target_bgr]
+            color_mask = cv2.inRange(src=img, lowerb=tuple(lower_bgr), upperb=tuple(upper_bgr))
+            color_contours, _ = cv2.findContours(color_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         seg = Segmentation.from_contour(contour_list=color_contours, exclude_invalid_polygons=exclude_invalid_polygons)
         return seg
 
@@ -0,0 +1,9 @@
+from .json_stream import JSON_StreamReader, iter_json_object, iter_json_array, \
+    JSON_StreamWriter, atomic_write, round_floats, \
+    open_json, load_json, dump_json, get_compression_from_path
+from .path_check import find_missing_files, check_files_exist
+from .file_transfer import transfer_files, TRANSFER_MODES
+from .naming import DumpPathAllocator
+from .parallel import imap_ordered, BackgroundWriter
+from .image_probe import ImageInfo, probe_image, probe_images
+from .image_meta_cache import ImageMetadata, ImageMetadataCache
@@ -0,0 +1,147 @@
+from __future__ import annotations
+from typing import List, Callable
+import os
+import sys
+import time
+import errno
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tqdm import tqdm
+
+from logger import logger
+from common_utils.check_utils import check_value
+
+TRANSFER_MODES = ['copy', 'hardlink', 'reflink', 'symlink']
+
+# Errors that are worth retrying, e.g. a network filesystem that is briefly unavailable.
+_TRANSIENT_ERRNOS = set([
+    getattr(errno, name) for name in ['EAGAIN', 'EBUSY', 'EINTR', 'EIO', 'ETIMEDOUT', 'ESTALE', 'ECONNRESET', 'ENOBUFS']
+    if hasattr(errno, name)
+])
+_FICLONE = 0x40049409 # Linux ioctl that clones a file on copy-on-write filesystems (btrfs, xfs).
+_CHUNK_SIZE = 8 * 1024 * 1024
+
+def _is_transient(e: Exception) -> bool:
+    return isinstance(e, TimeoutError) or (isinstance(e, OSError) and e.errno in _TRANSIENT_ERRNOS)
+
+def _remove_existing(dst_path: str):
+    if os.path.islink(dst_path) or os.path.isfile(dst_path):
+        os.remove(dst_path)
+
+def _copy(src_path: str, dst_path: str, progress: Callable[[int], None]):
+    with open(src_path, 'rb') as fsrc, open(dst_path, 'wb') as fdst:
+        if hasattr(os, 'sendfile') and sys.platform.startswith('linux'):
+            # Let the kernel copy the data, one chunk at a time so that progress can be reported.
+            try:
+                while True:
+                    sent = os.sendfile(fdst.fileno(), fsrc.fileno(), None, _CHUNK_SIZE)
+                    if sent == 0:
+                        return
+                    progress(sent)
+            except OSError as e:
+                if e.errno not in [errno.EINVAL, errno.ENOSYS, errno.ENOTSUP] or fsrc.tell() != 0 or fdst.tell() != 0:
+                    raise
+        buffer = bytearray(_CHUNK_SIZE)
+        view = memoryview(buffer)
+        while True:
+            n = fsrc.readinto(buffer)
+            if n == 0:
+                return
+            fdst.write(view[:n])
+            progress(n)
+
+def _reflink(src_path: str, dst_path: str, progress: Callable[[int], None]):
+    try:
+        import fcntl
+        with open(src_path, 'rb') as fsrc, open(dst_path, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        progress(os.path.getsize(src_path))
+    except (ImportError, OSError) as e:
+        if isinstance(e, OSError) and _is_transient(e):
+            raise
+        # Not supported by the platform or the filesystem, so make a regular copy instead.
+        _copy(src_path, dst_path, progress)
+
+def _transfer_one(src_path: str, dst_path: str, mode: str, progress: Callable[[int], None]):
+    _remove_existing(dst_path)
+    if mode == 'copy':
+        _copy(src_path, dst_path, progress)
+    elif mode == 'reflink':
+        _reflink(src_path, dst_path, progress)
+    elif mode == 'hardlink':
+        os.link(src_path, dst_path)
+        progress(os.path.getsize(dst_path))
+    elif mode == 'symlink':
+        os.symlink(os.path.abspath(src_path), dst_path)
+        progress(os.path.getsize(dst_path))
+    else:
+        raise Exception
+
+def transfer_files(
+    src_paths: List[str], dst_paths: List[str], mode: str='copy',
+    workers: int=8, retries: int=3, retry_delay: float=0.5,
+    show_pbar: bool=True, desc: str=None
+):
+    """
+    Copies or links every file in src_paths to the corresponding path in dst_paths, using a pool of threads.
+    Existing files at the destination paths are replaced.
+    Every transfer is attempted, and all of the transfers that failed are reported together at the end.
+
+    mode:
+        'copy': Copy the file contents.
+        'hardlink': Create a hard link. Source and destination have to be on the same filesystem.
+        'reflink': Create a copy-on-write clone where the filesystem supports it. Otherwise, the file is copied.
+        'symlink': Create a symbolic link to the absolute source path.
+    workers: The number of files that are transferred at the same time.
+    retries: The number of times a transfer is retried after a transient error (e.g. EIO, ETIMEDOUT).
+    retry_delay: Seconds to wait before the first retry. The delay is doubled after every retry.
+    show_pbar: If True, a progress bar shows the number of bytes transferred so far.
+    desc: Description of the progress bar.
+    """
+    check_value(mode, valid_value_list=TRANSFER_MODES)
+    if len(src_paths) != len(dst_paths):
+        logger.error(f'len(src_paths) == {len(src_paths)} != {len(dst_paths)} == len(dst_paths)')
+        raise Exception
+    if len(src_paths) == 0:
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        pbar = None
+        if show_pbar:
+            total = sum(executor.map(lambda path: os.path.getsize(path) if os.path.isfile(path) else 0, src_paths))
+            pbar = tqdm(total=total, unit='B', unit_scale=True, unit_divisor=1024, leave=True)
+            if desc is not None:
+                pbar.set_description(desc)
+        pbar_lock = threading.Lock()
+
+        def run(src_path: str, dst_path: str) -> Exception:
+            done = [0]
+            def progress(n: int):
+                done[0] += n
+                if pbar is not None:
+                    with pbar_lock:
+                        pbar.update(n)
+            for attempt in range(retries + 1):
+                try:
+                    _transfer_one(src_path, dst_path, mode, progress)
+                    return None
+                except Exception as e:
+                    if not _is_transient(e) or attempt == retries:
+                        return e
+                    # Take back the progress of the failed attempt before trying again.
+                    progress(-done[0])
+                    time.sleep(retry_delay * 2 ** attempt)
+
+        errors = list(executor.map(run, src_paths, dst_paths))
+        if pbar is not None:
+            pbar.close()
+
+    failures = [
+        (src_path, dst_path, error)
+        for src_path, dst_path, error in zip(src_paths, dst_paths, errors) if error is not None
+    ]
+    if len(failures) > 0:
+        for src_path, dst_path, error in failures:
+            logger.error(f'Failed to {mode} {src_path} to {dst_path}: {error}')
+        logger.error(f'{len(failures)}/{len(src_paths)} file transfers failed.')
+        raise Exception
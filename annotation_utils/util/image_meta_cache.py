@@ -0,0 +1,199 @@
+from __future__ import annotations
+from typing import List
+import os
+import time
+import hashlib
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+from logger import logger
+
+from .image_probe import ImageInfo, probe_images
+
+IMAGE_META_CACHE_VERSION = 2
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+def _format_ctime(ctime: float) -> str:
+    # Same format as common_utils.time_utils.get_ctime
+    return time.strftime("%Y/%m/%d %H:%M:%S", time.gmtime(ctime))
+
+def _get_sha1(path: str) -> str:
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(_HASH_CHUNK_SIZE)
+            if len(chunk) == 0:
+                break
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+def _get_default_cache_path() -> str:
+    cache_home = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache_home, 'annotation_utils', 'image_metadata.sqlite')
+
+class ImageMetadata(ImageInfo):
+    """
+    The metadata of an image file that the dataset builders need.
+
+    width, height, channels: See ImageInfo.
+    ctime: The ctime of the file, in the same format as common_utils.time_utils.get_ctime.
+    sha1: The sha1 hex digest of the file contents, or None if it wasn't requested.
+    """
+    def __init__(self, width: int, height: int, channels: int, ctime: str, sha1: str=None):
+        super().__init__(width=width, height=height, channels=channels)
+        self.ctime = ctime
+        self.sha1 = sha1
+
+    def __str__(self) -> str:
+        return f'{type(self).__name__}(width={self.width}, height={self.height}, channels={self.channels}, ctime={self.ctime}, sha1={self.sha1})'
+
+    def __eq__(self, other: ImageMetadata) -> bool:
+        if isinstance(other, ImageMetadata):
+            return super().__eq__(other) and self.ctime == other.ctime and self.sha1 == other.sha1
+        return NotImplemented
+
+class ImageMetadataCache:
+    """
+    An on-disk cache of the size and (optionally) content hash of image files,
+    so that rerunning a dataset conversion doesn't have to read every image again.
+
+    Entries are keyed by the absolute path of the image, and are only used while the size and the
+    modification time of the file are unchanged. Otherwise, the image is probed again and the entry is replaced.
+    The ctime isn't cached, since it also changes without the contents changing (e.g. chmod).
+    It is taken from the os.stat that every lookup does anyway.
+    The cache is a SQLite database, so the same cache can be used by several processes at once,
+    e.g. by the workers of COCO_Dataset.from_ndds. If the database can't be opened, a warning is shown
+    and the metadata is read from the images without caching.
+
+    cache_path: Path to the database file. It is created if it doesn't exist.
+                Defaults to $XDG_CACHE_HOME/annotation_utils/image_metadata.sqlite (~/.cache/... if XDG_CACHE_HOME isn't set).
+    """
+    def __init__(self, cache_path: str=None):
+        self.cache_path = os.path.abspath(cache_path) if cache_path is not None else _get_default_cache_path()
+        self._conn = None
+        self._pid = None
+        self._disabled = False
+
+    def __getstate__(self) -> dict:
+        # Connections can't be sent to other processes. Every process opens its own connection instead.
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        state['_pid'] = None
+        return state
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._disabled:
+            return None
+        if self._conn is not None and self._pid == os.getpid():
+            return self._conn
+        try:
+            cache_dir = os.path.dirname(self.cache_path)
+            if cache_dir != '' and not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir, exist_ok=True)
+            conn = sqlite3.connect(self.cache_path, timeout=60)
+            try:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('PRAGMA synchronous=NORMAL')
+            except sqlite3.Error:
+                pass # e.g. filesystems that don't support WAL. The default journal mode works too.
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            if version != IMAGE_META_CACHE_VERSION:
+                with conn:
+                    conn.execute('DROP TABLE IF EXISTS images')
+                    conn.execute(f'PRAGMA user_version = {IMAGE_META_CACHE_VERSION}')
+            with conn:
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS images ('
+                    'path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, '
+                    'width INTEGER, height INTEGER, channels INTEGER, sha1 TEXT)'
+                )
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Couldn't open image metadata cache at {self.cache_path}: {e}")
+            self._disabled = True
+            return None
+        self._conn = conn
+        self._pid = os.getpid()
+        return conn
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+        self._pid = None
+
+    def clear(self):
+        """Removes every entry from the cache."""
+        conn = self._connect()
+        if conn is not None:
+            with conn:
+                conn.execute('DELETE FROM images')
+
+    def _lookup(self, conn: sqlite3.Connection, path: str, stat: os.stat_result, with_hash: bool) -> ImageMetadata:
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                'SELECT width, height, channels, sha1 FROM images WHERE path = ? AND size = ? AND mtime_ns = ?',
+                (path, stat.st_size, stat.st_mtime_ns)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None or (with_hash and row[3] is None):
+            return None
+        width, height, channels, sha1 = row
+        return ImageMetadata(width=width, height=height, channels=channels, ctime=_format_ctime(stat.st_ctime), sha1=sha1)
+
+    def _store(self, conn: sqlite3.Connection, rows: List[tuple]):
+        if conn is None or len(rows) == 0:
+            return
+        try:
+            with conn:
+                conn.executemany('INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+        except sqlite3.Error as e:
+            # The metadata is still correct, it just isn't cached this time.
+            logger.warning(f"Couldn't write to image metadata cache at {self.cache_path}: {e}")
+
+    def get(self, img_path: str, with_hash: bool=False) -> ImageMetadata:
+        """
+        Returns the metadata of img_path, reading it from the image only if it isn't cached yet.
+        with_hash: If True, the sha1 of the file contents is included. It is computed and cached the first time it is requested.
+        """
+        return self.get_many([img_path], with_hash=with_hash, workers=1)[0]
+
+    def get_many(self, img_paths: List[str], with_hash: bool=False, workers: int=8, show_pbar: bool=False) -> List[ImageMetadata]:
+        """
+        Returns the metadata of every path in img_paths, in order.
+        The images that aren't cached yet are probed with a pool of threads, and are added to the cache all at once.
+
+        with_hash: If True, the sha1 of the file contents is included. It is computed and cached the first time it is requested.
+        workers: The number of images that are probed at the same time.
+        show_pbar: If True, a progress bar shows the number of uncached images probed so far.
+        """
+        conn = self._connect()
+        abs_paths = [os.path.abspath(img_path) for img_path in img_paths]
+        stats = [os.stat(path) for path in abs_paths]
+        results = [self._lookup(conn, path, stat, with_hash) for path, stat in zip(abs_paths, stats)] # type: List[ImageMetadata]
+        missing_idx = [i for i, result in enumerate(results) if result is None]
+        if len(missing_idx) == 0:
+            return results
+
+        missing_paths = [abs_paths[i] for i in missing_idx]
+        info_list = probe_images(missing_paths, workers=workers, show_pbar=show_pbar)
+        sha1_list = [None] * len(missing_paths)
+        if with_hash:
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                sha1_list = list(executor.map(_get_sha1, missing_paths))
+        rows = []
+        for i, info, sha1 in zip(missing_idx, info_list, sha1_list):
+            stat = stats[i]
+            results[i] = ImageMetadata(
+                width=info.width, height=info.height, channels=info.channels,
+                ctime=_format_ctime(stat.st_ctime), sha1=sha1
+            )
+            rows.append((abs_paths[i], stat.st_size, stat.st_mtime_ns, info.width, info.height, info.channels, sha1))
+        self._store(conn, rows)
+        return results
+
+    def get_ctime(self, img_path: str) -> str:
+        """Same as common_utils.time_utils.get_ctime. The ctime is always read from the file, but the lookup caches the image size."""
+        return self.get(img_path).ctime
@@ -0,0 +1,212 @@
+from __future__ import annotations
+from typing import List, Tuple
+import struct
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+from tqdm import tqdm
+
+from logger import logger
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 3, 4: 2, 6: 4} # IHDR color type -> channels
+# Start of frame markers. C4 (DHT), C8 (JPG) and CC (DAC) share the range but are not frames.
+_JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - set([0xC4, 0xC8, 0xCC])
+_JPEG_STANDALONE_MARKERS = set(range(0xD0, 0xDA)) | set([0x01])
+_EXIF_ORIENTATION_TAG = 0x0112
+
+class ImageInfo:
+    """
+    The dimensions of an image file.
+
+    width, height: The size of the image, as cv2.imread would load it.
+                   For JPEG files, this takes the EXIF orientation into account, just like cv2.imread does.
+    channels: The number of channels stored in the file. e.g. 1 for grayscale, 3 for RGB and 4 for RGBA.
+              Note that cv2.imread without flags always loads 3 channels.
+    """
+    def __init__(self, width: int, height: int, channels: int):
+        self.width = width
+        self.height = height
+        self.channels = channels
+
+    def __str__(self) -> str:
+        return f'{type(self).__name__}(width={self.width}, height={self.height}, channels={self.channels})'
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __eq__(self, other: ImageInfo) -> bool:
+        if isinstance(other, ImageInfo):
+            return self.width == other.width and self.height == other.height and self.channels == other.channels
+        return NotImplemented
+
+    def shape(self) -> Tuple[int]:
+        """Returns (height, width, channels), like the shape of the image array."""
+        return (self.height, self.width, self.channels)
+
+def _probe_png(f) -> ImageInfo:
+    # The IHDR chunk always comes first: length, type, width, height, bit depth, color type
+    data = f.read(18)
+    if len(data) < 18 or data[4:8] != b'IHDR':
+        return None
+    width, height = struct.unpack('>II', data[8:16])
+    channels = _PNG_CHANNELS.get(data[17])
+    if channels is None:
+        return None
+    return ImageInfo(width=width, height=height, channels=channels)
+
+def _get_exif_orientation(data: bytes) -> int:
+    # data is the contents of an APP1 segment. Returns None if it doesn't contain an orientation.
+    if data[:6] != b'Exif\x00\x00':
+        return None
+    tiff = data[6:]
+    if tiff[:2] == b'II':
+        endian = '<'
+    elif tiff[:2] == b'MM':
+        endian = '>'
+    else:
+        return None
+    if len(tiff) < 8:
+        return None
+    ifd_offset = struct.unpack(endian + 'I', tiff[4:8])[0]
+    if ifd_offset + 2 > len(tiff):
+        return None
+    num_entries = struct.unpack(endian + 'H', tiff[ifd_offset:ifd_offset+2])[0]
+    for i in range(num_entries):
+        entry_offset = ifd_offset + 2 + 12 * i
+        if entry_offset + 12 > len(tiff):
+            return None
+        tag, value_type = struct.unpack(endian + 'HH', tiff[entry_offset:entry_offset+4])
+        if tag == _EXIF_ORIENTATION_TAG and value_type == 3: # SHORT
+            return struct.unpack(endian + 'H', tiff[entry_offset+8:entry_offset+10])[0]
+    return None
+
+def _probe_jpeg(f) -> ImageInfo:
+    orientation = None
+    while True:
+        byte = f.read(1)
+        if len(byte) == 0:
+            return None
+        if byte != b'\xff':
+            # Entropy coded data before the start of frame. Shouldn't happen in a valid file.
+            return None
+        marker = f.read(1)
+        while marker == b'\xff': # Fill bytes
+            marker = f.read(1)
+        if len(marker) == 0:
+            return None
+        marker = marker[0]
+        if marker in _JPEG_STANDALONE_MARKERS:
+            continue
+        if marker == 0xD9: # End of image
+            return None
+        length_data = f.read(2)
+        if len(length_data) < 2:
+            return None
+        length = struct.unpack('>H', length_data)[0]
+        if length < 2:
+            return None
+        if marker in _JPEG_SOF_MARKERS:
+            data = f.read(6)
+            if len(data) < 6:
+                return None
+            height, width, channels = struct.unpack('>HHB', data[1:6])
+            if height == 0:
+                # The height is defined by a DNL marker after the first scan.
+                return None
+            if orientation is not None and 5 <= orientation <= 8:
+                # Rotated by 90 degrees, so cv2.imread swaps the width and height.
+                width, height = height, width
+            return ImageInfo(width=width, height=height, channels=channels)
+        elif marker == 0xE1 and orientation is None:
+            orientation = _get_exif_orientation(f.read(length - 2))
+        else:
+            f.seek(length - 2, 1)
+
+def _probe_bmp(f) -> ImageInfo:
+    data = f.read(16) # Rest of the file header (12 bytes) and the size of the info header
+    if len(data) < 16:
+        return None
+    header_size = struct.unpack('<I', data[12:16])[0]
+    if header_size != 12 and header_size < 40:
+        return None
+    header = f.read(header_size - 4)
+    if len(header) < header_size - 4:
+        return None
+    if header_size == 12: # BITMAPCOREHEADER
+        width, height, _, bit_count = struct.unpack('<HHHH', header[:8])
+        palette_entry_size, num_colors = 3, 0
+    else: # BITMAPINFOHEADER and later
+        width, height, _, bit_count, compression = struct.unpack('<iiHHI', header[:16])
+        palette_entry_size, num_colors = 4, struct.unpack('<I', header[28:32])[0]
+    # Same as cv2: palette images are only loaded in color if the palette isn't gray,
+    # and 32 bit images only have an alpha channel if the header defines an alpha mask.
+    if bit_count <= 8:
+        num_colors = num_colors if 0 < num_colors <= 2 ** bit_count else 2 ** bit_count
+        palette = f.read(palette_entry_size * num_colors)
+        is_gray = all(
+            palette[k] == palette[k+1] == palette[k+2]
+            for k in range(0, len(palette) - 2, palette_entry_size)
+        )
+        channels = 1 if is_gray else 3
+    elif bit_count == 32:
+        has_alpha = header_size >= 56 and compression == 3 and struct.unpack('<I', header[48:52])[0] != 0 # BI_BITFIELDS
+        channels = 4 if has_alpha else 3
+    else:
+        channels = 3
+    # A negative height means that the rows are stored top-down.
+    return ImageInfo(width=width, height=abs(height), channels=channels)
+
+def _probe_header(img_path: str) -> ImageInfo:
+    with open(img_path, 'rb') as f:
+        signature = f.read(8)
+        if signature == _PNG_SIGNATURE:
+            f.seek(8)
+            return _probe_png(f)
+        elif signature[:2] == b'\xff\xd8':
+            f.seek(2)
+            return _probe_jpeg(f)
+        elif signature[:2] == b'BM':
+            f.seek(2)
+            return _probe_bmp(f)
+    return None
+
+def probe_image(img_path: str) -> ImageInfo:
+    """
+    Reads the width, height and number of channels of an image.
+    For PNG, JPEG and BMP files, only the header of the file is read.
+    Other formats, as well as headers that can't be parsed, are decoded with cv2 instead.
+    """
+    try:
+        info = _probe_header(img_path)
+    except (OSError, struct.error):
+        info = None
+    if info is not None:
+        return info
+    img = cv2.imread(img_path, cv2.IMREAD_UNCHANGED)
+    if img is None:
+        logger.error(f"Failed to read image: {img_path}")
+        raise Exception
+    if img.ndim == 2:
+        return ImageInfo(width=img.shape[1], height=img.shape[0], channels=1)
+    return ImageInfo(width=img.shape[1], height=img.shape[0], channels=img.shape[2])
+
+def probe_images(img_paths: List[str], workers: int=8, show_pbar: bool=False) -> List[ImageInfo]:
+    """
+    Probes every image in img_paths with probe_image, using a pool of threads.
+    The results are in the same order as img_paths.
+
+    workers: The number of images that are probed at the same time.
+    show_pbar: If True, a progress bar shows the number of images probed so far.
+    """
+    if len(img_paths) == 0:
+        return []
+    pbar = tqdm(total=len(img_paths), unit='img', leave=True) if show_pbar else None
+    info_list = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for info in executor.map(probe_image, img_paths):
+            info_list.append(info)
+            if pbar is not None:
+                pbar.update()
+    if pbar is not None:
+        pbar.close()
+    return info_list
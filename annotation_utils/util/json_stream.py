@@ -0,0 +1,275 @@
+from __future__ import annotations
+from typing import List, Any, Iterator, Iterable, Tuple, TextIO
+from contextlib import contextmanager
+import os
+import io
+import re
+import json
+import gzip
+
+from logger import logger
+from common_utils.check_utils import check_file_exists
+
+_compression_extensions = {'.gz': 'gzip', '.zst': 'zstd', '.zstd': 'zstd'}
+
+def get_compression_from_path(path: str) -> str:
+    """Returns 'gzip' or 'zstd' if path has a compressed file extension (e.g. ann.json.gz), and None otherwise."""
+    return _compression_extensions.get(os.path.splitext(path)[1].lower(), None)
+
+def open_json(path: str, mode: str='r', compression: str='infer') -> TextIO:
+    """
+    Opens a json file as a text stream, transparently compressing or decompressing it on the fly.
+
+    path: Path to the json file.
+    mode: 'r' or 'w'
+    compression: 'gzip', 'zstd' or None. By default, this is inferred from the extension of path (.gz, .zst or .zstd).
+                 zstd requires the zstandard package.
+    """
+    if mode not in ['r', 'w']:
+        logger.error(f"Invalid mode: {mode}. Expected 'r' or 'w'.")
+        raise Exception
+    if compression == 'infer':
+        compression = get_compression_from_path(path)
+    if compression is None:
+        return open(path, mode)
+    elif compression == 'gzip':
+        return gzip.open(path, mode + 't', encoding='utf-8', compresslevel=6)
+    elif compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            logger.error(f'zstandard needs to be installed in order to read or write zstd compressed files.')
+            logger.error(f'Install it with: pip install zstandard')
+            raise ImportError
+        if mode == 'r':
+            return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb')), encoding='utf-8')
+        else:
+            return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(open(path, 'wb')), encoding='utf-8')
+    else:
+        logger.error(f"Invalid compression: {compression}. Expected 'gzip', 'zstd' or None.")
+        raise Exception
+
+def load_json(path: str) -> Any:
+    """json.load for a json file that may be compressed. Refer to open_json."""
+    with open_json(path, 'r') as f:
+        return json.load(f)
+
+def dump_json(obj: Any, path: str, indent: int=2):
+    """
+    json.dump to a json file that may be compressed. Refer to open_json.
+    The file is written atomically. Refer to atomic_write.
+    """
+    with atomic_write(path) as f:
+        json.dump(obj, f, indent=indent, ensure_ascii=False)
+
+_whitespace = re.compile(r'[ \t\n\r]*')
+_number_chars = re.compile(r'[0-9+\-.eE]*')
+_decoder = json.JSONDecoder()
+
+class JSON_StreamReader:
+    """
+    Incrementally parses a json file, so that large arrays can be read one element at a time
+    without ever holding the whole file (or the whole decoded dict tree) in memory.
+
+    Only the structure that you iterate over with iter_array/iter_object is parsed incrementally.
+    Every other value is decoded in one go with json's own decoder.
+    """
+    def __init__(self, f: TextIO, chunk_size: int=1024*1024):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, min_size: int=0) -> bool:
+        chunk = self.f.read(max(self.chunk_size, min_size))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _skip_whitespace(self):
+        while True:
+            self.pos = _whitespace.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self._fill():
+                return
+
+    def peek(self) -> str:
+        self._skip_whitespace()
+        return self.buffer[self.pos] if self.pos < len(self.buffer) else ''
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            logger.error(f"Expected '{char}' in json stream, but found '{found}'")
+            raise Exception
+        self.pos += 1
+
+    def read_value(self) -> Any:
+        """Decodes the next complete json value."""
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # The value continues past the end of the buffer.
+                # Grow the buffer geometrically so that large values aren't re-parsed too many times.
+                if not self._fill(min_size=len(self.buffer) - self.pos):
+                    raise
+                continue
+            if (
+                type(value) in [int, float] and not self.eof
+                and _number_chars.match(self.buffer, end).end() == len(self.buffer)
+                and self._fill()
+            ):
+                # A number that reaches the end of the buffer may have been cut off.
+                continue
+            self.pos = end
+            return value
+
+    def iter_array(self) -> Iterator[Any]:
+        """Yields the elements of the json array that starts at the current position one at a time."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.read_value()
+            char = self.peek()
+            self.pos += 1
+            if char == ']':
+                return
+            elif char != ',':
+                logger.error(f"Expected ',' or ']' in json array, but found '{char}'")
+                raise Exception
+
+    def iter_object(self, stream_keys: List[str]=None) -> Iterator[Tuple[str, Any]]:
+        """
+        Yields the (key, value) pairs of the json object that starts at the current position.
+        If the value of a key in stream_keys is an array, value is instead an iterator that parses
+        the elements of that array one at a time.
+        That iterator has to be used before moving on to the next key. Any elements left unread are skipped.
+        """
+        stream_keys = stream_keys if stream_keys is not None else []
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self.expect(':')
+            if key in stream_keys and self.peek() == '[':
+                items = self.iter_array()
+                yield key, items
+                for _ in items:
+                    pass
+            else:
+                yield key, self.read_value()
+            char = self.peek()
+            self.pos += 1
+            if char == '}':
+                return
+            elif char != ',':
+                logger.error(f"Expected ',' or '}}' in json object, but found '{char}'")
+                raise Exception
+
+def iter_json_object(json_path: str, stream_keys: List[str]=None, chunk_size: int=1024*1024) -> Iterator[Tuple[str, Any]]:
+    """
+    Iterates through the top-level json object saved at json_path, yielding (key, value) pairs in file order.
+    Arrays under any key in stream_keys are yielded as iterators that parse one element at a time.
+
+    Example:
+        for key, value in iter_json_object('coco.json', stream_keys=['images', 'annotations']):
+            if key == 'annotations':
+                for ann_dict in value:
+                    ...
+    """
+    check_file_exists(json_path)
+    with open_json(json_path, 'r') as f:
+        yield from JSON_StreamReader(f, chunk_size=chunk_size).iter_object(stream_keys=stream_keys)
+
+def iter_json_array(json_path: str, chunk_size: int=1024*1024) -> Iterator[Any]:
+    """Iterates through the elements of the top-level json array saved at json_path one at a time."""
+    check_file_exists(json_path)
+    with open_json(json_path, 'r') as f:
+        yield from JSON_StreamReader(f, chunk_size=chunk_size).iter_array()
+
+
+def round_floats(value: Any, precision: int) -> Any:
+    """Rounds every float in a (possibly nested) list to the given number of decimal places. Ints are left as they are."""
+    if type(value) is float:
+        return round(value, precision)
+    elif type(value) is list:
+        return [round_floats(part, precision) for part in value]
+    else:
+        return value
+
+class JSON_StreamWriter:
+    """
+    Writes a json object to a file handle one value at a time, so that large arrays never need to be
+    converted to a single string (or even held in memory all at once).
+
+    With indent=None, the output is compact (no whitespace at all).
+    Otherwise the output is identical to json.dump(..., indent=indent).
+    """
+    def __init__(self, f: TextIO, indent: int=None, ensure_ascii: bool=False):
+        self.f = f
+        self.indent = indent
+        self.ensure_ascii = ensure_ascii
+
+    def _dumps(self, value: Any, level: int) -> str:
+        if self.indent is None:
+            return json.dumps(value, ensure_ascii=self.ensure_ascii, separators=(',', ':'))
+        text = json.dumps(value, ensure_ascii=self.ensure_ascii, indent=self.indent)
+        # Strings can't contain raw newlines in json, so every newline is a line break in the layout.
+        return text.replace('\n', '\n' + ' ' * (self.indent * level))
+
+    def _newline(self, level: int) -> str:
+        return '' if self.indent is None else '\n' + ' ' * (self.indent * level)
+
+    def write_array(self, items: Iterable[Any], level: int=0):
+        """Writes a json array whose elements are serialized one at a time as they are taken from items."""
+        count = 0
+        for item in items:
+            self.f.write('[' if count == 0 else ',')
+            self.f.write(self._newline(level + 1))
+            self.f.write(self._dumps(item, level + 1))
+            count += 1
+        self.f.write('[]' if count == 0 else self._newline(level) + ']')
+
+    def write_object(self, items: Iterable[Tuple[str, Any]], stream_keys: List[str]=None, level: int=0):
+        """
+        Writes a json object from (key, value) pairs.
+        The value of any key in stream_keys can be any iterable, and is written as an array with write_array.
+        """
+        stream_keys = stream_keys if stream_keys is not None else []
+        separator = ':' if self.indent is None else ': '
+        count = 0
+        for key, value in items:
+            self.f.write('{' if count == 0 else ',')
+            self.f.write(self._newline(level + 1))
+            self.f.write(json.dumps(key, ensure_ascii=self.ensure_ascii) + separator)
+            if key in stream_keys:
+                self.write_array(value, level=level + 1)
+            else:
+                self.f.write(self._dumps(value, level + 1))
+            count += 1
+        self.f.write('{}' if count == 0 else self._newline(level) + '}')
+
+@contextmanager
+def atomic_write(save_path: str):
+    """
+    Opens a temporary file next to save_path for writing and renames it to save_path once the block completes,
+    so that save_path never contains a partially written file. The temporary file is deleted if anything fails.
+    The file is compressed according to the extension of save_path. Refer to open_json.
+    """
+    tmp_path = f'{save_path}.tmp{os.getpid()}'
+    try:
+        with open_json(tmp_path, 'w', compression=get_compression_from_path(save_path)) as f:
+            yield f
+        os.replace(tmp_path, save_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
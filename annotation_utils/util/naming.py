@@ -0,0 +1,79 @@
+from __future__ import annotations
+from typing import List, Dict
+import os
+import re
+import threading
+from string import Formatter
+
+from logger import logger
+
+class DumpPathAllocator:
+    """
+    Hands out numbered file paths in a directory (000000.png, 000001.png, ...) for a whole batch of files.
+
+    This gives the same names as calling get_next_dump_path before saving each file,
+    but the directory is only listed once, when the allocator is created, instead of once per file.
+    Every file extension is numbered separately, continuing after the highest number that already exists in dump_dir.
+    The paths are reserved as they are handed out, so the files don't need to exist yet,
+    and next_path can be called from several threads at once.
+
+    dump_dir: The directory that the paths are in.
+    pattern: Format string of the filename without the extension. It has to contain exactly one integer field.
+             Example: '{:06d}' gives 000000.png, 'frame_{:04d}' gives frame_0000.png
+    starting_number: The first number used for an extension that doesn't exist in dump_dir yet.
+    increment: The step between two consecutive numbers.
+    """
+    def __init__(self, dump_dir: str, pattern: str='{:06d}', starting_number: int=0, increment: int=1):
+        self.dump_dir = dump_dir
+        self.pattern = pattern
+        self.starting_number = starting_number
+        self.increment = increment
+        self._regex = self._pattern_to_regex(pattern)
+        self._lock = threading.RLock()
+        self._next_numbers = self._scan() # type: Dict[str, int]
+
+    @staticmethod
+    def _pattern_to_regex(pattern: str) -> re.Pattern:
+        parts = list(Formatter().parse(pattern))
+        field_names = [field_name for _, field_name, _, _ in parts if field_name is not None]
+        if len(field_names) != 1:
+            logger.error(f'pattern must contain exactly one format field. Got pattern={pattern}')
+            raise Exception
+        regex = ''.join([
+            re.escape(literal_text) + ('(-?\\d+)' if field_name is not None else '')
+            for literal_text, field_name, _, _ in parts
+        ])
+        return re.compile(f'^{regex}$')
+
+    def _scan(self) -> Dict[str, int]:
+        next_numbers = {}
+        if not os.path.isdir(self.dump_dir):
+            return next_numbers
+        with os.scandir(self.dump_dir) as it:
+            for entry in it:
+                if not entry.is_file() or '.' not in entry.name:
+                    continue
+                rootname, extension = entry.name.rsplit('.', 1)
+                match = self._regex.match(rootname)
+                if match is None:
+                    continue
+                number = int(match.group(1)) + self.increment
+                if number > next_numbers.get(extension, number - 1):
+                    next_numbers[extension] = number
+        return next_numbers
+
+    def path_for_number(self, number: int, file_extension: str) -> str:
+        """Returns the path that the given number maps to. Use this for id-based names, e.g. the image id."""
+        return f'{self.dump_dir}/{self.pattern.format(number)}.{file_extension}'
+
+    def next_path(self, file_extension: str) -> str:
+        """Reserves and returns the next path for the given file extension."""
+        with self._lock:
+            number = self._next_numbers.get(file_extension, self.starting_number)
+            self._next_numbers[file_extension] = number + self.increment
+        return self.path_for_number(number, file_extension)
+
+    def next_paths(self, file_extension_list: List[str]) -> List[str]:
+        """Reserves and returns one path for each of the given file extensions, in order."""
+        with self._lock:
+            return [self.next_path(file_extension) for file_extension in file_extension_list]
@@ -0,0 +1,116 @@
+from __future__ import annotations
+from typing import List, Callable, Iterable, Iterator, Tuple, Any
+import queue
+import threading
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+def _run_chunk(func: Callable, chunk: list) -> List[Tuple[Any, Exception]]:
+    # Errors are returned instead of raised, so that the caller can tell which item of the chunk failed.
+    results = []
+    for item in chunk:
+        try:
+            results.append((func(item), None))
+        except Exception as e:
+            results.append((None, e))
+    return results
+
+def imap_ordered(
+    func: Callable, items: Iterable, workers: int=None,
+    chunksize: int=1, max_pending_chunks: int=None,
+    initializer: Callable=None, initargs: tuple=(), use_threads: bool=False
+) -> Iterator[Tuple[Any, Exception]]:
+    """
+    Calls func on every item in a pool of processes and yields (result, error) for every item, in the order of items.
+    error is None when func succeeded, and result is None when it raised. The exception is yielded instead of raised,
+    so that the caller can report which item failed.
+
+    Unlike ProcessPoolExecutor.map, only a limited number of chunks are submitted at any time,
+    so neither the pending items nor the finished results pile up in memory when items is long.
+
+    func: A function that can be pickled, e.g. a module level function or a functools.partial of one.
+    items: The items to process. This can be a generator; it is consumed as the results are yielded.
+    workers: The number of processes. If None or less than 2, everything is done in this process instead.
+    chunksize: The number of items that are sent to a process at once.
+    max_pending_chunks: The maximum number of chunks that are submitted but not yet yielded. Defaults to 2 * workers.
+    initializer: Called with initargs once in every process before any items are processed (in this process if workers < 2).
+                 Use this to send large objects that every item needs to the processes once, instead of with every item.
+    use_threads: If True, a pool of threads is used instead of processes, e.g. for reading files.
+                 func doesn't need to be picklable in that case.
+    """
+    items = iter(items)
+    if workers is None or workers < 2:
+        if initializer is not None:
+            initializer(*initargs)
+        for item in items:
+            yield from _run_chunk(func, [item])
+        return
+    if max_pending_chunks is None:
+        max_pending_chunks = 2 * workers
+    chunksize = max(1, chunksize)
+    executor_type = ThreadPoolExecutor if use_threads else ProcessPoolExecutor
+    with executor_type(max_workers=workers, initializer=initializer, initargs=initargs) as executor:
+        pending = deque()
+        try:
+            while True:
+                while len(pending) < max_pending_chunks:
+                    chunk = list(islice(items, chunksize))
+                    if len(chunk) == 0:
+                        break
+                    pending.append(executor.submit(_run_chunk, func, chunk))
+                if len(pending) == 0:
+                    break
+                yield from pending.popleft().result()
+        finally:
+            # Stop early without waiting for the chunks that haven't started yet, e.g. when the caller raised.
+            for future in pending:
+                future.cancel()
+
+class BackgroundWriter:
+    """
+    Calls write_func on every item that is put, in order, in a background thread.
+    This lets the caller prepare the next item while the previous one is being written, e.g. encoded into a video.
+
+    At most max_pending items wait to be written. put blocks while the queue is full,
+    so the caller can't get ahead of the writer by more than that.
+    If write_func raises, the error is raised again by the next call to put or close.
+
+    write_func: Function that writes a single item.
+    max_pending: The maximum number of items that are put but not yet written.
+    """
+    _STOP = object()
+
+    def __init__(self, write_func: Callable[[Any], None], max_pending: int=8):
+        self.write_func = write_func
+        self._queue = queue.Queue(maxsize=max(1, max_pending))
+        self._error = None # type: Exception
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+            if self._error is not None:
+                continue # Drain the queue so that put doesn't block forever.
+            try:
+                self.write_func(item)
+            except Exception as e:
+                self._error = e
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def put(self, item: Any):
+        self._raise_error()
+        self._queue.put(item)
+
+    def close(self):
+        """Waits until every item that was put has been written."""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+        self._raise_error()
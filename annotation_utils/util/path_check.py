@@ -0,0 +1,63 @@
+from __future__ import annotations
+from typing import List, Set
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from logger import logger
+
+# Directories that hold fewer of the checked paths than this are stat'ed file by file instead of being listed,
+# so that checking a handful of files in a huge directory doesn't list the whole directory.
+SCANDIR_MIN_PATHS = 16
+
+def _list_files(dir_path: str) -> Set[str]:
+    """Returns the names of the files in dir_path, or None if dir_path can't be listed."""
+    try:
+        with os.scandir(dir_path) as it:
+            # is_file usually comes from the directory entry itself, so this doesn't stat every file.
+            return set([entry.name for entry in it if entry.is_file()])
+    except OSError:
+        return None
+
+def find_missing_files(paths: List[str], workers: int=None) -> List[str]:
+    """
+    Returns the paths in the given list that aren't existing files, in the order in which they were given.
+    This gives the same result as checking os.path.isfile on every path, but needs far fewer filesystem calls:
+    the paths are grouped by directory, each directory that contains many of the paths is listed once with os.scandir,
+    and only the paths that can't be resolved that way are stat'ed, in a thread pool.
+
+    paths: The file paths to check.
+    workers: The number of threads used for listing directories and for the remaining stat calls.
+             Uses the ThreadPoolExecutor default when None.
+    """
+    dir2names = {}
+    for path in paths:
+        dir_path, name = os.path.split(path)
+        dir2names.setdefault(dir_path, set()).add(name)
+    scan_dirs = [dir_path for dir_path, names in dir2names.items() if len(names) >= SCANDIR_MIN_PATHS]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        dir2files = dict(zip(scan_dirs, executor.map(lambda dir_path: _list_files(dir_path if dir_path != '' else '.'), scan_dirs)))
+        unresolved_paths = []
+        for path in set(paths):
+            dir_path, name = os.path.split(path)
+            files = dir2files.get(dir_path, None)
+            if files is None or name not in files:
+                # Not listed, or not found in the listing (e.g. on a case-insensitive filesystem), so ask the filesystem directly.
+                unresolved_paths.append(path)
+        missing_paths = set([
+            path for path, is_file in zip(unresolved_paths, executor.map(os.path.isfile, unresolved_paths))
+            if not is_file
+        ])
+    return [path for path in paths if path in missing_paths]
+
+def check_files_exist(paths: List[str], workers: int=None):
+    """
+    Raises an error if any of the given paths isn't an existing file.
+    All of the missing files are reported at once. See find_missing_files for how the paths are checked.
+    """
+    missing_paths = find_missing_files(paths, workers=workers)
+    if len(missing_paths) > 0:
+        for path in missing_paths:
+            logger.error(f"File not found: {path}")
+        logger.error(f"{len(missing_paths)}/{len(paths)} files not found.")
+        raise Exception
@@ -0,0 +1,85 @@
+import json
+from common_utils.file_utils import make_dir_if_not_exists, delete_all_files_in_dir
+from common_utils.common_types.bbox import BBox
+from common_utils.common_types.segmentation import Segmentation, Polygon
+from common_utils.common_types.keypoint import Keypoint2D_List
+from annotation_utils.coco.structs import COCO_Dataset, COCO_License, COCO_Image, \
+    COCO_Annotation, COCO_Category
+from annotation_utils.coco.structs.cache import COCO_Cache
+from annotation_utils.util.json_stream import dump_json
+
+# Builds a small dataset in memory, so this test doesn't need any data.
+# The coordinates are multiples of 0.25 so that saving with precision=2 doesn't change them.
+dump_dir = 'roundtrip_dump'
+make_dir_if_not_exists(dump_dir)
+delete_all_files_in_dir(dump_dir, ask_permission=False)
+
+dataset = COCO_Dataset.new(description='Round trip test dataset')
+dataset.licenses.append(COCO_License(url='https://example.com/license', id=0, name='Test License'))
+dataset.categories.append(COCO_Category(id=0, name='part', keypoints=['a', 'b', 'c'], skeleton=[[0, 1], [1, 2]]))
+dataset.categories.append(COCO_Category(id=1, name='box', keypoints=[], skeleton=[]))
+for i in range(5):
+    dataset.images.append(
+        COCO_Image(
+            license_id=0, file_name=f'{i}.png', coco_url=f'/path/to/{i}.png',
+            height=480, width=640, date_captured='2020/01/01 00:00:00', flickr_url=None, id=i
+        )
+    )
+for i in range(20):
+    x, y = 10 * i + 0.25, 5 * i + 0.5
+    if i % 4 == 0: # int coordinates
+        x, y = int(x), int(y)
+        seg_points = [[x, y], [x + 10, y], [x + 10, y + 10], [x, y + 10]]
+    else:
+        seg_points = [[x, y], [x + 10.5, y], [x + 10.5, y + 10.75], [x, y + 10.75]]
+    has_kpts = i % 3 != 0
+    dataset.annotations.append(
+        COCO_Annotation(
+            id=i, category_id=0 if has_kpts else 1, image_id=i % 5,
+            segmentation=Segmentation([Polygon.from_list(seg_points, demarcation=True)]) if i % 5 != 4 else Segmentation([]),
+            bbox=BBox(x, y, x + 10, y + 10),
+            area=100.0 if i % 2 == 0 else 100,
+            keypoints=Keypoint2D_List.from_list(
+                [[x + 1, y + 1, 2], [x + 2.5, y + 2.5, 1], [0, 0, 0]], demarcation=True
+            ) if has_kpts else Keypoint2D_List(),
+            num_keypoints=2 if has_kpts else 0,
+            iscrowd=0
+        )
+    )
+
+# The objects convert int and float coordinates mixed in one annotation to floats,
+# so those annotations are written to the json directly.
+dataset_dict = dataset.to_dict()
+for ann_dict in dataset_dict['annotations'][1::4]:
+    ann_dict['segmentation'] = [[int(value) if j % 3 == 0 else value for j, value in enumerate(ann_dict['segmentation'][0])]] \
+        if len(ann_dict['segmentation']) > 0 else []
+    ann_dict['bbox'] = [int(ann_dict['bbox'][0])] + ann_dict['bbox'][1:]
+json_path = f'{dump_dir}/output.json'
+dump_json(dataset_dict, json_path)
+# The dicts are compared as json, since 1 == 1.0 would hide ints that were turned into floats.
+expected = json.dumps(COCO_Dataset.load_from_path(json_path, check_paths=False).to_dict(), sort_keys=True)
+
+def check(name: str, loaded: COCO_Dataset):
+    assert json.dumps(loaded.to_dict(), sort_keys=True) == expected, f'{name} does not match the plain load.'
+    print(f'{name}: OK')
+
+check('columnar', COCO_Dataset.load_from_path(json_path, check_paths=False, columnar=True))
+check('stream', COCO_Dataset.load_from_path(json_path, check_paths=False, stream=True))
+check('stream, columnar', COCO_Dataset.load_from_path(json_path, check_paths=False, stream=True, columnar=True))
+
+cache_dir = f'{dump_dir}/cache'
+assert not COCO_Cache(json_path, cache_dir=cache_dir).is_valid()
+check('use_cache (write)', COCO_Dataset.load_from_path(json_path, check_paths=False, use_cache=True, cache_dir=cache_dir))
+assert COCO_Cache(json_path, cache_dir=cache_dir).is_valid()
+check('use_cache (hit)', COCO_Dataset.load_from_path(json_path, check_paths=False, use_cache=True, cache_dir=cache_dir))
+check('use_cache (hit), columnar', COCO_Dataset.load_from_path(json_path, check_paths=False, use_cache=True, cache_dir=cache_dir, columnar=True))
+
+for extension in ['json', 'json.gz', 'json.zst']:
+    for compact in [False, True]:
+        for precision in [None, 2]:
+            save_path = f'{dump_dir}/output_{compact}_{precision}.{extension}'
+            COCO_Dataset.load_from_path(json_path, check_paths=False).save_to_path(save_path, compact=compact, precision=precision)
+            check(
+                f'{extension}, compact={compact}, precision={precision}',
+                COCO_Dataset.load_from_path(save_path, check_paths=False)
+            )